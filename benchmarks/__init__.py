@@ -0,0 +1 @@
+"""Бенчмарки бота на локальных заменах внешних сервисов."""
@@ -0,0 +1,175 @@
+"""Бенчмарк частоты опроса: задержка уведомлений и число запросов к API.
+
+Симуляция на виртуальных часах: у каждой из `подписок` своя история
+статусов за `дней` дней. Студент сдаёт работу после паузы (в среднем
+IDLE_MEAN), ревьюер берёт её на проверку, через 0,5–6 ч выносит
+вердикт, а после замечаний студент сдаёт работу снова (в среднем
+через RESUBMIT_MEAN). Опрос мгновенно видит статусы на текущий момент.
+
+Сравниваются постоянный период 600 с, AdaptivePolicy и AdaptivePolicy
+с общим бюджетом `бюджет` запросов в минуту. Печатаются число запросов,
+их максимум за минуту, средняя задержка и p50 задержки всех
+уведомлений, p50 задержки уведомлений о вердиктах, p50/p95 задержки
+уведомлений о взятии на проверку и число смен статуса, которые опрос
+не увидел, потому что за один период статус сменился дважды.
+
+Запуск: python -m benchmarks.bench_adaptive [подписок] [дней] [бюджет]
+"""
+import random
+import sys
+from collections import Counter
+from statistics import mean, quantiles
+
+from status_bot.adaptive import AdaptivePolicy, RequestBudget
+from status_bot.clock import VirtualClock
+from status_bot.diff import StatusDiff
+from status_bot.schedule import PollScheduler
+
+PERIOD = 600
+HOUR = 3600
+DAY = 24 * HOUR
+IDLE_MEAN = 3 * DAY
+RESUBMIT_MEAN = 4 * HOUR
+REJECT_RATE = 0.4
+
+
+def history(randomizer, horizon: float) -> list:
+    """Возвращает смены статусов одной подписки: (время, работа, статус)."""
+    events = []
+    now = randomizer.expovariate(1 / IDLE_MEAN)
+    number = 0
+    while now < horizon:
+        name = f"hw{number}.zip"
+        events.append((now, name, "reviewing"))
+        now += randomizer.uniform(0.5 * HOUR, 6 * HOUR)
+        if randomizer.random() < REJECT_RATE:
+            events.append((now, name, "rejected"))
+            now += randomizer.expovariate(1 / RESUBMIT_MEAN)
+            continue
+        events.append((now, name, "approved"))
+        number += 1
+        now += randomizer.expovariate(1 / IDLE_MEAN)
+    return [event for event in events if event[0] < horizon]
+
+
+class Account:
+    """История статусов подписки и то, что о ней знает бот."""
+
+    __slots__ = ("events", "position", "homeworks", "changed_at", "statuses")
+
+    def __init__(self, events: list):
+        """Начинает с пустого знания о статусах подписки."""
+        self.events = events
+        self.position = 0
+        self.homeworks = {}
+        self.changed_at = {}
+        self.statuses = StatusDiff(render=lambda homework: "")
+
+    def poll(self, now: float) -> list:
+        """Возвращает задержки замеченных переходов как (статус, секунды)."""
+        events = self.events
+        start = self.position
+        while self.position < len(events) and events[self.position][0] <= now:
+            moment, name, status = events[self.position]
+            self.homeworks[name] = status
+            self.changed_at[name] = moment
+            self.position += 1
+        if self.position == start:
+            return []
+        transitions = self.statuses.pending(
+            {"homework_name": name, "status": status}
+            for name, status in self.homeworks.items()
+        )
+        self.statuses.commit(transitions)
+        return [
+            (status, now - self.changed_at[homework["homework_name"]])
+            for homework, status, _ in transitions
+        ]
+
+
+def run(accounts: list, days: int, policy=None, budget=None) -> dict:
+    """Прогоняет симуляцию и возвращает статистику."""
+    clock = VirtualClock()
+    scheduler = PollScheduler(PERIOD, clock=clock, seed=7)
+    for key in range(len(accounts)):
+        scheduler.add(key)
+    horizon = days * DAY
+    calls = Counter()
+    latencies = {"verdict": [], "reviewing": []}
+    while True:
+        clock.now = scheduler.next_at()
+        if clock.now >= horizon:
+            break
+        due = scheduler.due()
+        if budget is not None:
+            due = budget.admit(scheduler, due)
+        calls[int(clock.now // 60)] += len(due)
+        for key in due:
+            account = accounts[key]
+            observed = account.poll(clock.now)
+            for status, latency in observed:
+                kind = "reviewing" if status == "reviewing" else "verdict"
+                latencies[kind].append(latency)
+            if policy is not None:
+                scheduler.set_period(key, policy.interval(
+                    scheduler.period_of(key),
+                    account.statuses.values(),
+                    bool(observed),
+                ))
+    every = latencies["verdict"] + latencies["reviewing"]
+    return {
+        "calls": sum(calls.values()),
+        "peak": max(calls.values()),
+        "mean": mean(every),
+        "all": quantiles(every, n=20, method="inclusive"),
+        "verdict": quantiles(
+            latencies["verdict"], n=20, method="inclusive"
+        ),
+        "reviewing": quantiles(
+            latencies["reviewing"], n=20, method="inclusive"
+        ),
+        "missed": sum(len(account.events) for account in accounts)
+        - len(every),
+    }
+
+
+def main() -> None:
+    """Сравнивает постоянный период и адаптивный опрос."""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else 7
+    per_minute = float(sys.argv[3]) if len(sys.argv) > 3 else 150
+    randomizer = random.Random(7)
+    histories = [history(randomizer, days * DAY) for _ in range(count)]
+    print(
+        f"{count} подписок, {days} дней, "
+        f"{sum(map(len, histories))} смен статуса"
+    )
+    print(
+        f"{'режим':<28}{'запросов':>10}{'max/мин':>9}{'среднее':>9}"
+        f"{'p50':>6}{'вердикт p50':>13}{'на проверку p50':>17}{'p95':>7}"
+        f"{'не видно':>10}"
+    )
+    modes = [
+        (f"период {PERIOD} с", None, None),
+        ("адаптивный", AdaptivePolicy(PERIOD), None),
+        (
+            f"адаптивный, {per_minute:.0f} в минуту",
+            AdaptivePolicy(PERIOD),
+            RequestBudget(per_minute),
+        ),
+    ]
+    for name, policy, budget in modes:
+        accounts = [Account(events) for events in histories]
+        result = run(accounts, days, policy, budget)
+        print(
+            f"{name:<28}{result['calls']:>10}{result['peak']:>9}"
+            f"{result['mean']:>9.0f}{result['all'][9]:>6.0f}"
+            f"{result['verdict'][9]:>13.0f}"
+            f"{result['reviewing'][9]:>17.0f}{result['reviewing'][18]:>7.0f}"
+            f"{result['missed']:>10}"
+        )
+    print("задержки в секундах")
+
+
+if __name__ == "__main__":
+    main()
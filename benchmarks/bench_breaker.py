@@ -0,0 +1,119 @@
+"""Бенчмарк выключателей: сколько запросов уходит в недоступные службы.
+
+Обе локальные замены сначала отвечают только ошибкой 500, затем
+восстанавливаются. Считаются запросы, дошедшие до служб во время сбоя,
+с выключателем и без него.
+
+Запуск: python -m benchmarks.bench_breaker [подписок] [циклов сбоя]
+"""
+import asyncio
+import sys
+import time
+
+import telegram
+
+from benchmarks.stand_in import (PracticumStandIn, TelegramStandIn,
+                                 make_homeworks)
+from homework import is_telegram_outage
+from status_bot.api import is_outage
+from status_bot.breaker import CircuitBreaker
+from status_bot.poller import AsyncPoller, Subscription
+from status_bot.sender import SendQueue
+from status_bot.transport import HttpPool
+
+PAUSE = 0.1
+RESET_TIMEOUT = 0.3
+MAX_RESET_TIMEOUT = 0.6
+
+
+async def drive(poller, server, outage_cycles: int) -> tuple:
+    """Прогоняет циклы сбоя и восстановления, возвращает число запросов."""
+    for _ in range(outage_cycles):
+        await poller.run_cycle()
+        await asyncio.sleep(PAUSE)
+    wasted = server.requests
+    server.faults.error_rate = 0.0
+    await asyncio.sleep(MAX_RESET_TIMEOUT)
+    # Пока идёт пробный запрос, остальные опросы цикла отклоняются,
+    # поэтому восстановление видно по второму циклу.
+    await poller.run_cycle()
+    stats = await poller.run_cycle()
+    return wasted, stats.failed
+
+
+def run_api(subscriptions: int, outage_cycles: int, breaker) -> tuple:
+    """Опрашивает недоступное API и считает лишние запросы."""
+    with PracticumStandIn(make_homeworks(1), error_rate=1.0) as server:
+        poller = AsyncPoller(
+            [Subscription(f"token-{i}", str(i)) for i in range(subscriptions)],
+            send=lambda chat_id, message: None,
+            endpoint=server.url,
+            breaker=breaker,
+        )
+        try:
+            return asyncio.run(drive(poller, server, outage_cycles))
+        finally:
+            poller.close()
+
+
+def run_telegram(messages: int, outage: float, breaker) -> tuple:
+    """Отправляет сообщения в недоступный Telegram и считает запросы."""
+    with TelegramStandIn(
+        global_rate=1000, per_chat_rate=1000, error_rate=1.0
+    ) as server, HttpPool(pool_size=4) as pool:
+        bot = telegram.Bot(
+            token="1234:abcdefg",
+            base_url=server.base_url,
+            request=pool.telegram_request(),
+        )
+        send = bot.send_message
+        if breaker is not None:
+            send = breaker.wrap(send)
+        send_queue = SendQueue(send, global_rate=1000, per_chat_rate=1000)
+        for index in range(messages):
+            send_queue.put(1000 + index, f"сообщение {index}")
+        time.sleep(outage)
+        wasted = server.requests
+        server.faults.error_rate = 0.0
+        send_queue.close(timeout=10)
+    return wasted, server.delivered
+
+
+def breaker_for(name: str, is_failure) -> CircuitBreaker:
+    """Создаёт выключатель с коротким сроком размыкания для бенчмарка."""
+    return CircuitBreaker(
+        name,
+        reset_timeout=RESET_TIMEOUT,
+        max_reset_timeout=MAX_RESET_TIMEOUT,
+        is_failure=is_failure,
+    )
+
+
+def main() -> None:
+    """Печатает число запросов во время сбоя с выключателем и без."""
+    subscriptions = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    outage_cycles = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    for title, breaker in (
+        ("без выключателя", None),
+        ("с выключателем", breaker_for("practicum", is_outage)),
+    ):
+        wasted, failed = run_api(subscriptions, outage_cycles, breaker)
+        print(
+            f"API, {title}: {wasted} запросов за {outage_cycles} циклов "
+            f"сбоя, сбоев после восстановления: {failed}"
+        )
+    outage = outage_cycles * PAUSE
+    for title, breaker in (
+        ("без выключателя", None),
+        ("с выключателем", breaker_for("telegram", is_telegram_outage)),
+    ):
+        wasted, delivered = run_telegram(subscriptions, outage, breaker)
+        print(
+            f"Telegram, {title}: {wasted} запросов за {outage:.1f} с сбоя, "
+            f"доставлено после восстановления: {delivered} "
+            f"из {subscriptions}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Бенчмарк StatusDiff на ответах с сотнями домашних работ.
+
+Запуск: python -m benchmarks.bench_diff [работ] [изменений за цикл]
+"""
+import sys
+import timeit
+
+from status_bot.api import HOMEWORK_VERDICTS, parse_status
+from status_bot.diff import StatusDiff
+
+STATUSES = tuple(HOMEWORK_VERDICTS)
+
+
+def make_responses(homeworks: int, changed: int, cycles: int) -> list:
+    """Строит серию ответов, где за цикл меняется `changed` работ."""
+    current = [
+        {"homework_name": f"hw{i}", "status": "reviewing"}
+        for i in range(homeworks)
+    ]
+    responses = []
+    for cycle in range(cycles):
+        for offset in range(changed):
+            index = (cycle * changed + offset) % homeworks
+            status = STATUSES[(cycle + offset) % len(STATUSES)]
+            current[index] = {**current[index], "status": status}
+        responses.append(list(current))
+    return responses
+
+
+def main() -> None:
+    """Сравнивает разбор всего ответа с отправкой только переходов."""
+    homeworks = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    changed = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    cycles = 200
+    responses = make_responses(homeworks, changed, cycles)
+
+    def parse_everything():
+        sent = 0
+        for response in responses:
+            sent += len([parse_status(homework) for homework in response])
+        return sent
+
+    def diff_only():
+        statuses = StatusDiff()
+        sent = 0
+        for response in responses:
+            transitions = statuses.pending(response)
+            statuses.commit(transitions)
+            sent += len(transitions)
+        return sent
+
+    for title, func in (("весь ответ", parse_everything), ("diff", diff_only)):
+        seconds = min(timeit.repeat(func, number=1, repeat=5))
+        print(
+            f"{title}: {seconds / cycles * 1e6:.1f} мкс на цикл, "
+            f"сообщений за {cycles} циклов: {func()}"
+        )
+
+
+if __name__ == "__main__":
+    main()
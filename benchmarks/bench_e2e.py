@@ -0,0 +1,141 @@
+"""Сквозной бенчмарк: опрос API, разбор статусов и отправка в Telegram.
+
+Обе внешние службы заменены локальными серверами, весь остальной путь
+(HttpPool, AsyncPoller, StatusDiff, SendQueue, telegram.Bot) настоящий.
+На каждом цикле статус всех работ меняется, и бенчмарк измеряет время
+цикла и время от смены статуса до приёма уведомления.
+
+Запуск: python -m benchmarks.bench_e2e [подписок] [циклов] [работ]
+    [задержка API, мс] [доля ошибок API] [доля ошибок Telegram]
+"""
+import asyncio
+import sys
+import time
+from statistics import quantiles
+
+import telegram
+
+from benchmarks.stand_in import (PracticumStandIn, TelegramStandIn,
+                                 make_homeworks)
+from status_bot.api import HOMEWORK_VERDICTS
+from status_bot.poller import AsyncPoller, Subscription
+from status_bot.sender import SendQueue
+from status_bot.transport import HttpPool
+
+STATUSES = tuple(HOMEWORK_VERDICTS)
+# Лимиты Telegram проверяет bench_sender; здесь они не должны мешать.
+UNLIMITED = 1_000_000
+
+
+def percentiles(values: list) -> list:
+    """Возвращает перцентили 1–99 `values`; quantiles нужны две точки."""
+    if len(values) < 2:
+        return [values[0] if values else float("nan")] * 99
+    return quantiles(values, n=100, method="inclusive")
+
+
+async def drive(poller, send_queue, practicum, telegram_server, cycles):
+    """Прогоняет циклы опроса и собирает длительности и задержки."""
+    # Первый цикл знакомит подписки с работами и не измеряется.
+    await poller.run_cycle()
+    send_queue.join()
+    cycle_seconds, notify_seconds, failed = [], [], 0
+    for cycle in range(cycles):
+        practicum.set_status(STATUSES[cycle % len(STATUSES)])
+        received = len(telegram_server.received)
+        stats = await poller.run_cycle()
+        send_queue.join()
+        cycle_seconds.append(stats.elapsed)
+        failed += stats.failed
+        notify_seconds.extend(
+            at - practicum.changed_at
+            for _, at in telegram_server.received[received:]
+        )
+    return cycle_seconds, notify_seconds, failed
+
+
+def run(
+    subscriptions: int,
+    cycles: int,
+    homeworks: int,
+    latency: float,
+    api_errors: float,
+    telegram_errors: float,
+    concurrency: int = 64,
+) -> dict:
+    """Запускает бенчмарк и возвращает сводку измерений."""
+    with PracticumStandIn(
+        make_homeworks(homeworks), latency=latency, error_rate=api_errors
+    ) as practicum, TelegramStandIn(
+        global_rate=UNLIMITED,
+        per_chat_rate=UNLIMITED,
+        error_rate=telegram_errors,
+    ) as telegram_server, HttpPool(pool_size=concurrency) as pool:
+        bot = telegram.Bot(
+            token="1234:abcdefg",
+            base_url=telegram_server.base_url,
+            request=pool.telegram_request(),
+        )
+        send_queue = SendQueue(
+            bot.send_message,
+            global_rate=UNLIMITED,
+            per_chat_rate=UNLIMITED,
+            maxsize=subscriptions * homeworks,
+        )
+        poller = AsyncPoller(
+            [Subscription(f"token-{i}", str(i)) for i in range(subscriptions)],
+            send=send_queue,
+            concurrency=concurrency,
+            endpoint=practicum.url,
+            session=pool,
+        )
+        started = time.perf_counter()
+        try:
+            cycle_seconds, notify_seconds, failed = asyncio.run(
+                drive(poller, send_queue, practicum, telegram_server, cycles)
+            )
+        finally:
+            poller.close()
+            send_queue.close()
+        elapsed = time.perf_counter() - started
+    cycle = percentiles(cycle_seconds)
+    notify = percentiles(notify_seconds)
+    return {
+        "polls": subscriptions * (cycles + 1) / elapsed,
+        "cycle_p50": cycle[49],
+        "cycle_p99": cycle[98],
+        "notify_p50": notify[49],
+        "notify_p99": notify[98],
+        "notified": len(notify_seconds),
+        "expected": subscriptions * homeworks * cycles,
+        "failed": failed,
+    }
+
+
+def main() -> None:
+    """Печатает пропускную способность и перцентили задержек."""
+    args = sys.argv[1:]
+    subscriptions = int(args[0]) if len(args) > 0 else 500
+    cycles = int(args[1]) if len(args) > 1 else 10
+    homeworks = int(args[2]) if len(args) > 2 else 1
+    latency = float(args[3]) / 1000 if len(args) > 3 else 0.02
+    api_errors = float(args[4]) if len(args) > 4 else 0.0
+    telegram_errors = float(args[5]) if len(args) > 5 else 0.0
+    result = run(
+        subscriptions, cycles, homeworks, latency, api_errors, telegram_errors
+    )
+    print(
+        f"{subscriptions} подписок, {cycles} циклов, "
+        f"задержка API {latency * 1000:.0f} мс\n"
+        f"  пропускная способность: {result['polls']:.0f} опросов/с\n"
+        f"  цикл: p50 {result['cycle_p50'] * 1000:.0f} мс, "
+        f"p99 {result['cycle_p99'] * 1000:.0f} мс\n"
+        f"  время до уведомления: p50 {result['notify_p50'] * 1000:.0f} мс, "
+        f"p99 {result['notify_p99'] * 1000:.0f} мс\n"
+        f"  доставлено {result['notified']} из {result['expected']}, "
+        f"сбоев опроса: {result['failed']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
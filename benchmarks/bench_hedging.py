@@ -0,0 +1,88 @@
+"""Бенчмарк сроков и дублей: хвост задержки при зависающем API.
+
+Локальная замена API зависает посреди тела ответа на `stall` секунд
+с вероятностью `доля зависаний`. Запросы идут подряд в трёх режимах:
+только таймауты соединения и чтения (как раньше), общий срок
+`срок` секунд через Hedger без дублей и Hedger с дублем на p95.
+Печатаются p50/p95/p99/max задержки, число ошибок, доля дублей
+и число запросов, которые получил сервер.
+
+Запуск: python -m benchmarks.bench_hedging [запросов] [доля зависаний]
+[зависание, с] [срок, с]
+"""
+import sys
+import time
+from statistics import quantiles
+
+from benchmarks.stand_in import PracticumStandIn, make_homeworks
+from status_bot import api
+from status_bot.deadline import Deadline, Hedger
+from status_bot.transport import DEFAULT_TOTAL_TIMEOUT, HttpPool
+
+
+def run(server, count: int, budget: float, hedger=None) -> dict:
+    """Выполняет `count` запросов подряд и возвращает статистику."""
+    headers = api.auth_headers("token")
+    latencies = []
+    failed = 0
+    before = server.requests
+    with HttpPool(pool_size=4) as pool:
+        for _ in range(count):
+            started = time.perf_counter()
+            try:
+                api.fetch_api_answer(
+                    headers, 0, server.url, pool,
+                    deadline=Deadline(budget), hedger=hedger,
+                )
+            except Exception:
+                failed += 1
+            latencies.append(time.perf_counter() - started)
+    cuts = quantiles(latencies, n=100, method="inclusive")
+    return {
+        "p50": cuts[49] * 1000,
+        "p95": cuts[94] * 1000,
+        "p99": cuts[98] * 1000,
+        "max": max(latencies) * 1000,
+        "failed": failed,
+        "hedged": hedger.hedged if hedger else 0,
+        "served": server.requests - before,
+    }
+
+
+def main() -> None:
+    """Сравнивает режимы на одном и том же зависающем сервере."""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    stall_rate = float(sys.argv[2]) if len(sys.argv) > 2 else 0.03
+    stall = float(sys.argv[3]) if len(sys.argv) > 3 else 1.0
+    budget = float(sys.argv[4]) if len(sys.argv) > 4 else 0.5
+    print(
+        f"{count} запросов, зависает {stall_rate:.0%} ответов "
+        f"на {stall:.1f} с, срок {budget:.1f} с"
+    )
+    print(
+        f"{'режим':<26}{'p50':>8}{'p95':>8}{'p99':>8}{'max':>8}"
+        f"{'ошибок':>8}{'дублей':>8}{'запросов':>10}"
+    )
+    modes = [
+        ("только таймауты", DEFAULT_TOTAL_TIMEOUT, None),
+        ("общий срок", budget, Hedger(quantile=None)),
+        ("срок и дубль на p95", budget, Hedger()),
+    ]
+    for name, mode_budget, hedger in modes:
+        with PracticumStandIn(
+            make_homeworks(20), stall_rate=stall_rate, stall=stall, seed=7
+        ) as server:
+            result = run(server, count, mode_budget, hedger)
+        if hedger is not None:
+            hedger.close()
+        print(
+            f"{name:<26}{result['p50']:>8.1f}{result['p95']:>8.1f}"
+            f"{result['p99']:>8.1f}{result['max']:>8.1f}"
+            f"{result['failed']:>8}{result['hedged']:>8}"
+            f"{result['served']:>10}"
+        )
+    print("задержки в мс")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Бенчмарк журнала: сколько стоит вызов logger.* в цикле опроса.
+
+Журнал пишется в канал, который читает медленный потребитель (как
+перегруженный сборщик логов или терминал). Для синхронной записи,
+очереди с фоновым потоком и выборки DEBUG печатается время вызова
+в микросекундах (среднее и p99) и число отброшенных записей.
+
+Запуск: python -m benchmarks.bench_logging [записей] [задержка чтения, мс]
+"""
+import logging
+import os
+import sys
+import threading
+import time
+from statistics import mean, quantiles
+
+from status_bot.logs import setup_logging
+
+CHUNK = 4096
+
+
+class SlowReader:
+    """Канал, из которого фоновый поток читает по CHUNK байт с паузами."""
+
+    def __init__(self, delay: float):
+        """Создаёт канал и запускает поток, читающий его с паузами `delay`."""
+        read_end, write_end = os.pipe()
+        self.stream = os.fdopen(write_end, "w", buffering=1)
+        self._read_end = read_end
+        self.delay = delay
+        self.received = 0
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            chunk = os.read(self._read_end, CHUNK)
+            if not chunk:
+                break
+            self.received += chunk.count(b"\n")
+            time.sleep(self.delay)
+
+    def close(self) -> None:
+        """Закрывает канал и ждёт, пока читатель дочитает его."""
+        self.stream.close()
+        self._thread.join()
+        os.close(self._read_end)
+
+
+def run(records: int, delay: float, **options) -> dict:
+    """Пишет `records` записей и возвращает время вызовов и потери."""
+    logger = logging.getLogger(f"bench.logging.{len(options)}.{id(options)}")
+    logger.propagate = False
+    reader = SlowReader(delay)
+    listener = setup_logging((logger,), reader.stream, **options)
+    handler = logger.handlers[0]
+    timings = []
+    for index in range(records):
+        level = logging.DEBUG if index % 4 else logging.INFO
+        started = time.perf_counter()
+        logger.log(
+            level,
+            "Опрос подписки %s завершён",
+            index,
+            extra={"subscription": "abc", "stage": "poll", "latency": 0.01},
+        )
+        timings.append(time.perf_counter() - started)
+    if listener is not None:
+        listener.stop()
+    logger.removeHandler(handler)
+    reader.close()
+    return {
+        "mean": mean(timings) * 1e6,
+        "p99": quantiles(timings, n=100, method="inclusive")[98] * 1e6,
+        "dropped": getattr(handler, "dropped", 0),
+        "written": reader.received,
+    }
+
+
+def main() -> None:
+    """Печатает таблицу по вариантам настройки журнала."""
+    records = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    delay = (float(sys.argv[2]) if len(sys.argv) > 2 else 1.0) / 1000
+    variants = [
+        ("синхронно, текст", {}),
+        ("синхронно, JSON", {"json_format": True}),
+        ("очередь, текст", {"asynchronous": True}),
+        ("очередь, JSON", {"asynchronous": True, "json_format": True}),
+        ("очередь, JSON, DEBUG 1/10", {
+            "asynchronous": True, "json_format": True, "debug_every": 10,
+        }),
+        ("очередь 1000, JSON", {
+            "asynchronous": True, "json_format": True, "queue_size": 1000,
+        }),
+    ]
+    print(
+        f"{records} записей, читатель спит {delay * 1000:.1f} мс "
+        f"на каждые {CHUNK} байт"
+    )
+    print(
+        f"{'вариант':<28}{'среднее, мкс':>14}{'p99, мкс':>12}"
+        f"{'отброшено':>11}{'записано':>10}"
+    )
+    for name, options in variants:
+        result = run(records, delay, **options)
+        print(
+            f"{name:<28}{result['mean']:>14.1f}{result['p99']:>12.1f}"
+            f"{result['dropped']:>11}{result['written']:>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
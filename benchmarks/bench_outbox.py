@@ -0,0 +1,61 @@
+"""Бенчмарк outbox: запись уведомлений и их доставка с отметками.
+
+Уведомления записываются пачкой цикла вместе со статусами, затем
+OutboxDispatcher отправляет их в пустую функцию и отмечает доставку
+каждые `commit_every` сообщений.
+
+Запуск: python -m benchmarks.bench_outbox [уведомлений]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from status_bot.outbox import OutboxDispatcher
+from status_bot.state import SqliteStateStore, StateBatch
+
+
+def make_batch(notifications: int) -> StateBatch:
+    """Строит пачку цикла с `notifications` переходами статусов."""
+    batch = StateBatch()
+    for index in range(notifications):
+        key = f"{index}:key"
+        batch.status(key, "hw1", "approved")
+        batch.add_pending(key, index, "approved", f"{key}:hw1:approved")
+    return batch
+
+
+def run(notifications: int, commit_every: int) -> tuple:
+    """Возвращает время записи пачки и время доставки в секундах."""
+    with tempfile.TemporaryDirectory() as directory:
+        store = SqliteStateStore(os.path.join(directory, "state.sqlite3"))
+        batch = make_batch(notifications)
+        started = time.perf_counter()
+        store.write(batch)
+        written = time.perf_counter() - started
+        dispatcher = OutboxDispatcher(
+            store, lambda chat_id, message: None, commit_every=commit_every
+        )
+        started = time.perf_counter()
+        dispatcher.drain()
+        drained = time.perf_counter() - started
+        assert dispatcher.delivered == notifications and not store.pending()
+        store.close()
+    return written, drained
+
+
+def main() -> None:
+    """Печатает скорость outbox при разной частоте отметок."""
+    notifications = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    for commit_every in (1, 10, 100):
+        written, drained = run(notifications, commit_every)
+        print(
+            f"commit_every={commit_every}: запись {notifications} "
+            f"уведомлений {written * 1000:.0f} мс, доставка "
+            f"{notifications / drained:.0f} сообщений/с, после падения "
+            f"повторится не больше {commit_every}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Бенчмарк разбора работ: прежний parse_status, кэшированный и Homework.
+
+Запуск: python -m benchmarks.bench_parse_status [работ] [разных названий]
+"""
+import sys
+import timeit
+
+from status_bot.api import HOMEWORK_VERDICTS, parse_status
+from status_bot.records import Homework
+
+STATUSES = tuple(HOMEWORK_VERDICTS)
+
+
+def legacy_parse_status(homework: dict) -> str:
+    """parse_status в том виде, в каком он был до кэша сообщений."""
+    homework_name = homework.get("homework_name")
+    status = homework.get("status")
+    if status not in HOMEWORK_VERDICTS.keys() or None:
+        raise KeyError("Отсутствующий или недокументированный статус домашки")
+    if "homework_name" not in homework or None:
+        raise KeyError(f"В ответе API домашки нет ключа {homework_name}")
+    verdict = HOMEWORK_VERDICTS[status]
+    return f'Изменился статус проверки работы "{homework_name}". {verdict}'
+
+
+def main() -> None:
+    """Печатает стоимость одного элемента для каждого варианта."""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    names = int(sys.argv[2]) if len(sys.argv) > 2 else 2_000
+    homeworks = [
+        {
+            "homework_name": f"student{i % names}__hw_python_oop.zip",
+            "status": STATUSES[i % len(STATUSES)],
+            "reviewer_comment": "Всё нравится",
+            "date_updated": "2020-02-13T14:40:57Z",
+        }
+        for i in range(count)
+    ]
+    variants = (
+        ("прежний parse_status", lambda: [
+            legacy_parse_status(item) for item in homeworks
+        ]),
+        ("parse_status", lambda: [parse_status(item) for item in homeworks]),
+        ("Homework", lambda: [
+            Homework.from_json(item).message for item in homeworks
+        ]),
+    )
+    for title, func in variants:
+        seconds = min(timeit.repeat(func, number=1, repeat=5))
+        print(f"{title}: {seconds / count * 1e9:.0f} нс на работу")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Бенчмарк AsyncPoller: опросы в секунду против локального API.
+
+Запуск: python -m benchmarks.bench_poller [подписок] [параллельность]
+"""
+import asyncio
+import sys
+
+from benchmarks.stand_in import PracticumStandIn
+from status_bot.poller import AsyncPoller, Subscription
+
+
+def run(subscriptions: int, concurrency: int, latency: float) -> float:
+    """Выполняет один цикл опроса и возвращает число опросов в секунду."""
+    with PracticumStandIn(latency=latency) as server:
+        poller = AsyncPoller(
+            [Subscription(f"token-{i}", str(i)) for i in range(subscriptions)],
+            send=lambda chat_id, message: None,
+            concurrency=concurrency,
+            endpoint=server.url,
+        )
+        try:
+            stats = asyncio.run(poller.run_cycle())
+        finally:
+            poller.close()
+    assert stats.failed == 0, f"сбоев опроса: {stats.failed}"
+    return stats.polled / stats.elapsed
+
+
+def main() -> None:
+    """Печатает пропускную способность для нескольких режимов."""
+    subscriptions = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+    for latency in (0.0, 0.05):
+        sequential = run(min(subscriptions, 100), 1, latency)
+        concurrent = run(subscriptions, concurrency, latency)
+        print(
+            f"задержка API {latency * 1000:.0f} мс: "
+            f"последовательно {sequential:.0f} опросов/с, "
+            f"{concurrency} параллельно {concurrent:.0f} опросов/с"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Бенчмарк расписания: процессорное время на тик для миллиона подписок.
+
+PollScheduler с периодом 600 с получает `подписок` ключей, затем
+виртуальные часы идут тиками по `тик` секунд в течение `периодов`
+периодов. Печатается время постановки в расписание, процессорное
+время `due` на тик (среднее, p99, максимум) и число подписок, готовых
+за тик. Для сравнения — тот же прогон, когда все подписки поставлены
+на один момент, как при общем `time.sleep(RETRY_PERIOD)`.
+
+Запуск: python -m benchmarks.bench_scheduler [подписок] [периодов]
+[тик, с]
+"""
+import sys
+import time
+from statistics import mean, quantiles
+
+from status_bot.clock import VirtualClock
+from status_bot.schedule import PollScheduler
+
+PERIOD = 600
+
+
+def run(count: int, periods: int, tick: float, spread: bool) -> dict:
+    """Ставит `count` подписок и прогоняет тики; возвращает статистику."""
+    clock = VirtualClock()
+    scheduler = PollScheduler(PERIOD, clock=clock, seed=7)
+    started = time.process_time()
+    for key in range(count):
+        scheduler.add(key, None if spread else 0)
+    added = time.process_time() - started
+    costs, ready = [], []
+    polls = 0
+    for _ in range(int(periods * PERIOD / tick)):
+        clock.now += tick
+        started = time.process_time()
+        due = scheduler.due()
+        costs.append(time.process_time() - started)
+        ready.append(len(due))
+        polls += len(due)
+    return {
+        "added": added,
+        "mean": mean(costs) * 1000,
+        "p99": quantiles(costs, n=100, method="inclusive")[98] * 1000,
+        "max": max(costs) * 1000,
+        "ready": mean(ready),
+        "ready_max": max(ready),
+        "polls": polls,
+        "missed": scheduler.missed,
+    }
+
+
+def main() -> None:
+    """Сравнивает разнесённое расписание и общий момент опроса."""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    periods = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+    tick = float(sys.argv[3]) if len(sys.argv) > 3 else 1.0
+    print(
+        f"{count} подписок, период {PERIOD} с, тик {tick:.1f} с, "
+        f"{periods} периода"
+    )
+    print(
+        f"{'расписание':<20}{'постановка, с':>15}{'тик, мс':>9}"
+        f"{'p99, мс':>9}{'max, мс':>9}{'готово/тик':>12}"
+        f"{'max/тик':>9}{'опросов':>10}"
+    )
+    for name, spread in (("разнесённое", True), ("один момент", False)):
+        result = run(count, periods, tick, spread)
+        print(
+            f"{name:<20}{result['added']:>15.2f}{result['mean']:>9.3f}"
+            f"{result['p99']:>9.3f}{result['max']:>9.1f}"
+            f"{result['ready']:>12.0f}{result['ready_max']:>9}"
+            f"{result['polls']:>10}"
+        )
+    print("время — процессорное время вызова due за тик")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Бенчмарк SendQueue против локальной замены Bot API.
+
+Запуск: python -m benchmarks.bench_sender [сообщений] [чатов]
+"""
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import telegram
+
+from benchmarks.stand_in import TelegramStandIn
+from status_bot.sender import SendQueue
+from status_bot.transport import HttpPool
+
+
+def main() -> None:
+    """Отправляет пачку сообщений и печатает устойчивую скорость."""
+    messages = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    chats = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    with TelegramStandIn() as server, HttpPool(pool_size=4) as pool:
+        bot = telegram.Bot(
+            token="1234:abcdefg",
+            base_url=server.base_url,
+            request=pool.telegram_request(),
+        )
+        send_queue = SendQueue(bot.send_message, maxsize=50)
+        started = time.perf_counter()
+        # Несколько опросчиков наполняют очередь одновременно и упираются
+        # в её размер, как в run_cohort.
+        with ThreadPoolExecutor(max_workers=8) as producers:
+            for index in range(messages):
+                producers.submit(
+                    send_queue.put, 1000 + index % chats, f"сообщение {index}"
+                )
+        send_queue.close()
+        elapsed = time.perf_counter() - started
+    print(
+        f"{messages} сообщений в {chats} чатов за {elapsed:.1f} с: "
+        f"{send_queue.delivered / elapsed:.1f} сообщ./с, "
+        f"ответов 429: {server.rejected}, повторов: {send_queue.retried}"
+    )
+
+
+if __name__ == "__main__":
+    main()
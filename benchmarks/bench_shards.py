@@ -0,0 +1,104 @@
+"""Бенчмарк шардов: сколько подписок в секунду обрабатывает одно ядро.
+
+Для каждого числа шардов K супервизор запускает K процессов, каждый
+опрашивает свою часть подписок против отдельной локальной замены API
+(чтобы сервер-замена не стал узким местом) и разбирает ответы с
+`работ` работами.
+
+Запуск: python -m benchmarks.bench_shards [подписок] [циклов] [работ]
+"""
+import asyncio
+import multiprocessing
+import os
+import sys
+import time
+from functools import partial
+
+from benchmarks.stand_in import PracticumStandIn, make_homeworks
+from status_bot.poller import AsyncPoller, Subscription
+from status_bot.shards import Supervisor
+
+CONCURRENCY = 16
+
+
+def serve_stand_in(homeworks: int, urls) -> None:
+    """Держит замену API в отдельном процессе."""
+    with PracticumStandIn(make_homeworks(homeworks)) as server:
+        urls.put(server.url)
+        while True:
+            time.sleep(60)
+
+
+def poll_shard(subscriptions, endpoints, cycles, results) -> None:
+    """Процесс-шард: несколько циклов опроса своей части подписок."""
+    name = multiprocessing.current_process().name
+    endpoint = endpoints[int(name.rsplit("-", 1)[1])]
+    poller = AsyncPoller(
+        subscriptions,
+        send=lambda chat_id, message: None,
+        concurrency=CONCURRENCY,
+        endpoint=endpoint,
+    )
+
+    async def drive():
+        started = time.perf_counter()
+        polled = 0
+        for _ in range(cycles):
+            stats = await poller.run_cycle()
+            polled += stats.polled - stats.failed
+        return polled, time.perf_counter() - started
+
+    try:
+        results.put(asyncio.run(drive()))
+    finally:
+        poller.close()
+
+
+def run(workers: int, subscriptions: int, cycles: int, homeworks: int):
+    """Возвращает суммарное число опросов в секунду для `workers` шардов."""
+    context = multiprocessing.get_context("spawn")
+    urls, results = context.Queue(), context.Queue()
+    servers = [
+        context.Process(
+            target=serve_stand_in, args=(homeworks, urls), daemon=True
+        )
+        for _ in range(workers)
+    ]
+    for server in servers:
+        server.start()
+    endpoints = [urls.get() for _ in servers]
+    supervisor = Supervisor(
+        [Subscription(f"token-{i}", str(i)) for i in range(subscriptions)],
+        partial(
+            poll_shard, endpoints=endpoints, cycles=cycles, results=results
+        ),
+        workers,
+        context=context,
+    ).start()
+    try:
+        shard_results = [results.get() for _ in range(workers)]
+    finally:
+        supervisor.stop()
+        for server in servers:
+            server.terminate()
+    # Шарды работают параллельно: общее время — время самого медленного.
+    polled = sum(polled for polled, _ in shard_results)
+    return polled / max(elapsed for _, elapsed in shard_results)
+
+
+def main() -> None:
+    """Печатает пропускную способность для разного числа шардов."""
+    subscriptions = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    cycles = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    homeworks = int(sys.argv[3]) if len(sys.argv) > 3 else 50
+    cores = os.cpu_count() or 1
+    for workers in sorted({1, 2, 4, cores}):
+        rate = run(workers, subscriptions, cycles, homeworks)
+        print(
+            f"{workers} шардов: {rate:.0f} опросов/с, "
+            f"{rate / min(workers, cores):.0f} на ядро (ядер: {cores})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Бенчмарк симуляции main(): время до уведомления за недели опроса.
+
+`прогонов` раз строится случайный сценарий на `дней` дней (сдачи работ,
+проверки, сбои API), и цикл main() проходит его на виртуальных часах,
+а каждый запрос к API занимает `задержка` виртуальных секунд. Печатается
+распределение времени от смены статуса до уведомления, число смен без
+уведомления, число запросов к API, сообщений о сбоях и восстановлении,
+а также во сколько раз симуляция быстрее настоящего времени.
+
+Запуск: python -m benchmarks.bench_simulation [прогонов] [дней]
+[задержка, с]
+"""
+import logging
+import random
+import sys
+from statistics import quantiles
+
+from benchmarks.simulation import DAY, random_timeline, simulate
+
+
+def main() -> None:
+    """Прогоняет сценарии и печатает сводку."""
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+    latency = float(sys.argv[3]) if len(sys.argv) > 3 else 0.3
+    # Сбои API в сценарии журналируются как ошибки; в сводке они лишние.
+    logging.disable(logging.CRITICAL)
+    latencies = []
+    missed = calls = failures = resolved = 0
+    simulated = elapsed = 0.0
+    for seed in range(runs):
+        timeline = random_timeline(random.Random(seed), days)
+        report = simulate(timeline, days * DAY, latency)
+        latencies.extend(report.latencies)
+        missed += report.missed
+        calls += report.api_calls
+        failures += report.failures_reported
+        resolved += report.resolved_reported
+        simulated += report.simulated
+        elapsed += report.elapsed
+    cuts = quantiles(latencies, n=100, method="inclusive")
+    print(
+        f"{runs} сценариев по {days} дней, запрос к API "
+        f"{latency:.1f} с: {simulated / DAY:.0f} дней за {elapsed:.2f} с, "
+        f"в {simulated / elapsed:,.0f} раз быстрее настоящего времени"
+    )
+    print(
+        f"время до уведомления, с: p50 {cuts[49]:.0f}, p90 {cuts[89]:.0f}, "
+        f"p99 {cuts[98]:.0f}, max {max(latencies):.0f}"
+    )
+    print(
+        f"уведомлений {len(latencies)}, смен без уведомления {missed}, "
+        f"запросов к API {calls} ({calls / runs / days:.0f} в сутки)"
+    )
+    print(f"сообщений о сбоях {failures}, о восстановлении {resolved}")
+
+
+if __name__ == "__main__":
+    main()
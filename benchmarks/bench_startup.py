@@ -0,0 +1,94 @@
+"""Бенчмарк холодного старта: от импорта homework до первого опроса.
+
+Каждый запуск — новый интерпретатор, который импортирует homework,
+вызывает create_app, создаёт telegram.Bot и выполняет первый запрос
+к локальной замене API, как это делает main(). Если медиана времени
+от импорта до первого опроса превышает бюджет, бенчмарк завершается
+с кодом 1.
+
+Запуск: python -m benchmarks.bench_startup [запусков] [бюджет, мс]
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+from statistics import median
+
+from benchmarks.stand_in import PracticumStandIn, make_homeworks
+
+BUDGET_MS = 250
+
+CHILD = """
+import json, sys, time
+started = time.perf_counter()
+import homework
+imported = time.perf_counter()
+homework.create_app()
+bot = homework.telegram.Bot(token=homework.TELEGRAM_TOKEN)
+created = time.perf_counter()
+homework.check_response(
+    homework.fetch_api_answer(homework.HEADERS, 0, sys.argv[1])
+)
+polled = time.perf_counter()
+print(json.dumps({
+    "import": imported - started,
+    "create": created - imported,
+    "poll": polled - created,
+    "total": polled - started,
+}))
+"""
+
+
+def run_child(url: str) -> dict:
+    """Запускает один холодный старт и возвращает длительности фаз."""
+    env = dict(
+        os.environ,
+        PRACTICUM_TOKEN="token",
+        TELEGRAM_TOKEN="1234:abcdefg",
+        TELEGRAM_CHAT_ID="1",
+        STATE_DB="memory",
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD, url],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def interpreter_start() -> float:
+    """Возвращает время запуска пустого интерпретатора в секундах."""
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "pass"], check=True)
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    """Печатает медианы фаз старта и проверяет бюджет."""
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    budget = float(sys.argv[2]) if len(sys.argv) > 2 else BUDGET_MS
+    with PracticumStandIn(make_homeworks(1)) as practicum:
+        run_child(practicum.url)  # прогрев файлового кэша и .pyc
+        results = [run_child(practicum.url) for _ in range(runs)]
+    python = median(interpreter_start() for _ in range(runs))
+    phases = {
+        phase: median(result[phase] for result in results) * 1000
+        for phase in ("import", "create", "poll", "total")
+    }
+    print(
+        f"запуск интерпретатора {python * 1000:.0f} мс, затем: "
+        f"import homework {phases['import']:.0f} мс, "
+        f"create_app и telegram.Bot {phases['create']:.0f} мс, "
+        f"первый опрос {phases['poll']:.0f} мс\n"
+        f"от импорта до первого опроса: {phases['total']:.0f} мс "
+        f"(бюджет {budget:.0f} мс)"
+    )
+    if phases["total"] > budget:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
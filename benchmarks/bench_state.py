@@ -0,0 +1,52 @@
+"""Бенчмарк записи состояния в SQLite для 10 тысяч подписок.
+
+Запуск: python -m benchmarks.bench_state [подписок] [циклов]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from status_bot.state import SqliteStateStore, StateBatch
+
+
+def make_batch(subscriptions: int, cycle: int) -> StateBatch:
+    """Строит пачку цикла: метки всех подписок и 5% смен статуса."""
+    batch = StateBatch()
+    for index in range(subscriptions):
+        key = f"{index}:key"
+        batch.watermark(key, 1_000_000 + cycle)
+        if index % 20 == cycle % 20:
+            batch.status(key, f"hw{cycle % 7}", "reviewing")
+    return batch
+
+
+def main() -> None:
+    """Печатает скорость записи пачек и время восстановления."""
+    subscriptions = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    cycles = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "state.sqlite3")
+        store = SqliteStateStore(path)
+        batches = [make_batch(subscriptions, cycle) for cycle in range(cycles)]
+        rows = sum(len(b.watermarks) + len(b.statuses) for b in batches)
+        started = time.perf_counter()
+        for batch in batches:
+            store.write(batch)
+        elapsed = time.perf_counter() - started
+        store.close()
+
+        started = time.perf_counter()
+        store = SqliteStateStore(path)
+        states = store.load()
+        restored = time.perf_counter() - started
+        store.close()
+    print(
+        f"{subscriptions} подписок: {elapsed / cycles * 1000:.1f} мс "
+        f"на пачку цикла, {rows / elapsed:.0f} строк/с"
+    )
+    print(f"восстановление {len(states)} подписок: {restored * 1000:.1f} мс")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Бенчмарк пиковой памяти: response.json() против HomeworkStream.
+
+Запуск: python -m benchmarks.bench_streaming
+"""
+import json
+import time
+import tracemalloc
+
+from status_bot.api import check_response, parse_status
+from status_bot.streaming import (DEFAULT_CHUNK_SIZE, HomeworkStream,
+                                  iter_messages)
+
+HOMEWORK = {
+    "id": 0,
+    "status": "approved",
+    "homework_name": "username__hw_python_oop.zip",
+    "reviewer_comment": "Всё нравится, работа зачтена. " * 4,
+    "date_updated": "2020-02-13T14:40:57Z",
+    "lesson_name": "Итоговый проект",
+}
+
+
+def generate_body(homeworks: int):
+    """Выдаёт тело ответа кусками, не держа его целиком в памяти."""
+    chunk = b'{"homeworks": ['
+    for index in range(homeworks):
+        item = json.dumps(
+            {**HOMEWORK, "id": index, "homework_name": f"hw{index}"},
+            ensure_ascii=False,
+        ).encode()
+        chunk += (b"," if index else b"") + item
+        if len(chunk) >= DEFAULT_CHUNK_SIZE:
+            yield chunk
+            chunk = b""
+    yield chunk + b'], "current_date": 1581604970}'
+
+
+def full_parse(homeworks: int) -> int:
+    """Повторяет путь response.json() + check_response + parse_status."""
+    body = b"".join(generate_body(homeworks))
+    response = json.loads(body)
+    return sum(1 for homework in check_response(response)
+               if parse_status(homework))
+
+
+def streamed_parse(homeworks: int) -> int:
+    """Разбирает тот же ответ потоково и лениво строит сообщения."""
+    stream = HomeworkStream(generate_body(homeworks))
+    return sum(1 for _ in iter_messages(stream))
+
+
+def measure(func, homeworks: int) -> tuple:
+    """Возвращает пиковую память в МБ и время в секундах."""
+    tracemalloc.start()
+    started = time.perf_counter()
+    func(homeworks)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 2**20, elapsed
+
+
+def main() -> None:
+    """Печатает пиковую память для нескольких размеров истории."""
+    for homeworks in (1_000, 10_000, 50_000):
+        for title, func in (("json()", full_parse), ("поток", streamed_parse)):
+            peak, elapsed = measure(func, homeworks)
+            print(
+                f"{homeworks} работ, {title}: пик {peak:.1f} МБ, "
+                f"{elapsed:.2f} с"
+            )
+
+
+if __name__ == "__main__":
+    main()
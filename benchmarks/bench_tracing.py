@@ -0,0 +1,73 @@
+"""Бенчмарк трассировки: цена спана при выключенной и включённой записи.
+
+Для этапа `check_response` на ответе из `работ` работ печатается время
+вызова без спана, со спаном при выключенной трассировке, с декоратором
+`traced` и со спаном при экспорте в память и в файл JSON lines. Для
+масштаба печатается и время вызова пустой функции.
+
+Запуск: python -m benchmarks.bench_tracing [вызовов] [работ]
+"""
+import os
+import sys
+import tempfile
+import timeit
+
+from benchmarks.stand_in import make_homeworks
+from status_bot import tracing
+from status_bot.api import check_response
+from status_bot.tracing import JsonLinesExporter, MemoryExporter
+
+
+def measure(function, calls: int) -> float:
+    """Возвращает лучшее из пяти измерений времени вызова, в нс."""
+    return min(timeit.repeat(function, number=calls, repeat=5)) / calls * 1e9
+
+
+def main() -> None:
+    """Печатает время вызова этапа в разных режимах трассировки."""
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    response = {"homeworks": make_homeworks(count), "current_date": 0}
+
+    def bare():
+        check_response(response)
+
+    def with_span():
+        with tracing.span("check_response"):
+            check_response(response)
+
+    traced = tracing.traced("check_response")(check_response)
+
+    def with_decorator():
+        traced(response)
+
+    def empty():
+        pass
+
+    tracing.configure(None)
+    results = [
+        ("без спана", measure(bare, calls)),
+        ("для сравнения: пустая функция", measure(empty, calls)),
+        ("span, трассировка выключена", measure(with_span, calls)),
+        ("traced, трассировка выключена", measure(with_decorator, calls)),
+    ]
+    memory = MemoryExporter()
+    tracing.configure(memory)
+    results.append(("span, экспорт в память", measure(with_span, calls)))
+    memory.spans.clear()
+    with tempfile.TemporaryDirectory() as directory:
+        exporter = JsonLinesExporter(os.path.join(directory, "spans.jsonl"))
+        tracing.configure(exporter)
+        results.append(
+            ("span, экспорт в JSON lines", measure(with_span, calls // 10))
+        )
+        tracing.configure(None)
+        exporter.shutdown()
+    base = results[0][1]
+    print(f"check_response на {count} работах, {calls} вызовов")
+    for name, elapsed in results:
+        print(f"{name:<32}{elapsed:>9.0f} нс  ({elapsed - base:+.0f} нс)")
+
+
+if __name__ == "__main__":
+    main()
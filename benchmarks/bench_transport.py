@@ -0,0 +1,58 @@
+"""Бенчмарк задержки запроса с переиспользованием соединений и без.
+
+Запуск: python -m benchmarks.bench_transport [запросов]
+"""
+import statistics
+import sys
+import time
+
+import requests
+import urllib3
+
+from benchmarks.stand_in import PracticumStandIn
+from status_bot import api
+from status_bot.transport import HttpPool
+
+
+def measure(fetch, requests_count: int) -> list:
+    """Возвращает задержки последовательных запросов в миллисекундах."""
+    latencies = []
+    for _ in range(requests_count):
+        started = time.perf_counter()
+        fetch()
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def main() -> None:
+    """Сравнивает requests.get и HttpPool на локальном HTTPS-сервере."""
+    requests_count = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+    headers = api.auth_headers("token")
+    with PracticumStandIn(tls=True) as server:
+        fresh = measure(
+            lambda: requests.get(
+                server.url,
+                headers=headers,
+                params={"from_date": 0},
+                verify=False,
+            ),
+            requests_count,
+        )
+        with HttpPool(verify=False) as pool:
+            pooled = measure(
+                lambda: api.fetch_api_answer(headers, 0, server.url, pool),
+                requests_count,
+            )
+    for title, latencies in (("новое соединение", fresh), ("пул", pooled)):
+        p99 = statistics.quantiles(latencies, n=100, method="inclusive")[98]
+        print(
+            f"{title}: медиана {statistics.median(latencies):.2f} мс, "
+            f"p99 {p99:.2f} мс"
+        )
+    gain = statistics.median(fresh) - statistics.median(pooled)
+    print(f"выигрыш на запрос: {gain:.2f} мс")
+
+
+if __name__ == "__main__":
+    main()
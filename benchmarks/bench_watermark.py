@@ -0,0 +1,115 @@
+"""Бенчмарк метки from_date: объём ответов API с перекрытием и без метки.
+
+Локальная замена API в режиме `incremental` отдаёт только работы,
+обновлённые не раньше from_date, а её часы — виртуальные: цикл опроса
+длится 600 с. За цикл ревьюер меняет статус `изменений` случайных
+работ из `работ`, у каждой комментарий в 300 байт. Изменение
+становится видно в API с задержкой до LAG секунд, но `date_updated`
+получает момент записи — так на границе цикла работа может оказаться
+старше `current_date` прошлого ответа.
+
+Сравниваются запросы с from_date=0 (вся история каждый раз) и запросы
+с меткой без перекрытия и с перекрытием `перекрытие` секунд.
+Печатаются объём ответов, число уведомлений и число смен статуса,
+которые видны между двумя опросами: повторов и пропусков быть не
+должно.
+
+Запуск: python -m benchmarks.bench_watermark [циклов] [работ]
+[изменений] [перекрытие, с]
+"""
+import random
+import sys
+
+from benchmarks.stand_in import PracticumStandIn, make_homeworks
+from status_bot import api
+from status_bot.clock import VirtualClock
+from status_bot.diff import StatusDiff
+from status_bot.watermark import Watermark
+
+CYCLE = 600
+LAG = 45
+STATUSES = ("reviewing", "approved", "rejected")
+
+
+def run(cycles: int, count: int, changes: int, watermark) -> dict:
+    """Прогоняет `cycles` циклов опроса и возвращает статистику.
+
+    При `watermark=None` каждый запрос уходит с from_date=0.
+    """
+    clock = VirtualClock(start=1_600_000_000)
+    randomizer = random.Random(7)
+    headers = api.auth_headers("token")
+    homeworks = make_homeworks(count, comment_size=300)
+    statuses = StatusDiff()
+    statuses.commit(statuses.pending(homeworks))
+    expected = notified = 0
+    timestamp = int(clock())
+    with PracticumStandIn(
+        homeworks, incremental=True, clock=clock,
+    ) as server:
+        for _ in range(cycles):
+            start = clock.now
+            before = [homework["status"] for homework in server.homeworks]
+            for offset in sorted(randomizer.sample(range(CYCLE), changes)):
+                clock.now = start + offset - randomizer.uniform(0, LAG)
+                server.touch(
+                    randomizer.randrange(count), randomizer.choice(STATUSES)
+                )
+            clock.now = start + CYCLE
+            expected += sum(
+                homework["status"] != status
+                for homework, status in zip(server.homeworks, before)
+            )
+            if watermark is None:
+                response = api.fetch_api_answer(headers, 0, server.url)
+                homeworks = response["homeworks"]
+            else:
+                response = api.fetch_api_answer(
+                    headers, watermark.request_from(timestamp), server.url
+                )
+                homeworks = watermark.fresh(response["homeworks"])
+            transitions = statuses.pending(homeworks)
+            statuses.commit(transitions)
+            notified += len(transitions)
+            if watermark is not None:
+                timestamp = watermark.advance(timestamp, response)
+                watermark.commit(timestamp)
+        return {
+            "bytes": server.bytes_sent,
+            "requests": server.requests,
+            "notified": notified,
+            "expected": expected,
+        }
+
+
+def main() -> None:
+    """Сравнивает полные ответы и ответы по метке."""
+    cycles = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+    changes = int(sys.argv[3]) if len(sys.argv) > 3 else 2
+    overlap = int(sys.argv[4]) if len(sys.argv) > 4 else 60
+    print(
+        f"{cycles} циклов по {CYCLE} с, {count} работ, "
+        f"{changes} изменения за цикл, задержка записи до {LAG} с, "
+        f"перекрытие {overlap} с"
+    )
+    print(
+        f"{'режим':<24}{'КиБ':>10}{'Б/запрос':>10}"
+        f"{'уведомлений':>13}{'ожидалось':>11}"
+    )
+    modes = [
+        ("from_date=0", None),
+        ("метка без перекрытия", Watermark(0)),
+        ("метка с перекрытием", Watermark(overlap)),
+    ]
+    for name, watermark in modes:
+        result = run(cycles, count, changes, watermark)
+        print(
+            f"{name:<24}{result['bytes'] / 1024:>10.1f}"
+            f"{result['bytes'] / result['requests']:>10.0f}"
+            f"{result['notified']:>13}{result['expected']:>11}"
+        )
+
+
+if __name__ == "__main__":
+    main()
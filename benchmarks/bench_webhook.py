@@ -0,0 +1,82 @@
+"""Бенчмарк вебхука: сколько обновлений в секунду принимает бот.
+
+Локальная замена Telegram шлёт POST с командами /status по нескольким
+keep-alive соединениям, как это делает Bot API (max_connections).
+
+Запуск: python -m benchmarks.bench_webhook [обновлений] [соединений]
+"""
+import http.client
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.bench_e2e import percentiles
+from status_bot.commands import Commands, SnapshotCache, UpdateDispatcher
+from status_bot.webhook import SECRET_HEADER, WebhookServer
+
+SECRET = "benchmark-secret"
+
+
+def post_updates(address, updates: range, latencies: list) -> int:
+    """Отправляет обновления по одному соединению, возвращает число 200."""
+    connection = http.client.HTTPConnection(*address)
+    accepted = 0
+    for update_id in updates:
+        body = json.dumps({
+            "update_id": update_id,
+            "message": {"chat": {"id": update_id % 100}, "text": "/status"},
+        }).encode()
+        started = time.perf_counter()
+        connection.request("POST", "/telegram", body, {
+            "Content-Type": "application/json",
+            SECRET_HEADER: SECRET,
+        })
+        response = connection.getresponse()
+        response.read()
+        latencies.append(time.perf_counter() - started)
+        accepted += response.status == 200
+    connection.close()
+    return accepted
+
+
+def main() -> None:
+    """Печатает пропускную способность и задержку подтверждения."""
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    connections = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+    homeworks = [{"homework_name": "hw1", "status": "approved"}]
+    dispatcher = UpdateDispatcher(
+        Commands(
+            {chat_id: "token" for chat_id in range(100)},
+            SnapshotCache(lambda token: homeworks),
+        ),
+        lambda chat_id, text: None,
+        backlog=total,
+    )
+    server = WebhookServer(dispatcher, SECRET, host="127.0.0.1").start()
+    latencies = []
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=connections) as pool:
+        accepted = sum(pool.map(
+            lambda index: post_updates(
+                server.server_address,
+                range(index, total, connections),
+                latencies,
+            ),
+            range(connections),
+        ))
+    dispatcher.close()
+    elapsed = time.perf_counter() - started
+    server.close()
+    acknowledged = percentiles(latencies)
+    print(
+        f"{total} обновлений по {connections} соединениям за {elapsed:.1f} с: "
+        f"{total / elapsed:.0f} обновлений/с, принято {accepted}, "
+        f"отвечено {dispatcher.answered}\n"
+        f"  подтверждение: p50 {acknowledged[49] * 1000:.2f} мс, "
+        f"p99 {acknowledged[98] * 1000:.2f} мс"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""Симуляция main() на виртуальных часах по записанной истории API.
+
+ScriptedApi отвечает вместо API Практикума по сценарию: смены статусов
+работ и сбои в заданные моменты. RecordingBot записывает, когда ушло
+каждое сообщение. `simulate` гоняет PollLoop из homework с VirtualClock:
+пауза RETRY_PERIOD только сдвигает часы, поэтому недели опроса
+проходят за доли секунды, а результат при одном сценарии всегда один.
+"""
+import random
+import time
+from collections import defaultdict, deque, namedtuple
+from itertools import zip_longest
+
+import homework
+from status_bot.api import ApiStatusError, render_message
+from status_bot.clock import VirtualClock
+from status_bot.deadline import DeadlineExceeded
+from status_bot.state import open_state_store
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+# Смена статуса работы `name` в момент `at` (секунды от начала).
+StatusChange = namedtuple("StatusChange", ("at", "name", "status"))
+# Сбой API на `duration` секунд с момента `at`. Виды: "5xx", "network",
+# "timeout" и "no_date" (ответ без current_date).
+Outage = namedtuple("Outage", ("at", "duration", "kind"))
+
+Report = namedtuple("Report", (
+    "latencies", "missed", "api_calls", "failures_reported",
+    "resolved_reported", "simulated", "elapsed",
+))
+
+
+def iso(timestamp: float) -> str:
+    """Возвращает время Unix в формате date_updated API."""
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(timestamp))
+
+
+class ScriptedApi:
+    """Замена get_api_answer, отвечающая по сценарию `timeline`.
+
+    Каждый запрос занимает `latency` виртуальных секунд. Ответ, как
+    у настоящего API, содержит только работы, обновлённые не раньше
+    from_date, и `current_date` — виртуальное время Unix.
+    """
+
+    def __init__(self, clock: VirtualClock, timeline, latency: float = 0.0):
+        """Раскладывает сценарий на смены статусов и сбои."""
+        self.clock = clock
+        self.latency = latency
+        self.calls = 0
+        self._changes = deque(sorted(
+            (event for event in timeline if isinstance(event, StatusChange)),
+            key=lambda event: event.at,
+        ))
+        self._outages = [
+            event for event in timeline if isinstance(event, Outage)
+        ]
+        self._homeworks = {}
+
+    def _outage(self, now: float):
+        """Возвращает сбой, идущий в момент `now`, или None."""
+        for outage in self._outages:
+            if outage.at <= now < outage.at + outage.duration:
+                return outage
+        return None
+
+    def __call__(self, timestamp: int) -> dict:
+        """Отвечает на запрос с from_date=`timestamp`."""
+        self.calls += 1
+        self.clock.sleep(self.latency)
+        now = self.clock()
+        changes = self._changes
+        while changes and changes[0].at <= now:
+            change = changes.popleft()
+            updated = self.clock.epoch + change.at
+            self._homeworks[change.name] = (int(updated), {
+                "homework_name": change.name,
+                "status": change.status,
+                "date_updated": iso(updated),
+            })
+        outage = self._outage(now)
+        kind = outage.kind if outage else None
+        if kind == "5xx":
+            raise ApiStatusError("API домашки вернуло код 503", 503)
+        if kind == "network":
+            raise SystemError("Соединение с API домашки разорвано")
+        if kind == "timeout":
+            raise DeadlineExceeded("Срок запроса истёк")
+        response = {"homeworks": [
+            homework for updated, homework in self._homeworks.values()
+            if updated >= timestamp
+        ]}
+        if kind != "no_date":
+            response["current_date"] = int(self.clock.time())
+        return response
+
+
+class RecordingBot:
+    """Замена telegram.Bot: запоминает время и текст сообщений."""
+
+    def __init__(self, clock: VirtualClock):
+        """Создаёт пустой журнал сообщений по часам `clock`."""
+        self.clock = clock
+        self.messages = []
+
+    def send_message(self, chat_id, text: str) -> None:
+        """Записывает сообщение с текущим виртуальным временем."""
+        self.messages.append((self.clock(), text))
+
+
+def time_to_notify(timeline, messages) -> tuple:
+    """Сопоставляет смены статусов с уведомлениями.
+
+    Уведомление о смене засчитывается, только если пришло до следующей
+    смены статуса той же работы: позже опрос видит уже новый статус.
+    Возвращает задержки уведомлений в секундах и число смен, о которых
+    уведомления не было.
+    """
+    sent = defaultdict(deque)
+    for moment, text in messages:
+        sent[text].append(moment)
+    history = defaultdict(list)
+    for event in sorted(timeline, key=lambda event: event.at):
+        if isinstance(event, StatusChange):
+            history[event.name].append(event)
+    latencies = []
+    missed = 0
+    for changes in history.values():
+        for change, following in zip_longest(changes, changes[1:]):
+            until = following.at if following else float("inf")
+            moments = sent[render_message(change.name, change.status)]
+            while moments and moments[0] < change.at:
+                moments.popleft()
+            if moments and moments[0] < until:
+                latencies.append(moments.popleft() - change.at)
+            else:
+                missed += 1
+    return latencies, missed
+
+
+def simulate(timeline, duration: float, latency: float = 0.0) -> Report:
+    """Прогоняет цикл main() `duration` виртуальных секунд по сценарию."""
+    started = time.perf_counter()
+    clock = VirtualClock()
+    api = ScriptedApi(clock, timeline, latency)
+    bot = RecordingBot(clock)
+    store = open_state_store("memory")
+    loop = homework.PollLoop(bot, store, fetch=api, clock=clock)
+    while clock() < duration:
+        loop.cycle()
+        clock.sleep(homework.RETRY_PERIOD)
+    store.close()
+    latencies, missed = time_to_notify(timeline, bot.messages)
+    texts = [text for _, text in bot.messages]
+    return Report(
+        latencies=latencies,
+        missed=missed,
+        api_calls=api.calls,
+        failures_reported=sum(
+            text.startswith("Сбой в работе программы") for text in texts
+        ),
+        resolved_reported=texts.count(homework.RESOLVED_MESSAGE),
+        simulated=clock(),
+        elapsed=time.perf_counter() - started,
+    )
+
+
+def random_timeline(randomizer: random.Random, days: int) -> list:
+    """Возвращает случайный сценарий: сдачи работ, проверки и сбои.
+
+    Работа берётся на проверку в среднем раз в двое суток, проверка
+    длится 0,5–6 ч, а с вероятностью 0,4 работа возвращается и через
+    несколько часов снова уходит на проверку. Сбои API случаются
+    в среднем раз в сутки и длятся 5–60 минут.
+    """
+    horizon = days * DAY
+    events = []
+    now = randomizer.expovariate(1 / (2 * DAY))
+    number = 0
+    while now < horizon:
+        name = f"student__hw{number}.zip"
+        events.append(StatusChange(now, name, "reviewing"))
+        now += randomizer.uniform(0.5 * HOUR, 6 * HOUR)
+        if randomizer.random() < 0.4:
+            events.append(StatusChange(now, name, "rejected"))
+            now += randomizer.expovariate(1 / (4 * HOUR))
+            continue
+        events.append(StatusChange(now, name, "approved"))
+        number += 1
+        now += randomizer.expovariate(1 / (2 * DAY))
+    now = randomizer.expovariate(1 / DAY)
+    while now < horizon:
+        events.append(Outage(
+            now,
+            randomizer.uniform(300, HOUR),
+            randomizer.choice(("5xx", "network", "timeout", "no_date")),
+        ))
+        now += randomizer.expovariate(1 / DAY)
+    return [event for event in events if event.at < horizon]
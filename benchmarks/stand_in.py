@@ -0,0 +1,408 @@
+"""Локальные замены API Практикума, Telegram Bot API и коллектора OTLP."""
+import calendar
+import json
+import os
+import random
+import ssl
+import subprocess
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+def make_homeworks(
+    count: int, status: str = "reviewing", comment_size: int = 0
+) -> list:
+    """Создаёт `count` работ; `comment_size` задаёт объём комментария."""
+    return [
+        {
+            "id": index,
+            "homework_name": f"student__hw{index}.zip",
+            "status": status,
+            "reviewer_comment": "x" * comment_size,
+            "date_updated": "2020-02-13T14:40:57Z",
+        }
+        for index in range(count)
+    ]
+
+
+class _Faults:
+    """Задержка, зависания и доля ответов с ошибкой для локальной замены."""
+
+    def __init__(
+        self,
+        latency: float,
+        error_rate: float,
+        seed: int,
+        stall_rate: float = 0.0,
+        stall: float = 0.0,
+    ):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.stall_rate = stall_rate
+        self.stall = stall
+        self.errors = 0
+        self.stalls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def stall_for(self) -> float:
+        """Решает, зависнет ли ответ, и возвращает длительность зависания."""
+        if not self.stall_rate:
+            return 0.0
+        with self._lock:
+            stalled = self._random.random() < self.stall_rate
+            self.stalls += stalled
+        return self.stall if stalled else 0.0
+
+    def inject(self) -> bool:
+        """Выдерживает задержку и решает, ответить ли ошибкой."""
+        if self.latency:
+            time.sleep(self.latency)
+        if not self.error_rate:
+            return False
+        with self._lock:
+            failed = self._random.random() < self.error_rate
+            self.errors += failed
+        return failed
+
+
+def _write_json(handler, status: int, body: dict) -> None:
+    """Отправляет JSON-ответ с заданным кодом."""
+    data = json.dumps(body).encode()
+    handler.send_response(status)
+    handler.send_header("Content-Type", "application/json")
+    handler.send_header("Content-Length", str(len(data)))
+    handler.end_headers()
+    handler.wfile.write(data)
+
+
+def self_signed_certificate() -> tuple:
+    """Создаёт самоподписанный сертификат для 127.0.0.1 через openssl."""
+    directory = tempfile.mkdtemp(prefix="stand-in-")
+    certfile = os.path.join(directory, "cert.pem")
+    keyfile = os.path.join(directory, "key.pem")
+    subprocess.run(
+        [
+            "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes",
+            "-days", "1", "-subj", "/CN=127.0.0.1",
+            "-keyout", keyfile, "-out", certfile,
+        ],
+        check=True,
+        capture_output=True,
+    )
+    return certfile, keyfile
+
+
+class _PracticumHandler(BaseHTTPRequestHandler):
+    """Отдаёт ответ homework_statuses для любого GET-запроса."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        """Формирует ответ с текущим временем сервера."""
+        server = self.server
+        server.requests += 1
+        if server.faults.inject():
+            _write_json(self, 500, {"message": "Internal Server Error"})
+            return
+        body = json.dumps({
+            "homeworks": server.since(self.path),
+            "current_date": int(server.clock()),
+        }).encode()
+        server.bytes_sent += len(body)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        stall = server.faults.stall_for()
+        if stall:
+            # Заголовки и половина тела уже ушли, остальное — после паузы,
+            # как у сервера, который завис посреди ответа.
+            half = len(body) // 2
+            self.wfile.write(body[:half])
+            self.wfile.flush()
+            time.sleep(stall)
+            body = body[half:]
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """Не засоряет вывод бенчмарка журналом запросов."""
+
+
+class PracticumStandIn(ThreadingHTTPServer):
+    """HTTP-сервер в фоновом потоке, имитирующий API Практикума.
+
+    Доля `error_rate` запросов получает ответ 500, а доля `stall_rate`
+    зависает на `stall` секунд посреди тела ответа; `set_status` меняет
+    статус всех работ и запоминает момент изменения в `changed_at`.
+
+    При `incremental=True`, как настоящий API, отдаёт только работы
+    с `date_updated` не раньше from_date запроса; `current_date`
+    и `date_updated` из `touch` берутся из `clock`. Объём отданных тел
+    копится в `bytes_sent`.
+    """
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(
+        self,
+        homeworks=None,
+        latency: float = 0.0,
+        tls: bool = False,
+        error_rate: float = 0.0,
+        seed: int = 0,
+        stall_rate: float = 0.0,
+        stall: float = 0.0,
+        incremental: bool = False,
+        clock=time.time,
+    ):
+        """Занимает свободный порт; `homeworks` — работы в ответах."""
+        super().__init__(("127.0.0.1", 0), _PracticumHandler)
+        self.homeworks = homeworks or []
+        self.incremental = incremental
+        self.clock = clock
+        self.bytes_sent = 0
+        self.faults = _Faults(latency, error_rate, seed, stall_rate, stall)
+        self.changed_at = None
+        self.changes = 0
+        self.requests = 0
+        self.tls = tls
+        if tls:
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            context.load_cert_chain(*self_signed_certificate())
+            self.socket = context.wrap_socket(self.socket, server_side=True)
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+    def set_status(self, status: str) -> None:
+        """Переводит все работы в статус `status`.
+
+        Как и настоящий API, обновляет `date_updated` работ.
+        """
+        # Каждая смена получает свою секунду, даже если их несколько
+        # за одну настоящую секунду.
+        self.changes += 1
+        date_updated = time.strftime(
+            "%Y-%m-%dT%H:%M:%SZ", time.gmtime(1_580_000_000 + self.changes)
+        )
+        self.homeworks = [
+            dict(homework, status=status, date_updated=date_updated)
+            for homework in self.homeworks
+        ]
+        self.changed_at = time.monotonic()
+
+    def touch(self, index: int, status: str) -> None:
+        """Меняет статус работы `index`, как ревьюер в момент `clock()`."""
+        self.homeworks[index] = dict(
+            self.homeworks[index],
+            status=status,
+            date_updated=time.strftime(
+                "%Y-%m-%dT%H:%M:%SZ", time.gmtime(self.clock())
+            ),
+        )
+
+    def since(self, path: str) -> list:
+        """Возвращает работы для запроса `path` с учётом from_date."""
+        if not self.incremental:
+            return self.homeworks
+        query = parse_qs(urlsplit(path).query)
+        from_date = int(query.get("from_date", ["0"])[0])
+        return [
+            homework for homework in self.homeworks
+            if calendar.timegm(time.strptime(
+                homework["date_updated"], "%Y-%m-%dT%H:%M:%SZ"
+            )) >= from_date
+        ]
+
+    @property
+    def url(self) -> str:
+        """Адрес эндпоинта homework_statuses."""
+        host, port = self.server_address
+        scheme = "https" if self.tls else "http"
+        return f"{scheme}://{host}:{port}/api/user_api/homework_statuses/"
+
+    def __enter__(self):
+        """Запускает сервер в фоновом потоке."""
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        """Останавливает сервер."""
+        self.shutdown()
+        self.server_close()
+
+
+class _TelegramHandler(BaseHTTPRequestHandler):
+    """Принимает POST /bot<токен>/sendMessage и соблюдает лимиты Telegram."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        """Отвечает как Bot API: сообщением или ошибкой 429."""
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        chat_id = payload.get("chat_id")
+        self.server.requests += 1
+        if self.server.faults.inject():
+            _write_json(self, 500, {
+                "ok": False,
+                "error_code": 500,
+                "description": "Internal Server Error",
+            })
+            return
+        retry_after = self.server.admit(chat_id)
+        if retry_after:
+            status, body = 429, {
+                "ok": False,
+                "error_code": 429,
+                "description": f"Too Many Requests: retry after {retry_after}",
+                "parameters": {"retry_after": retry_after},
+            }
+        else:
+            status, body = 200, {
+                "ok": True,
+                "result": {
+                    "message_id": self.server.delivered,
+                    "date": int(time.time()),
+                    "chat": {"id": int(chat_id), "type": "private"},
+                    "text": payload.get("text", ""),
+                },
+            }
+        _write_json(self, status, body)
+
+    def log_message(self, format, *args):
+        """Не засоряет вывод бенчмарка журналом запросов."""
+
+
+class TelegramStandIn(ThreadingHTTPServer):
+    """Локальная замена Bot API с лимитами на бота и на чат.
+
+    Сообщение сверх `global_rate` в секунду или чаще `per_chat_rate`
+    в секунду для одного чата получает ответ 429 с `retry_after`.
+    Моменты приёма сообщений копятся в `received` как (chat_id, время).
+    """
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(
+        self,
+        global_rate: float = 30,
+        per_chat_rate: float = 1,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        seed: int = 0,
+    ):
+        """Занимает свободный порт с лимитами отправки Telegram."""
+        super().__init__(("127.0.0.1", 0), _TelegramHandler)
+        self.global_rate = global_rate
+        self.per_chat_rate = per_chat_rate
+        self.faults = _Faults(latency, error_rate, seed)
+        self.requests = 0
+        self.delivered = 0
+        self.rejected = 0
+        self.messages = {}
+        self.received = []
+        self._window = []
+        self._last_by_chat = {}
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        """Значение base_url для telegram.Bot."""
+        host, port = self.server_address
+        return f"http://{host}:{port}/bot"
+
+    def admit(self, chat_id) -> int:
+        """Возвращает 0, если сообщение принято, иначе retry_after."""
+        now = time.monotonic()
+        with self._lock:
+            self._window = [t for t in self._window if now - t < 1]
+            last = self._last_by_chat.get(chat_id)
+            # Небольшой допуск на дрожание таймеров отправителя.
+            too_often = (
+                last is not None and now - last < 0.9 / self.per_chat_rate
+            )
+            if len(self._window) >= self.global_rate or too_often:
+                self.rejected += 1
+                return 1
+            self._window.append(now)
+            self._last_by_chat[chat_id] = now
+            self.delivered += 1
+            self.messages[chat_id] = self.messages.get(chat_id, 0) + 1
+            self.received.append((chat_id, now))
+            return 0
+
+    def __enter__(self):
+        """Запускает сервер в фоновом потоке."""
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        """Останавливает сервер."""
+        self.shutdown()
+        self.server_close()
+
+
+class _CollectorHandler(BaseHTTPRequestHandler):
+    """Принимает POST /v1/traces с телом OTLP/JSON."""
+
+    def do_POST(self):
+        """Сохраняет спаны из запроса и отвечает пустым JSON."""
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        if self.path != "/v1/traces":
+            _write_json(self, 404, {})
+            return
+        spans = [
+            span
+            for resource in payload.get("resourceSpans", [])
+            for scope in resource.get("scopeSpans", [])
+            for span in scope.get("spans", [])
+        ]
+        with self.server.lock:
+            self.server.requests += 1
+            self.server.spans.extend(spans)
+        _write_json(self, 200, {})
+
+    def log_message(self, format, *args):
+        """Не засоряет вывод журналом запросов."""
+
+
+class OtlpCollectorStandIn(ThreadingHTTPServer):
+    """Локальная замена коллектора OpenTelemetry (OTLP/HTTP, JSON).
+
+    Принятые спаны в кодировке OTLP копятся в `spans`.
+    """
+
+    daemon_threads = True
+
+    def __init__(self):
+        """Занимает свободный порт для приёма спанов."""
+        super().__init__(("127.0.0.1", 0), _CollectorHandler)
+        self.requests = 0
+        self.spans = []
+        self.lock = threading.Lock()
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        """Адрес коллектора для OtlpExporter."""
+        host, port = self.server_address
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        """Запускает сервер в фоновом потоке."""
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        """Останавливает сервер."""
+        self.shutdown()
+        self.server_close()
@@ -1,39 +1,119 @@
+import atexit
 import logging
 import os
+import secrets
 import sys
 import time
-from http import HTTPStatus
-from logging import StreamHandler
+from functools import lru_cache, partial
 
-import requests
-import telegram
-from dotenv import load_dotenv
-from requests import RequestException
+from status_bot.api import (ENDPOINT, HOMEWORK_VERDICTS,  # noqa: F401
+                            check_response, fetch_api_answer, is_outage,
+                            parse_status)
+from status_bot import tracing
+from status_bot.breaker import CircuitBreaker, CircuitOpenError
+from status_bot.clock import SYSTEM_CLOCK
+from status_bot.commands import SnapshotCache, snapshot_fetcher
+from status_bot.deadline import Deadline, Hedger
+from status_bot.dedup import RESOLVED_MESSAGE, ErrorDedup
+from status_bot.diff import StatusDiff
+from status_bot.lazy import LazyModule
+from status_bot.lease import lease_term
+from status_bot.metrics import (CHECK_RESPONSE_LATENCY, NOTIFICATIONS,
+                                PARSE_STATUS_LATENCY, SEND_LATENCY,
+                                TELEGRAM_ERRORS, start_metrics_server)
+from status_bot.outbox import OutboxDispatcher
+from status_bot.state import (StateBatch, SubscriptionState,
+                              notification_key, open_state_store,
+                              subscription_key)
+from status_bot.watermark import Watermark
 
-load_dotenv()
+# python-telegram-bot тянет за собой большое дерево зависимостей, поэтому
+# импортируется при первом обращении. Модули, которые нужны только
+# отдельным режимам (asyncio, multiprocessing, вебхук), импортируются
+# внутри функций этих режимов.
+telegram = LazyModule("telegram")
+
+if __name__ == "__main__":
+    # .env читается только при запуске бота. Процессы-шарды наследуют
+    # окружение родителя, а импорт модуля в тестах его не трогает.
+    from dotenv import load_dotenv
+    load_dotenv()
 
 
 PRACTICUM_TOKEN = os.getenv("PRACTICUM_TOKEN")
 TELEGRAM_TOKEN = os.getenv("TELEGRAM_TOKEN")
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
 
+SUBSCRIPTIONS_FILE = os.getenv("SUBSCRIPTIONS_FILE")
+POLL_CONCURRENCY = int(os.getenv("POLL_CONCURRENCY", 64))
+WORKERS = int(os.getenv("WORKERS", 1))
+LEASE_TTL = float(os.getenv("LEASE_TTL", 0))
+STATE_DB = os.getenv("STATE_DB", "bot_state.sqlite3")
+METRICS_PORT = os.getenv("METRICS_PORT")
+ERROR_WINDOW = int(os.getenv("ERROR_WINDOW", 3600))
+BOT_COMMANDS = os.getenv("BOT_COMMANDS")
+COMMAND_WORKERS = 4
+WEBHOOK_URL = os.getenv("WEBHOOK_URL")
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", 8443))
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")
+LOG_ASYNC = os.getenv("LOG_ASYNC", "").lower() in ("1", "true", "yes")
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", 10000))
+LOG_DEBUG_EVERY = int(os.getenv("LOG_DEBUG_EVERY", 1))
+TRACING = os.getenv("TRACING", "")
+API_DEADLINE = float(os.getenv("API_DEADLINE", 60))
+CYCLE_DEADLINE = float(os.getenv("CYCLE_DEADLINE", 300))
+WATERMARK_OVERLAP = int(os.getenv("WATERMARK_OVERLAP", 60))
+API_HEDGING = os.getenv("API_HEDGING", "").lower() in ("1", "true", "yes")
+API_KEEPALIVE = os.getenv("API_KEEPALIVE", "").lower() in (
+    "1", "true", "yes"
+)
+API_STREAMING = os.getenv("API_STREAMING", "").lower() in (
+    "1", "true", "yes"
+)
+ADAPTIVE_POLLING = os.getenv("ADAPTIVE_POLLING", "").lower() in (
+    "1", "true", "yes"
+)
+POLL_ACTIVE_PERIOD = float(os.getenv("POLL_ACTIVE_PERIOD", 120))
+POLL_IDLE_CEILING = float(os.getenv("POLL_IDLE_CEILING", 1200))
+API_REQUESTS_PER_MINUTE = float(os.getenv("API_REQUESTS_PER_MINUTE", 0))
+
 RETRY_PERIOD = 600
-ENDPOINT = "https://practicum.yandex.ru/api/user_api/homework_statuses/"
 HEADERS = {"Authorization": f"OAuth {PRACTICUM_TOKEN}"}
 
-HOMEWORK_VERDICTS = {
-    "approved": "Работа проверена: ревьюеру всё понравилось. Ура!",
-    "reviewing": "Работа взята на проверку ревьюером.",
-    "rejected": "Работа проверена: у ревьюера есть замечания.",
-}
-
 
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
-handler = StreamHandler(stream=sys.stdout)
-formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
-handler.setFormatter(formatter)
-logger.addHandler(handler)
+
+
+def configure_logging() -> None:
+    """Направляет журнал бота в stdout; повторный вызов ничего не меняет."""
+    if logger.handlers:
+        return
+    from status_bot.logs import setup_logging
+    setup_logging(
+        (logger, logging.getLogger("status_bot")),
+        sys.stdout,
+        json_format=LOG_FORMAT == "json",
+        asynchronous=LOG_ASYNC,
+        queue_size=LOG_QUEUE_SIZE,
+        debug_every=LOG_DEBUG_EVERY,
+    )
+
+
+def configure_tracing():
+    """Включает трассировку, если задан TRACING.
+
+    Возвращает новый экспортёр или None, если TRACING не задан или
+    трассировка уже включена: повторный вызов ничего не меняет.
+    """
+    if tracing.current_exporter() is not None:
+        return None
+    exporter = tracing.open_exporter(TRACING)
+    if exporter is None:
+        return None
+    tracing.configure(exporter)
+    atexit.register(exporter.shutdown)
+    return exporter
 
 
 def check_tokens() -> None:
@@ -41,67 +121,266 @@ def check_tokens() -> None:
     return all([PRACTICUM_TOKEN, TELEGRAM_TOKEN, TELEGRAM_CHAT_ID])
 
 
-def send_message(bot, message: str) -> None:
-    """Отправляет сообщение в Telegram чат."""
+def send_to_chat(bot, chat_id, message: str) -> bool:
+    """Отправляет сообщение в указанный Telegram чат.
+
+    Возвращает False, если Telegram вернул ошибку или выключатель
+    Telegram разомкнут.
+    """
     try:
-        bot.send_message(TELEGRAM_CHAT_ID, message)
+        with SEND_LATENCY.time():
+            bot.send_message(chat_id, message)
+        NOTIFICATIONS.inc()
         logger.debug("Cообщение в Telegram чат отправлено.")
+    except CircuitOpenError as error:
+        logger.warning(error, extra={"chat_id": chat_id, "stage": "send"})
+        return False
     except telegram.TelegramError as error:
-        logger.error(error)
+        TELEGRAM_ERRORS.labels(type(error).__name__).inc()
+        logger.error(error, extra={"chat_id": chat_id, "stage": "send"})
+        return False
+    return True
+
+
+def send_message(bot, message: str) -> bool:
+    """Отправляет сообщение в Telegram чат."""
+    return send_to_chat(bot, TELEGRAM_CHAT_ID, message)
+
+
+def outbox_sender(bot):
+    """Возвращает отправку для outbox: при ошибке сообщение остаётся."""
+    def send(chat_id, message: str) -> None:
+        if send_message(bot, message) is False:
+            raise telegram.TelegramError("сообщение не отправлено")
+    return send
+
+
+def is_telegram_outage(error: Exception) -> bool:
+    """Проверяет, говорит ли ошибка о недоступности Telegram."""
+    return isinstance(error, telegram.error.NetworkError) and not isinstance(
+        error, telegram.error.BadRequest
+    )
+
+
+class GuardedBot:
+    """Бот, который отправляет сообщения через выключатель `breaker`."""
+
+    __slots__ = ("bot", "breaker")
+
+    def __init__(self, bot, breaker: CircuitBreaker):
+        """Запоминает бота и выключатель Telegram."""
+        self.bot = bot
+        self.breaker = breaker
+
+    def send_message(self, *args, **kwargs):
+        """Вызывает `bot.send_message` через выключатель."""
+        return self.breaker.call(self.bot.send_message, *args, **kwargs)
+
+
+@lru_cache(maxsize=None)
+def api_hedger(workers: int = 2) -> Hedger:
+    """Возвращает общий Hedger для запросов к API.
+
+    Дубли медленных запросов включает API_HEDGING; без него Hedger
+    только ограничивает ожидание ответа сроком API_DEADLINE.
+    """
+    return Hedger(quantile=0.95 if API_HEDGING else None, workers=workers)
 
 
 def get_api_answer(timestamp: int) -> dict:
-    """Делает запрос к эндпоинту API-сервиса."""
-    ENDPOINT_DICT = {
-        "url": ENDPOINT,
-        "headers": HEADERS,
-        "params": {"from_date": timestamp},
-    }
-    try:
-        response = requests.get(**ENDPOINT_DICT)
-    except RequestException as error:
-        raise SystemError(error)
-    if response.status_code != HTTPStatus.OK:
-        error = (
-            "При проверке статуса сервера, API домашки возвращает"
-            f"код {response.status_code}, отличный от {HTTPStatus.OK}."
-            f"Параметры запроса: {ENDPOINT_DICT}"
-            f"Ответ API: {response.content}"
+    """Делает запрос к эндпоинту API-сервиса не дольше API_DEADLINE."""
+    return request_api_answer(timestamp)
+
+
+def request_api_answer(timestamp: int, session=None) -> dict:
+    """Как get_api_answer, но через пул соединений `session` (HttpPool).
+
+    Без `session` запрос идёт через `requests.get`.
+    """
+    return fetch_api_answer(
+        HEADERS,
+        timestamp,
+        session=session,
+        deadline=Deadline(API_DEADLINE),
+        hedger=api_hedger(),
+    )
+
+
+def start_commands(bot, tokens: dict, snapshots: SnapshotCache):
+    """Запускает ответы на /status и /list через вебхук или getUpdates."""
+    if not (BOT_COMMANDS or WEBHOOK_URL):
+        return None
+    from telegram.utils.request import Request
+
+    from status_bot.commands import (CommandPoller, Commands,
+                                     UpdateDispatcher)
+    from status_bot.webhook import WebhookServer, register_webhook
+
+    if bot is None:
+        bot = telegram.Bot(
+            token=TELEGRAM_TOKEN,
+            request=Request(con_pool_size=COMMAND_WORKERS + 1),
         )
-        raise Exception(error)
-    return response.json()
+    commands = Commands(tokens, snapshots)
+    if WEBHOOK_URL:
+        secret = WEBHOOK_SECRET or secrets.token_urlsafe(32)
+        server = WebhookServer(
+            UpdateDispatcher(commands, bot.send_message, COMMAND_WORKERS),
+            secret,
+            port=WEBHOOK_PORT,
+        ).start()
+        register_webhook(bot, WEBHOOK_URL, secret)
+        return server
+    return CommandPoller(bot, commands, workers=COMMAND_WORKERS).start()
+
+
+def load_state(store, key: str, clock=SYSTEM_CLOCK) -> tuple:
+    """Читает метку from_date и статусы работ подписки из хранилища."""
+    state = store.load().get(key, SubscriptionState(int(clock.time()), {}))
+    return state.from_date, StatusDiff(statuses=state.statuses)
+
+
+def start_lease(name: str):
+    """Запускает аренду `name`, если задан LEASE_TTL, иначе None."""
+    if not LEASE_TTL:
+        return None
+    from status_bot.lease import Lease, open_lease_store
+
+    return Lease(open_lease_store(STATE_DB), name, ttl=LEASE_TTL).start()
 
 
-def check_response(response: dict) -> list:
-    """Проверяет ответ API на соответствие документации."""
-    if not isinstance(response, dict):
-        raise TypeError(
-            f"В ответе был получен объект типа {type(response)},"
-            "ожидался объект типа dict"
+def notify_transitions(key: str, statuses, homeworks, snapshots) -> tuple:
+    """Кладёт уведомления о сменах статусов в outbox изменений состояния.
+
+    Возвращает изменения состояния и переходы. Статусы в `statuses`
+    не меняются: их запоминает `statuses.commit` после записи.
+    """
+    batch = StateBatch()
+    with PARSE_STATUS_LATENCY.time(), tracing.span("parse_status"):
+        transitions = statuses.pending(homeworks)
+    for homework, status, message in transitions:
+        batch.status(key, homework.get("homework_name"), status)
+        batch.add_pending(
+            key, TELEGRAM_CHAT_ID, message, notification_key(key, homework)
+        )
+    if transitions:
+        snapshots.invalidate(PRACTICUM_TOKEN)
+    else:
+        logger.debug("У текущей домашки нет нового статуса")
+    return batch, transitions
+
+
+class PollLoop:
+    """Цикл опроса main() для одной подписки из переменных окружения.
+
+    Хранит между циклами метку from_date, статусы работ, срок аренды
+    и отпечатки сообщённых ошибок. Запросы к API и отправка в Telegram
+    идут через выключатели `api_breaker` и `telegram_breaker`: пока
+    цепь разомкнута, цикл пропускается без запроса, а сообщения
+    остаются в outbox. Время берётся из `clock`: с
+    VirtualClock из status_bot.clock цикл можно прогнать в симуляции,
+    подставив вместо `fetch` (get_api_answer) заранее записанный API.
+    Если передан пул `session` (HttpPool), запросы к API и команды
+    /status идут через его keep-alive соединения.
+    """
+
+    def __init__(
+        self, bot, store, fetch=None, clock=SYSTEM_CLOCK, session=None
+    ):
+        """Готовит outbox, аренду и кэш снимков; состояние читает cycle."""
+        self.api_breaker = CircuitBreaker(
+            "practicum", is_failure=is_outage, clock=clock
+        )
+        self.telegram_breaker = CircuitBreaker(
+            "telegram", is_failure=is_telegram_outage, clock=clock
+        )
+        self.bot = GuardedBot(bot, self.telegram_breaker)
+        self.store = store
+        if fetch is None:
+            fetch = get_api_answer
+            if session is not None:
+                fetch = partial(request_api_answer, session=session)
+        self.fetch = self.api_breaker.wrap(fetch)
+        self.clock = clock
+        self.key = subscription_key(PRACTICUM_TOKEN, TELEGRAM_CHAT_ID)
+        self.outbox = OutboxDispatcher(
+            store, outbox_sender(self.bot), clock=clock.time,
+            keys=(self.key,),
         )
-    if "homeworks" not in response:
-        error = "в ответе API домашки нет ключа homeworks"
-        raise ValueError(error)
-    homeworks = response.get("homeworks")
-    if not isinstance(homeworks, list):
-        error = (
-            f"Под ключеи homeworks был получен объект типа {type(response)},"
-            "ожидался объект типа list"
+        self.lease = start_lease(self.key)
+        self.term = None
+        self.timestamp = None
+        self.statuses = None
+        self.watermark = Watermark(WATERMARK_OVERLAP)
+        self.errors = ErrorDedup(window=ERROR_WINDOW, clock=clock)
+        self.snapshots = SnapshotCache(
+            snapshot_fetcher(session=session), clock=clock
         )
-        raise TypeError(error)
-    return response.get("homeworks")
 
+    def cycle(self) -> None:
+        """Выполняет один цикл опроса; ошибки журналирует и сообщает."""
+        try:
+            current = lease_term(self.lease)
+            if current is None:
+                logger.debug("Опрос выполняет другая копия бота.")
+                return
+            if current != self.term:
+                # Новый срок аренды: состояние мог изменить прежний держатель.
+                self.term = current
+                self.timestamp, self.statuses = load_state(
+                    self.store, self.key, self.clock
+                )
+                self.outbox.drain()
+            with tracing.span("poll_cycle", subscription=self.key):
+                self.poll()
+            if self.errors.resolve():
+                send_message(self.bot, RESOLVED_MESSAGE)
+        except CircuitOpenError as error:
+            logger.warning(error, extra={"subscription": self.key})
+        except Exception as error:
+            logger.error(
+                error,
+                extra={
+                    "subscription": self.key,
+                    "stage": "poll",
+                    "status_code": getattr(error, "status_code", None),
+                },
+            )
+            if self.errors.report(error):
+                send_message(self.bot, f"Сбой в работе программы: {error}")
 
-def parse_status(homework: dict) -> str:
-    """Извлекает из информации о конкретной домашней работе её статус."""
-    homework_name = homework.get("homework_name")
-    status = homework.get("status")
-    if status not in HOMEWORK_VERDICTS.keys() or None:
-        raise KeyError("Отсутствующий или недокументированный статус домашки")
-    if "homework_name" not in homework or None:
-        raise KeyError(f"В ответе API домашки нет ключа {homework_name}")
-    verdict = HOMEWORK_VERDICTS[status]
-    return f'Изменился статус проверки работы "{homework_name}". {verdict}'
+    def poll(self) -> None:
+        """Запрашивает API и кладёт уведомления о переходах в outbox."""
+        watermark = self.watermark
+        response = self.fetch(watermark.request_from(self.timestamp))
+        with CHECK_RESPONSE_LATENCY.time(), tracing.span("check_response"):
+            homeworks = check_response(response)
+        batch, transitions = notify_transitions(
+            self.key, self.statuses, watermark.fresh(homeworks),
+            self.snapshots,
+        )
+        timestamp = watermark.advance(self.timestamp, response)
+        batch.watermark(self.key, timestamp)
+        if not self.leading():
+            return
+        self.store.write(batch)
+        self.statuses.commit(transitions)
+        watermark.commit(timestamp)
+        self.timestamp = timestamp
+        if self.leading():
+            self.outbox.drain()
+
+    def leading(self) -> bool:
+        """Проверяет, что аренда всё ещё у этой копии и в том же сроке.
+
+        Запрос к API может длиться дольше, чем действует аренда: тогда
+        опрос уже ведёт другая копия, и эта не должна ни записывать
+        состояние, ни отправлять уведомления.
+        """
+        if lease_term(self.lease) == self.term:
+            return True
+        logger.warning("Аренда потеряна во время опроса, цикл прерван.")
+        return False
 
 
 def main() -> None:
@@ -111,31 +390,149 @@ def main() -> None:
         logger.critical("Отсутствуют переменные окружения!")
         sys.exit()
 
+    if METRICS_PORT:
+        start_metrics_server(int(METRICS_PORT))
+    session = None
+    if API_KEEPALIVE:
+        from status_bot.transport import HttpPool
+
+        session = HttpPool(pool_size=COMMAND_WORKERS + 1)
     bot = telegram.Bot(token=TELEGRAM_TOKEN)
-    timestamp = int(time.time())
-    sent_message = ""
+    loop = PollLoop(bot, open_state_store(STATE_DB), session=session)
+    start_commands(None, {TELEGRAM_CHAT_ID: PRACTICUM_TOKEN}, loop.snapshots)
 
     while True:
-        try:
-            response = get_api_answer(timestamp)
-            homeworks = check_response(response)
-            timestamp = homeworks[0].get("current_date")
-            if homeworks:
-                homework = homeworks[0]
-                message = parse_status(homework)
-                send_message(bot, message)
-            else:
-                status_message = "У текущей домашки нет нового статуса"
-                send_message(bot, status_message)
-                logger.debug(status_message)
-        except Exception as error:
-            message = f"Сбой в работе программы: {error}"
-            logger.error(error)
-            if message != sent_message:
-                send_message(bot, message)
-        finally:
-            time.sleep(RETRY_PERIOD)
+        loop.cycle()
+        time.sleep(RETRY_PERIOD)
+
+
+def run_cohort(subscriptions=None) -> None:
+    """Опрашивает API для всех подписок из SUBSCRIPTIONS_FILE.
+
+    Процесс-шард получает свою часть `subscriptions` от супервизора;
+    сервер метрик тогда поднимает супервизор, а команды не запускаются.
+    Бюджет API_REQUESTS_PER_MINUTE делится между шардами поровну.
+    """
+    import asyncio
+    import multiprocessing
+
+    from status_bot.adaptive import AdaptivePolicy, RequestBudget
+    from status_bot.cache import ResponseCache
+    from status_bot.poller import AsyncPoller, load_subscriptions
+    from status_bot.sender import SendQueue
+    from status_bot.transport import HttpPool
+
+    configure_logging()
+    # Процесс-шард не проходит через create_app: трассировку включаем
+    # здесь, а экспортёр закрываем сами, не полагаясь на atexit.
+    exporter = configure_tracing()
+    if not TELEGRAM_TOKEN:
+        logger.critical("Отсутствуют переменные окружения!")
+        sys.exit()
+
+    standalone = subscriptions is None
+    if standalone and METRICS_PORT:
+        start_metrics_server(int(METRICS_PORT))
+    http_pool = HttpPool(pool_size=POLL_CONCURRENCY)
+    store = open_state_store(STATE_DB)
+    bot = telegram.Bot(
+        token=TELEGRAM_TOKEN, request=http_pool.telegram_request()
+    )
+    breaker = CircuitBreaker("telegram", is_failure=is_telegram_outage)
+    send_queue = SendQueue(breaker.wrap(bot.send_message))
+    snapshots = None
+    if standalone:
+        subscriptions = load_subscriptions(
+            SUBSCRIPTIONS_FILE, int(time.time())
+        )
+        snapshots = SnapshotCache(snapshot_fetcher(session=http_pool))
+        start_commands(
+            bot,
+            {subscription.chat_id: subscription.token
+             for subscription in subscriptions},
+            snapshots,
+        )
+    policy = budget = None
+    if ADAPTIVE_POLLING:
+        policy = AdaptivePolicy(
+            RETRY_PERIOD, POLL_ACTIVE_PERIOD, POLL_IDLE_CEILING
+        )
+    if API_REQUESTS_PER_MINUTE:
+        budget = RequestBudget(
+            API_REQUESTS_PER_MINUTE / (1 if standalone else WORKERS),
+            time.monotonic(),
+        )
+    poller = AsyncPoller(
+        subscriptions,
+        send=send_queue,
+        concurrency=POLL_CONCURRENCY,
+        period=RETRY_PERIOD,
+        session=http_pool,
+        store=store,
+        # Потоковый разбор и кэш ответов взаимоисключающие: кэшу нужно
+        # тело целиком, чтобы отдать его на запрос с ETag.
+        cache=None if API_STREAMING else ResponseCache(),
+        streaming=API_STREAMING,
+        breaker=CircuitBreaker("practicum", is_failure=is_outage),
+        overlap=WATERMARK_OVERLAP,
+        cycle_budget=CYCLE_DEADLINE,
+        request_budget=API_DEADLINE,
+        hedger=api_hedger(2 * POLL_CONCURRENCY),
+        policy=policy,
+        budget=budget,
+        snapshots=snapshots,
+        lease=start_lease(
+            "cohort" if standalone
+            else multiprocessing.current_process().name
+        ),
+    )
+    logger.debug(f"Загружено подписок: {len(poller.subscriptions)}.")
+    try:
+        asyncio.run(poller.run_forever())
+    finally:
+        if poller.lease is not None:
+            poller.lease.stop()
+        poller.close()
+        send_queue.close(timeout=RETRY_PERIOD)
+        http_pool.close()
+        store.close()
+        if exporter is not None:
+            exporter.shutdown()
+
+
+def run_supervisor() -> None:
+    """Делит подписки из SUBSCRIPTIONS_FILE между WORKERS процессами."""
+    from status_bot.poller import load_subscriptions
+    from status_bot.shards import Supervisor
+
+    supervisor = Supervisor(
+        load_subscriptions(SUBSCRIPTIONS_FILE, int(time.time())),
+        run_cohort,
+        WORKERS,
+    ).start()
+    if METRICS_PORT:
+        start_metrics_server(int(METRICS_PORT), registry=supervisor)
+    try:
+        supervisor.run_forever()
+    finally:
+        supervisor.stop()
+
+
+def create_app():
+    """Настраивает журнал и возвращает точку входа для режима из окружения.
+
+    Импорт модуля ничего не запускает и не настраивает: журнал
+    и трассировку настраивает `create_app`, а тяжёлые зависимости
+    загружаются при первом использовании.
+    """
+    configure_logging()
+    configure_tracing()
+    if SUBSCRIPTIONS_FILE and WORKERS > 1:
+        return run_supervisor
+    if SUBSCRIPTIONS_FILE:
+        return run_cohort
+    return main
 
 
 if __name__ == "__main__":
-    main()
+    create_app()()
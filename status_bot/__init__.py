@@ -0,0 +1,68 @@
+"""Компоненты бота для опроса статусов домашних работ.
+
+Модули пакета импортируются при первом обращении к имени: импорт
+`status_bot.api` не тянет за собой asyncio, multiprocessing и остальные
+части, которые нужны только в отдельных режимах бота.
+"""
+import importlib
+
+_EXPORTS = {
+    "ENDPOINT": "api",
+    "HOMEWORK_VERDICTS": "api",
+    "REGISTRY": "metrics",
+    "AdaptivePolicy": "adaptive",
+    "AsyncPoller": "poller",
+    "CircuitBreaker": "breaker",
+    "CircuitOpenError": "breaker",
+    "CommandPoller": "commands",
+    "ErrorDedup": "dedup",
+    "CycleStats": "poller",
+    "Deadline": "deadline",
+    "HashRing": "shards",
+    "Hedger": "deadline",
+    "Homework": "records",
+    "HomeworkStream": "streaming",
+    "HttpPool": "transport",
+    "Lease": "lease",
+    "OutboxDispatcher": "outbox",
+    "PollScheduler": "schedule",
+    "RequestBudget": "adaptive",
+    "ResponseCache": "cache",
+    "SendQueue": "sender",
+    "SnapshotCache": "commands",
+    "StatusDiff": "diff",
+    "Subscription": "poller",
+    "Supervisor": "shards",
+    "SystemClock": "clock",
+    "VirtualClock": "clock",
+    "Watermark": "watermark",
+    "WebhookServer": "webhook",
+    "auth_headers": "api",
+    "check_response": "api",
+    "fetch_api_answer": "api",
+    "lease_term": "lease",
+    "load_subscriptions": "poller",
+    "open_exporter": "tracing",
+    "open_lease_store": "lease",
+    "open_state_store": "state",
+    "parse_status": "api",
+    "start_metrics_server": "metrics",
+    "stream_api_answer": "streaming",
+    "traced": "tracing",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    """Импортирует модуль с именем `name` при первом обращении."""
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{module}"), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list:
+    return sorted(set(globals()) | set(__all__))
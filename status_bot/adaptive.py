@@ -0,0 +1,96 @@
+"""Частота опроса подписки по статусам её работ и общий бюджет запросов."""
+from status_bot.metrics import POLLS_DEFERRED
+from status_bot.sender import TokenBucket
+
+# Статусы из HOMEWORK_VERDICTS. На проверке вердикт может прийти в любую
+# минуту, а после замечаний студент скоро отправит работу снова.
+ACTIVE_STATUSES = frozenset({"reviewing"})
+WAITING_STATUSES = frozenset({"rejected"})
+
+DEFAULT_ACTIVE_PERIOD = 120
+DEFAULT_IDLE_CEILING = 1200
+DEFAULT_BACKOFF = 2.0
+
+
+class AdaptivePolicy:
+    """Выбирает период опроса подписки после очередного опроса.
+
+    Пока у подписки есть работа на проверке, она опрашивается раз
+    в `active` секунд. Если есть работа с замечаниями или статус только
+    что сменился, период возвращается к обычному `period`. Иначе (все
+    работы приняты или работ нет) период растёт в `backoff` раз за
+    каждый опрос без изменений, но не выше `ceiling`.
+    """
+
+    __slots__ = ("period", "active", "ceiling", "backoff")
+
+    def __init__(
+        self,
+        period: float,
+        active: float = DEFAULT_ACTIVE_PERIOD,
+        ceiling: float = DEFAULT_IDLE_CEILING,
+        backoff: float = DEFAULT_BACKOFF,
+    ):
+        """Задаёт периоды; потолок не бывает меньше обычного периода."""
+        self.period = period
+        self.active = active
+        self.ceiling = max(ceiling, period)
+        self.backoff = backoff
+
+    def interval(self, current: float, statuses, changed: bool) -> float:
+        """Возвращает следующий период по прошлому и статусам работ.
+
+        `statuses` — последние статусы работ подписки (StatusDiff.values),
+        `changed` — были ли в этом опросе переходы.
+        """
+        statuses = set(statuses)
+        if not ACTIVE_STATUSES.isdisjoint(statuses):
+            return self.active
+        if changed or not WAITING_STATUSES.isdisjoint(statuses):
+            return self.period
+        return min(max(current, self.period) * self.backoff, self.ceiling)
+
+
+class RequestBudget:
+    """Общий бюджет запросов к API: `per_minute` запросов в минуту.
+
+    Ведро токенов вмещает секундную долю бюджета и ещё один запрос, так
+    что за любую минуту уходит не больше `per_minute` запросов и этого
+    запаса сверху.
+    """
+
+    def __init__(self, per_minute: float, now: float = 0.0):
+        """Создаёт корзину на `per_minute` запросов с отсчётом от `now`."""
+        self.per_minute = per_minute
+        self.rate = per_minute / 60
+        self._bucket = TokenBucket(self.rate, self.rate + 1, now)
+
+    def admit(self, scheduler, due: list) -> list:
+        """Возвращает ключи из `due`, на которые хватает бюджета.
+
+        Первыми проходят ключи с самым коротким периодом в `scheduler`
+        (PollScheduler). Остальные переносятся на моменты, когда для
+        них появятся токены.
+        """
+        now = scheduler.clock()
+        due.sort(key=scheduler.period_of)
+        granted = self.take(len(due), now)
+        for position, key in enumerate(due[granted:]):
+            scheduler.add(key, delay=self.delay(position, now))
+        POLLS_DEFERRED.inc(len(due) - granted)
+        return due[:granted]
+
+    def take(self, count: int, now: float) -> int:
+        """Забирает до `count` токенов и возвращает, сколько получилось."""
+        granted = 0
+        while granted < count and self._bucket.delay(now) == 0:
+            self._bucket.consume(now)
+            granted += 1
+        return granted
+
+    def delay(self, position: int, now: float) -> float:
+        """Возвращает, через сколько секунд появится токен номер `position`.
+
+        Нумерация с нуля; пока токены не забраны, они не резервируются.
+        """
+        return self._bucket.delay(now) + position / self.rate
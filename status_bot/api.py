@@ -0,0 +1,191 @@
+"""Запросы к API Практикума и разбор его ответов."""
+import sys
+from functools import lru_cache
+from http import HTTPStatus
+
+from status_bot import tracing
+from status_bot.deadline import Deadline, DeadlineExceeded
+from status_bot.lazy import LazyModule
+from status_bot.metrics import API_LATENCY, API_RESPONSES
+from status_bot.transport import DEFAULT_TIMEOUT, DEFAULT_TOTAL_TIMEOUT
+
+# requests импортируется при первом запросе к API.
+requests = LazyModule("requests")
+
+ENDPOINT = "https://practicum.yandex.ru/api/user_api/homework_statuses/"
+
+HOMEWORK_VERDICTS = {
+    "approved": "Работа проверена: ревьюеру всё понравилось. Ура!",
+    "reviewing": "Работа взята на проверку ревьюером.",
+    "rejected": "Работа проверена: у ревьюера есть замечания.",
+}
+
+# Интернированные коды статусов: у всех работ с одинаковым статусом
+# хранится ссылка на один и тот же объект строки.
+STATUS_CODES = {status: sys.intern(status) for status in HOMEWORK_VERDICTS}
+
+MESSAGE_CACHE_SIZE = 65536
+
+
+class ApiStatusError(Exception):
+    """API ответило кодом, которого не ожидали."""
+
+    def __init__(self, message: str, status_code: int):
+        """Запоминает код ответа в `status_code`."""
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def is_outage(error: Exception) -> bool:
+    """Проверяет, говорит ли ошибка о недоступности API.
+
+    Сетевые сбои, истёкшие сроки (зависший API) и ответы 5xx считаются
+    недоступностью, а 4xx (например, неверный токен) относятся
+    к конкретному запросу.
+    """
+    if isinstance(error, ApiStatusError):
+        return error.status_code >= HTTPStatus.INTERNAL_SERVER_ERROR
+    return isinstance(error, (SystemError, DeadlineExceeded))
+
+
+def auth_headers(token: str) -> dict:
+    """Возвращает заголовки авторизации для токена Практикума."""
+    return {"Authorization": f"OAuth {token}"}
+
+
+def payload_size(response, stream: bool = False):
+    """Возвращает размер тела ответа в байтах или None, если он неизвестен.
+
+    Тело потокового ответа не читается: размер берётся из Content-Length.
+    """
+    size = getattr(response, "headers", {}).get("Content-Length")
+    if size is not None:
+        return int(size)
+    if stream:
+        return None
+    return len(getattr(response, "content", b"") or b"")
+
+
+def request_api(
+    headers: dict,
+    timestamp: int,
+    endpoint: str = ENDPOINT,
+    session=None,
+    expected: tuple = (HTTPStatus.OK,),
+    stream: bool = False,
+    deadline: Deadline = None,
+    hedger=None,
+):
+    """Делает запрос к эндпоинту API-сервиса и возвращает сырой ответ.
+
+    Если передан пул `session`, запрос идёт через его keep-alive
+    соединения, иначе через `requests.get`. Таймауты соединения
+    и чтения ограничены остатком `deadline` (по умолчанию
+    DEFAULT_TOTAL_TIMEOUT на запрос). Если передан `hedger` (Hedger),
+    запрос выполняется через него: вызывающий поток ждёт не дольше
+    срока, даже если тело ответа приходит медленно, а медленный запрос
+    дублируется. Код ответа, не входящий в `expected`, считается
+    ошибкой. При `stream=True` тело не читается до обращения к нему.
+    """
+    ENDPOINT_DICT = {
+        "url": endpoint,
+        "headers": headers,
+        "params": {"from_date": timestamp},
+    }
+    if deadline is None:
+        deadline = Deadline(DEFAULT_TOTAL_TIMEOUT)
+    get = requests.get if session is None else session.get
+    limits = getattr(session, "timeout", DEFAULT_TIMEOUT)
+
+    def attempt():
+        return get(
+            **ENDPOINT_DICT, timeout=deadline.timeout(limits), stream=stream
+        )
+
+    with tracing.span("get_api_answer") as span:
+        try:
+            with API_LATENCY.time():
+                if hedger is None:
+                    response = attempt()
+                else:
+                    response = hedger.call(attempt, deadline)
+        except DeadlineExceeded:
+            API_RESPONSES.labels("timeout").inc()
+            raise
+        except requests.RequestException as error:
+            API_RESPONSES.labels("error").inc()
+            raise SystemError(error)
+        if span.recording:
+            span.set_attribute("http.status_code", int(response.status_code))
+            span.set_attribute(
+                "http.response_size", payload_size(response, stream)
+            )
+    API_RESPONSES.labels(int(response.status_code)).inc()
+    if response.status_code not in expected:
+        error = (
+            "При проверке статуса сервера, API домашки возвращает"
+            f"код {response.status_code}, отличный от {HTTPStatus.OK}."
+            f"Параметры запроса: {ENDPOINT_DICT}"
+            f"Ответ API: {response.content}"
+        )
+        raise ApiStatusError(error, response.status_code)
+    return response
+
+
+def fetch_api_answer(
+    headers: dict,
+    timestamp: int,
+    endpoint: str = ENDPOINT,
+    session=None,
+    deadline: Deadline = None,
+    hedger=None,
+) -> dict:
+    """Делает запрос к эндпоинту API-сервиса с заданными заголовками."""
+    return request_api(
+        headers, timestamp, endpoint, session,
+        deadline=deadline, hedger=hedger,
+    ).json()
+
+
+def check_response(response: dict) -> list:
+    """Проверяет ответ API на соответствие документации."""
+    if not isinstance(response, dict):
+        raise TypeError(
+            f"В ответе был получен объект типа {type(response)},"
+            "ожидался объект типа dict"
+        )
+    if "homeworks" not in response:
+        error = "в ответе API домашки нет ключа homeworks"
+        raise ValueError(error)
+    homeworks = response.get("homeworks")
+    if not isinstance(homeworks, list):
+        error = (
+            f"Под ключеи homeworks был получен объект типа {type(response)},"
+            "ожидался объект типа list"
+        )
+        raise TypeError(error)
+    return response.get("homeworks")
+
+
+@lru_cache(maxsize=MESSAGE_CACHE_SIZE)
+def render_message(homework_name: str, status: str) -> str:
+    """Собирает текст уведомления; результат кэшируется по паре аргументов."""
+    verdict = HOMEWORK_VERDICTS[status]
+    return f'Изменился статус проверки работы "{homework_name}". {verdict}'
+
+
+def homework_error(homework: dict) -> KeyError:
+    """Возвращает исключение, объясняющее, чем некорректна работа."""
+    if homework.get("status") not in STATUS_CODES:
+        return KeyError("Отсутствующий или недокументированный статус домашки")
+    return KeyError("В ответе API домашки нет ключа homework_name")
+
+
+def parse_status(homework: dict) -> str:
+    """Извлекает из информации о конкретной домашней работе её статус."""
+    try:
+        return render_message(
+            homework["homework_name"], STATUS_CODES[homework["status"]]
+        )
+    except KeyError:
+        raise homework_error(homework) from None
@@ -0,0 +1,168 @@
+"""Автоматические выключатели для внешних служб."""
+import logging
+import threading
+import time
+from collections import deque
+from functools import wraps
+
+from status_bot.metrics import CIRCUIT_REJECTED, CIRCUIT_TRANSITIONS
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+DEFAULT_FAILURE_RATE = 0.5
+DEFAULT_WINDOW = 20
+DEFAULT_MIN_CALLS = 5
+DEFAULT_RESET_TIMEOUT = 30.0
+DEFAULT_MAX_RESET_TIMEOUT = 600.0
+
+
+class CircuitOpenError(Exception):
+    """Вызов не выполнен, потому что выключатель разомкнут.
+
+    `retry_after` — сколько секунд осталось до пробного вызова; SendQueue
+    по этому атрибуту откладывает отправку, как при ответе 429.
+    """
+
+    def __init__(self, name: str, retry_after: float):
+        """Запоминает выключатель и срок до пробного запроса."""
+        super().__init__(
+            f"Выключатель {name} разомкнут, повтор через {retry_after:.1f} с"
+        )
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Выключатель с окном последних вызовов и пробными запросами.
+
+    В замкнутом состоянии считает долю сбоев среди последних `window`
+    вызовов и размыкается, когда она достигает `failure_rate` (но не
+    раньше `min_calls` вызовов). Разомкнутый выключатель сразу отвечает
+    CircuitOpenError, не обращаясь к службе. Через `reset_timeout`
+    секунд он пропускает `probes` пробных вызовов: успех замыкает цепь,
+    сбой снова размыкает её на вдвое больший срок, но не дольше
+    `max_reset_timeout`.
+
+    Сбоем считается исключение, для которого `is_failure` вернул True;
+    остальные исключения пробрасываются и считаются успехом, потому что
+    служба ответила. Слушатели `subscribe` получают каждую смену
+    состояния как (имя, прежнее, новое).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate: float = DEFAULT_FAILURE_RATE,
+        window: int = DEFAULT_WINDOW,
+        min_calls: int = DEFAULT_MIN_CALLS,
+        reset_timeout: float = DEFAULT_RESET_TIMEOUT,
+        max_reset_timeout: float = DEFAULT_MAX_RESET_TIMEOUT,
+        probes: int = 1,
+        is_failure=lambda error: True,
+        clock=time.monotonic,
+    ):
+        """Создаёт замкнутый выключатель с пустым окном вызовов."""
+        self.name = name
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.probes = probes
+        self.is_failure = is_failure
+        self.clock = clock
+        self.state = CLOSED
+        self.rejected = 0
+        self._outcomes = deque(maxlen=window)
+        self._failures = 0
+        self._opened_at = 0.0
+        self._open_for = reset_timeout
+        self._probing = 0
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, listener) -> None:
+        """Добавляет обработчик смены состояния."""
+        self._listeners.append(listener)
+
+    def _transition(self, state: str) -> None:
+        """Меняет состояние и сообщает об этом; вызывается под блокировкой."""
+        previous, self.state = self.state, state
+        self._outcomes.clear()
+        self._failures = 0
+        self._probing = 0
+        if state == OPEN:
+            self._opened_at = self.clock()
+        CIRCUIT_TRANSITIONS.labels(self.name, state).inc()
+        logger.warning(
+            "Выключатель %s: %s -> %s", self.name, previous, state
+        )
+        for listener in self._listeners:
+            listener(self.name, previous, state)
+
+    def retry_after(self) -> float:
+        """Возвращает число секунд до следующего пробного вызова."""
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self._opened_at + self._open_for - self.clock())
+
+    def allow(self) -> bool:
+        """Решает, можно ли выполнить вызов сейчас."""
+        with self._lock:
+            if self.state == OPEN and not self.retry_after():
+                self._transition(HALF_OPEN)
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and self._probing < self.probes:
+                self._probing += 1
+                return True
+            self.rejected += 1
+        CIRCUIT_REJECTED.labels(self.name).inc()
+        return False
+
+    def record(self, success: bool) -> None:
+        """Учитывает результат разрешённого вызова."""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                if success:
+                    self._open_for = self.reset_timeout
+                    self._transition(CLOSED)
+                else:
+                    self._open_for = min(
+                        self._open_for * 2, self.max_reset_timeout
+                    )
+                    self._transition(OPEN)
+                return
+            if self.state != CLOSED:
+                return
+            if len(self._outcomes) == self._outcomes.maxlen:
+                self._failures -= not self._outcomes[0]
+            self._outcomes.append(success)
+            self._failures += not success
+            if (
+                len(self._outcomes) >= self.min_calls
+                and self._failures >= self.failure_rate * len(self._outcomes)
+            ):
+                self._transition(OPEN)
+
+    def call(self, func, *args, **kwargs):
+        """Вызывает `func` через выключатель."""
+        if not self.allow():
+            raise CircuitOpenError(self.name, self.retry_after())
+        try:
+            result = func(*args, **kwargs)
+        except Exception as error:
+            self.record(not self.is_failure(error))
+            raise
+        self.record(True)
+        return result
+
+    def wrap(self, func):
+        """Возвращает `func`, вызываемую через выключатель."""
+        @wraps(func)
+        def guarded(*args, **kwargs):
+            return self.call(func, *args, **kwargs)
+        return guarded
@@ -0,0 +1,161 @@
+"""Кэш ответов homework_statuses с условными запросами."""
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from http import HTTPStatus
+
+from status_bot import api
+from status_bot.metrics import CHECK_RESPONSE_LATENCY
+
+DEFAULT_MAXSIZE = 10000
+DEFAULT_TTL = 3600
+
+# current_date меняется в каждом ответе, поэтому при сравнении тел
+# по хэшу он вырезается из байтов без разбора JSON.
+CURRENT_DATE = re.compile(rb'"current_date"\s*:\s*(\d+)')
+
+CacheEntry = namedtuple(
+    "CacheEntry",
+    ("etag", "last_modified", "digest", "response", "homeworks", "stored_at"),
+)
+CacheResult = namedtuple("CacheResult", ("response", "homeworks", "changed"))
+
+
+class ResponseCache:
+    """LRU-кэш проверенных ответов API по токену и from_date.
+
+    Если сервер вернул `ETag` или `Last-Modified`, следующий запрос с тем
+    же ключом становится условным, и ответ 304 берётся из кэша. Иначе
+    тело сравнивается по хэшу: при совпадении JSON не разбирается
+    и `check_response` не вызывается. Записи старше `ttl` секунд не
+    используются.
+
+    Новый ответ сначала откладывается и попадает в кэш только после
+    `commit`, когда результат его обработки записан в хранилище
+    состояния: иначе после сбоя записи тот же ответ считался бы
+    неизменным, и переход был бы потерян.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = DEFAULT_MAXSIZE,
+        ttl: float = DEFAULT_TTL,
+        clock=time.monotonic,
+    ):
+        """Создаёт пустой кэш на `maxsize` ответов."""
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self._entries = OrderedDict()
+        self._staged = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Возвращает число ответов в кэше."""
+        return len(self._entries)
+
+    def _get(self, key):
+        """Возвращает свежую запись и поднимает её в LRU."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if self.clock() - entry.stored_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def _put(self, key, entry: CacheEntry) -> None:
+        """Сохраняет запись, вытесняя самые старые."""
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def commit(
+        self, headers: dict, timestamp: int, endpoint: str = api.ENDPOINT
+    ) -> None:
+        """Переносит в кэш ответ, отложенный последним `fetch`."""
+        key = (headers.get("Authorization"), timestamp, endpoint)
+        with self._lock:
+            entry = self._staged.pop(key, None)
+        if entry is not None:
+            self._put(key, entry)
+
+    def fetch(
+        self,
+        headers: dict,
+        timestamp: int,
+        endpoint: str = api.ENDPOINT,
+        session=None,
+        deadline=None,
+        hedger=None,
+    ) -> CacheResult:
+        """Запрашивает API, по возможности используя кэш.
+
+        `changed` равен False, если список работ совпал с сохранённым.
+        Изменившийся ответ сохраняется только после `commit`.
+        `deadline` и `hedger` передаются в `api.request_api`.
+        """
+        key = (headers.get("Authorization"), timestamp, endpoint)
+        with self._lock:
+            self._staged.pop(key, None)
+        entry = self._get(key)
+        request_headers = headers
+        if entry is not None and (entry.etag or entry.last_modified):
+            request_headers = dict(headers)
+            if entry.etag:
+                request_headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                request_headers["If-Modified-Since"] = entry.last_modified
+        response = api.request_api(
+            request_headers,
+            timestamp,
+            endpoint,
+            session,
+            expected=(HTTPStatus.OK, HTTPStatus.NOT_MODIFIED),
+            deadline=deadline,
+            hedger=hedger,
+        )
+        if response.status_code == HTTPStatus.NOT_MODIFIED and entry:
+            self.hits += 1
+            self.not_modified += 1
+            self._put(key, entry._replace(stored_at=self.clock()))
+            return CacheResult(entry.response, entry.homeworks, False)
+        body = response.content
+        digest = hashlib.blake2b(
+            CURRENT_DATE.sub(b"", body), digest_size=16
+        ).digest()
+        if entry is not None and entry.digest == digest:
+            self.hits += 1
+            match = CURRENT_DATE.search(body)
+            cached = dict(entry.response)
+            if match:
+                cached["current_date"] = int(match.group(1))
+            self._put(
+                key,
+                entry._replace(response=cached, stored_at=self.clock()),
+            )
+            return CacheResult(cached, entry.homeworks, False)
+        self.misses += 1
+        parsed = response.json()
+        with CHECK_RESPONSE_LATENCY.time():
+            homeworks = api.check_response(parsed)
+        staged = CacheEntry(
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+            digest=digest,
+            response=parsed,
+            homeworks=homeworks,
+            stored_at=self.clock(),
+        )
+        with self._lock:
+            self._staged[key] = staged
+        return CacheResult(parsed, homeworks, True)
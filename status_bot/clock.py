@@ -0,0 +1,70 @@
+"""Часы и ожидание: системные и виртуальные для симуляции."""
+import time
+
+# Начало виртуального времени в секундах Unix: 2020-09-13.
+VIRTUAL_EPOCH = 1_600_000_000
+
+
+class SystemClock:
+    """Системные часы.
+
+    Вызов возвращает монотонное время, поэтому часы можно передать
+    в любой параметр `clock` (Deadline, CircuitBreaker, ErrorDedup,
+    PollScheduler, SendQueue). `time` — время Unix для меток API,
+    `sleep` и `wait` — обычное и асинхронное ожидание.
+    """
+
+    def __call__(self) -> float:
+        """Возвращает монотонное время."""
+        return time.monotonic()
+
+    def time(self) -> float:
+        """Возвращает время Unix."""
+        return time.time()
+
+    def sleep(self, seconds: float) -> None:
+        """Ждёт `seconds` секунд."""
+        time.sleep(seconds)
+
+    async def wait(self, seconds: float) -> None:
+        """Ждёт `seconds` секунд, не блокируя цикл событий."""
+        # asyncio нужен только асинхронному опросу: main его не грузит.
+        import asyncio
+
+        await asyncio.sleep(seconds)
+
+
+class VirtualClock(SystemClock):
+    """Виртуальные часы: ожидание только сдвигает время.
+
+    Монотонное время начинается с `start`, время Unix — с `epoch`.
+    Всё, что ждёт через эти часы, проходит сутки за микросекунды,
+    а порядок событий остаётся тем же, что на настоящих часах.
+    """
+
+    def __init__(self, start: float = 0.0, epoch: float = VIRTUAL_EPOCH):
+        """Ставит часы на `start`, а время Unix — на `epoch`."""
+        self.now = start
+        self.epoch = epoch - start
+
+    def __call__(self) -> float:
+        """Возвращает виртуальное монотонное время."""
+        return self.now
+
+    def time(self) -> float:
+        """Возвращает виртуальное время Unix."""
+        return self.epoch + self.now
+
+    def sleep(self, seconds: float) -> None:
+        """Сдвигает часы на `seconds` секунд."""
+        self.now += max(seconds, 0.0)
+
+    async def wait(self, seconds: float) -> None:
+        """Сдвигает часы и отдаёт управление другим задачам."""
+        import asyncio
+
+        self.sleep(seconds)
+        await asyncio.sleep(0)
+
+
+SYSTEM_CLOCK = SystemClock()
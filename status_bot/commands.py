@@ -0,0 +1,275 @@
+"""Команды /status и /list: ответы из кэша последнего ответа API."""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from status_bot import api
+from status_bot.watermark import updated_at
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 60
+DEFAULT_MAXSIZE = 10000
+DEFAULT_WORKERS = 4
+DEFAULT_BACKLOG = 100
+DEFAULT_POLL_TIMEOUT = 30
+ERROR_PAUSE = 5
+
+NOT_SUBSCRIBED = "Этот чат не подписан на уведомления о домашних работах."
+NO_HOMEWORKS = "Работ на проверке пока нет."
+UNAVAILABLE = "Не удалось получить статусы работ, попробуйте позже."
+
+
+def snapshot_fetcher(endpoint: str = api.ENDPOINT, session=None):
+    """Возвращает функцию, запрашивающую полный список работ по токену."""
+    def fetch(token: str) -> list:
+        return api.check_response(
+            api.fetch_api_answer(api.auth_headers(token), 0, endpoint, session)
+        )
+    return fetch
+
+
+class SnapshotCache:
+    """Кэш списков работ по токену со сроком жизни `ttl` секунд.
+
+    API запрашивается только при промахе. Одновременные промахи по
+    одному токену объединяются: запрос делает первый поток, остальные
+    ждут его результата (single-flight).
+    """
+
+    def __init__(
+        self,
+        fetch,
+        ttl: float = DEFAULT_TTL,
+        maxsize: int = DEFAULT_MAXSIZE,
+        clock=time.monotonic,
+    ):
+        """Создаёт пустой кэш снимков, которые строит `fetch`."""
+        self.fetch = fetch
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> list:
+        """Возвращает список работ из кэша или из API."""
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is not None and self.clock() - entry[0] <= self.ttl:
+                self._entries.move_to_end(token)
+                self.hits += 1
+                return entry[1]
+            future = self._inflight.get(token)
+            leader = future is None
+            if leader:
+                future = self._inflight[token] = Future()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            return future.result()
+        try:
+            homeworks = self.fetch(token)
+        except Exception as error:
+            with self._lock:
+                del self._inflight[token]
+            future.set_exception(error)
+            raise
+        with self._lock:
+            self._entries[token] = (self.clock(), homeworks)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+            del self._inflight[token]
+        future.set_result(homeworks)
+        return homeworks
+
+    def invalidate(self, token: str) -> None:
+        """Забывает список работ токена, например после смены статуса."""
+        with self._lock:
+            self._entries.pop(token, None)
+
+
+def format_status(homeworks: list) -> str:
+    """Описывает статус работы, обновлённой последней.
+
+    Работа выбирается по `date_updated`, а не по порядку в ответе;
+    работы без даты считаются самыми старыми.
+    """
+    if not homeworks:
+        return NO_HOMEWORKS
+    return format_homework(
+        max(homeworks, key=lambda homework: updated_at(homework) or 0)
+    )
+
+
+def format_list(homeworks: list) -> str:
+    """Перечисляет все работы со статусами."""
+    if not homeworks:
+        return NO_HOMEWORKS
+    return "\n".join(format_homework(homework) for homework in homeworks)
+
+
+def format_homework(homework: dict) -> str:
+    """Описывает одну работу."""
+    status = homework.get("status")
+    verdict = api.HOMEWORK_VERDICTS.get(status, status)
+    return f'"{homework.get("homework_name")}": {verdict}'
+
+
+FORMATTERS = {"/status": format_status, "/list": format_list}
+
+
+class Commands:
+    """Отвечает на команды чатов, зная токен Практикума каждого чата."""
+
+    def __init__(self, tokens: dict, snapshots: SnapshotCache):
+        """Запоминает токены по строковому chat_id."""
+        self.tokens = {
+            str(chat_id): token for chat_id, token in tokens.items()
+        }
+        self.snapshots = snapshots
+
+    def reply(self, command: str, chat_id) -> str:
+        """Возвращает текст ответа на команду."""
+        token = self.tokens.get(str(chat_id))
+        if token is None:
+            return NOT_SUBSCRIBED
+        try:
+            homeworks = self.snapshots.get(token)
+        except Exception as error:
+            logger.error("Сбой запроса работ для чата %s: %s", chat_id, error)
+            return UNAVAILABLE
+        return FORMATTERS[command](homeworks)
+
+
+def parse_command(text: str):
+    """Возвращает команду из текста сообщения или None."""
+    if not text or not text.startswith("/"):
+        return None
+    command = text.split()[0].split("@")[0].lower()
+    return command if command in FORMATTERS else None
+
+
+class UpdateDispatcher:
+    """Передаёт команды из обновлений Telegram в ограниченный пул потоков.
+
+    В работе и в очереди одновременно не больше `workers + backlog`
+    команд. Сверх этого `dispatch` отказывает, и источник обновлений
+    может повторить их позже; сообщения без команд принимаются сразу.
+    """
+
+    def __init__(
+        self,
+        commands: Commands,
+        send,
+        workers: int = DEFAULT_WORKERS,
+        backlog: int = DEFAULT_BACKLOG,
+    ):
+        """Создаёт пул из `workers` потоков и очередь на `backlog`."""
+        self.commands = commands
+        self.send = send
+        self.answered = 0
+        self.rejected = 0
+        self._slots = threading.BoundedSemaphore(workers + backlog)
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="commands"
+        )
+
+    def dispatch(self, chat_id, text: str, block: bool = False) -> bool:
+        """Ставит ответ на команду в очередь; False, если мест нет."""
+        command = parse_command(text)
+        if command is None:
+            return True
+        if not self._slots.acquire(blocking=block):
+            self.rejected += 1
+            return False
+        self._executor.submit(self._answer, chat_id, command)
+        return True
+
+    def dispatch_json(self, update: dict, block: bool = False) -> bool:
+        """Разбирает обновление в виде JSON из Bot API и передаёт команду."""
+        message = update.get("message") or {}
+        chat = message.get("chat") or {}
+        return self.dispatch(chat.get("id"), message.get("text"), block)
+
+    def _answer(self, chat_id, command: str) -> None:
+        """Отправляет ответ на команду."""
+        try:
+            self.send(chat_id, self.commands.reply(command, chat_id))
+            self.answered += 1
+        except Exception as error:
+            logger.error("Сбой ответа на команду в чат %s: %s", chat_id, error)
+        finally:
+            self._slots.release()
+
+    def close(self) -> None:
+        """Дожидается ответов на принятые команды."""
+        self._executor.shutdown(wait=True)
+
+
+class CommandPoller:
+    """Получает сообщения через getUpdates и отвечает на команды.
+
+    Длинный опрос идёт в фоновом потоке, ответы готовятся в пуле из
+    `workers` потоков, чтобы медленный промах кэша не задерживал
+    остальные чаты.
+    """
+
+    def __init__(
+        self,
+        bot,
+        commands: Commands,
+        workers: int = DEFAULT_WORKERS,
+        timeout: int = DEFAULT_POLL_TIMEOUT,
+    ):
+        """Готовит фоновый поток getUpdates; запускает его `start`."""
+        self.bot = bot
+        self.dispatcher = UpdateDispatcher(commands, bot.send_message, workers)
+        self.timeout = timeout
+        self._offset = None
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="command-poller", daemon=True
+        )
+
+    def start(self) -> "CommandPoller":
+        """Запускает фоновый опрос."""
+        self._thread.start()
+        return self
+
+    def poll_once(self) -> int:
+        """Обрабатывает одну пачку обновлений и возвращает её размер."""
+        updates = self.bot.get_updates(
+            offset=self._offset,
+            timeout=self.timeout,
+            allowed_updates=["message"],
+        )
+        for update in updates:
+            self._offset = update.update_id + 1
+            message = update.message
+            if message is not None:
+                self.dispatcher.dispatch(
+                    message.chat_id, message.text, block=True
+                )
+        return len(updates)
+
+    def _run(self) -> None:
+        """Цикл фонового потока."""
+        while not self._stopped.is_set():
+            try:
+                self.poll_once()
+            except Exception as error:
+                logger.error("Сбой получения обновлений Telegram: %s", error)
+                self._stopped.wait(ERROR_PAUSE)
+
+    def stop(self) -> None:
+        """Останавливает опрос после текущего запроса getUpdates."""
+        self._stopped.set()
@@ -0,0 +1,211 @@
+"""Сроки запросов к API и дублирование медленных запросов."""
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from status_bot.metrics import API_HEDGES
+
+DEFAULT_QUANTILE = 0.95
+DEFAULT_WINDOW = 200
+DEFAULT_MIN_SAMPLES = 20
+DEFAULT_MAX_RATIO = 0.1
+DEFAULT_WORKERS = 32
+# Запас дублей на всплеск медленных ответов после спокойного периода.
+MAX_HEDGE_BURST = 10.0
+
+
+class DeadlineExceeded(TimeoutError):
+    """Срок запроса истёк до получения ответа."""
+
+
+class Deadline:
+    """Бюджет времени на цикл опроса или отдельный запрос.
+
+    `timeout` превращает остаток бюджета в таймауты соединения и чтения
+    для requests, поэтому ни рукопожатие, ни ожидание тела ответа не
+    переживут срок. Один Deadline можно передать во все запросы цикла.
+    """
+
+    def __init__(self, budget: float, clock=time.monotonic):
+        """Отсчитывает `budget` секунд от текущего времени `clock`."""
+        self.budget = budget
+        self.clock = clock
+        self.expires = clock() + budget
+
+    def remaining(self) -> float:
+        """Возвращает остаток бюджета в секундах, не меньше нуля."""
+        return max(self.expires - self.clock(), 0.0)
+
+    @property
+    def expired(self) -> bool:
+        """Бюджет исчерпан."""
+        return self.clock() >= self.expires
+
+    def within(self, budget: float) -> "Deadline":
+        """Возвращает срок на часть работы: `budget`, но не дальше этого."""
+        part = Deadline(budget, self.clock)
+        part.expires = min(part.expires, self.expires)
+        return part
+
+    def timeout(self, limits: tuple) -> tuple:
+        """Ограничивает таймауты (соединение, чтение) остатком бюджета.
+
+        Если бюджет уже исчерпан, бросает DeadlineExceeded.
+        """
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded(
+                f"Срок запроса ({self.budget:.1f} с) истёк"
+            )
+        connect, read = limits
+        return (min(connect, remaining), min(read, remaining))
+
+
+def _close_response(future) -> None:
+    """Закрывает ответ проигравшей попытки и освобождает соединение."""
+    if future.cancelled() or future.exception() is not None:
+        return
+    close = getattr(future.result(), "close", None)
+    if close is not None:
+        close()
+
+
+class Hedger:
+    """Выполняет запрос в пуле потоков с общим сроком и дублем.
+
+    Вызывающий поток ждёт ответа не дольше остатка Deadline, даже если
+    сервер медленно отдаёт тело. Если первая попытка не ответила за
+    `quantile` (по умолчанию p95) длительности последних `window`
+    успешных попыток, запускается вторая; побеждает первый успешный
+    ответ. Проигравшая попытка отменяется, если ещё не начата, а иначе
+    её ответ закрывается по завершении, возвращая соединение в пул.
+
+    Дубли расходуют бюджет: каждый запрос добавляет `max_ratio` дубля,
+    поэтому при общем замедлении API нагрузка растёт не больше чем
+    на `max_ratio`. Пока попыток меньше `min_samples`, а также при
+    `quantile=None` дубли не запускаются.
+    """
+
+    def __init__(
+        self,
+        quantile: float = DEFAULT_QUANTILE,
+        window: int = DEFAULT_WINDOW,
+        min_samples: int = DEFAULT_MIN_SAMPLES,
+        max_ratio: float = DEFAULT_MAX_RATIO,
+        workers: int = DEFAULT_WORKERS,
+        clock=time.monotonic,
+    ):
+        """Создаёт пул из `workers` потоков для запросов и дублей."""
+        self.quantile = quantile
+        self.min_samples = min_samples
+        self.max_ratio = max_ratio
+        self.clock = clock
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self._latencies = deque(maxlen=window)
+        self._delay = None
+        self._budget = 1.0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="hedge"
+        )
+
+    def hedge_delay(self):
+        """Возвращает задержку перед дублем или None, если дубля не будет."""
+        with self._lock:
+            return self._delay
+
+    def _observe(self, started: float, future) -> None:
+        """Запоминает длительность успешной попытки."""
+        if future.cancelled() or future.exception() is not None:
+            return
+        with self._lock:
+            self._latencies.append(self.clock() - started)
+            if self.quantile is None:
+                return
+            if len(self._latencies) < self.min_samples:
+                return
+            ordered = sorted(self._latencies)
+            self._delay = ordered[
+                min(int(len(ordered) * self.quantile), len(ordered) - 1)
+            ]
+
+    def _submit(self, attempt):
+        """Запускает попытку в пуле."""
+        started = self.clock()
+        future = self._executor.submit(attempt)
+        future.add_done_callback(lambda done: self._observe(started, done))
+        return future
+
+    def _take_hedge(self) -> bool:
+        """Расходует бюджет на дубль; False, если бюджета нет."""
+        with self._lock:
+            if self._budget < 1:
+                return False
+            self._budget -= 1
+            self.hedged += 1
+        API_HEDGES.inc()
+        return True
+
+    def call(self, attempt, deadline: Deadline):
+        """Выполняет `attempt()` и возвращает первый успешный результат.
+
+        Если обе попытки упали, пробрасывает исключение последней. По
+        истечении `deadline` бросает DeadlineExceeded.
+        """
+        with self._lock:
+            self.requests += 1
+            self._budget = min(
+                self._budget + self.max_ratio, MAX_HEDGE_BURST
+            )
+            delay = self._delay
+        first = self._submit(attempt)
+        pending = {first}
+        hedge_at = None if delay is None else self.clock() + delay
+        try:
+            while True:
+                winner, error = self._wait(pending, deadline, hedge_at)
+                if winner is not None:
+                    if winner is not first:
+                        with self._lock:
+                            self.hedge_wins += 1
+                    return winner.result()
+                if not pending:
+                    raise error
+                if hedge_at is not None and self.clock() >= hedge_at:
+                    hedge_at = None
+                    if self._take_hedge():
+                        pending.add(self._submit(attempt))
+                    continue
+                if deadline.expired:
+                    raise DeadlineExceeded(
+                        f"Срок запроса ({deadline.budget:.1f} с) истёк"
+                    )
+        finally:
+            for future in pending:
+                if not future.cancel():
+                    future.add_done_callback(_close_response)
+
+    def _wait(self, pending: set, deadline: Deadline, hedge_at) -> tuple:
+        """Ждёт до первого ответа, времени дубля или срока.
+
+        Возвращает успешную попытку (или None) и последнее исключение;
+        завершённые попытки убирает из `pending`.
+        """
+        timeout = deadline.remaining()
+        if hedge_at is not None:
+            timeout = min(timeout, max(hedge_at - self.clock(), 0.0))
+        done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+        error = None
+        for future in done:
+            pending.discard(future)
+            if future.exception() is None:
+                return future, None
+            error = future.exception()
+        return None, error
+
+    def close(self) -> None:
+        """Останавливает пул, не дожидаясь зависших попыток."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,90 @@
+"""Подавление повторных уведомлений об одной и той же ошибке."""
+import hashlib
+import re
+import time
+from collections import OrderedDict
+
+DEFAULT_WINDOW = 3600
+DEFAULT_MAXSIZE = 256
+
+RESOLVED_MESSAGE = "Работа программы восстановлена."
+
+# Части текста ошибки, которые меняются от цикла к циклу: параметры
+# запроса с from_date и заголовками, тело ответа, даты и метки времени.
+NORMALIZE = (
+    (re.compile(r"Параметры запроса:.*", re.S), ""),
+    (re.compile(r"\d{4}-\d{2}-\d{2}[T ][\d:.]+Z?"), "<date>"),
+    (re.compile(r"\b\d{9,}\b"), "<timestamp>"),
+    (re.compile(r"\b0x[0-9a-f]+\b"), "<address>"),
+)
+
+
+def normalize(message: str) -> str:
+    """Убирает из текста ошибки изменчивые части."""
+    for pattern, replacement in NORMALIZE:
+        message = pattern.sub(replacement, message)
+    return message.strip()
+
+
+def fingerprint(error: Exception) -> bytes:
+    """Возвращает отпечаток ошибки: тип, HTTP-код и текст без меток."""
+    key = "\0".join((
+        type(error).__qualname__,
+        str(getattr(error, "status_code", "")),
+        normalize(str(error)),
+    ))
+    return hashlib.blake2b(key.encode(), digest_size=16).digest()
+
+
+class ErrorDedup:
+    """Решает, какие ошибки сообщать в Telegram.
+
+    Первая ошибка с новым отпечатком сообщается сразу, повторы в течение
+    `window` секунд подавляются. Когда цикл проходит без ошибок после
+    сообщённого сбоя, `resolve` один раз разрешает сообщение о
+    восстановлении. Время сообщения при этом не забывается: если сбой
+    повторится в пределах окна, ни он, ни следующее восстановление
+    не сообщаются. Отпечатки хранятся в LRU на `maxsize` записей,
+    так что память не растёт с числом разных ошибок.
+    """
+
+    def __init__(
+        self,
+        window: float = DEFAULT_WINDOW,
+        maxsize: int = DEFAULT_MAXSIZE,
+        clock=time.monotonic,
+    ):
+        """Создаёт пустой журнал сообщённых ошибок."""
+        self.window = window
+        self.maxsize = maxsize
+        self.clock = clock
+        self.suppressed = 0
+        self._reported = OrderedDict()
+        self._outage = False
+
+    def __len__(self) -> int:
+        """Возвращает число запомненных отпечатков."""
+        return len(self._reported)
+
+    def report(self, error: Exception) -> bool:
+        """Учитывает ошибку; True, если о ней нужно сообщить."""
+        key = fingerprint(error)
+        now = self.clock()
+        reported_at = self._reported.get(key)
+        if reported_at is not None and now - reported_at < self.window:
+            self._reported.move_to_end(key)
+            self.suppressed += 1
+            return False
+        self._reported[key] = now
+        self._reported.move_to_end(key)
+        while len(self._reported) > self.maxsize:
+            self._reported.popitem(last=False)
+        self._outage = True
+        return True
+
+    def resolve(self) -> bool:
+        """Учитывает успешный цикл; True, если нужно сообщить о починке."""
+        if not self._outage:
+            return False
+        self._outage = False
+        return True
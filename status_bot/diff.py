@@ -0,0 +1,70 @@
+"""Отслеживание изменений статусов домашних работ между циклами."""
+import sys
+
+from status_bot.records import Homework
+
+
+class StatusDiff:
+    """Хранит последний известный статус каждой работы.
+
+    Ключ словаря — `homework_name`, значение — интернированная строка
+    статуса, поэтому одинаковые статусы разных работ не занимают
+    отдельную память. За цикл выполняется работа только над элементами
+    ответа, а сообщения строятся лишь для реально изменившихся статусов.
+
+    Изменившаяся работа разбирается в запись Homework, и текст
+    уведомления берётся из неё. `render`, если задан, строит текст
+    вместо записи.
+    """
+
+    __slots__ = ("_statuses", "_render")
+
+    def __init__(self, render=None, statuses=None):
+        """Загружает известные `statuses`, интернируя строки статусов."""
+        self._statuses = {
+            name: sys.intern(status)
+            for name, status in (statuses or {}).items()
+        }
+        self._render = render
+
+    def __len__(self) -> int:
+        """Возвращает число известных работ."""
+        return len(self._statuses)
+
+    def get(self, homework_name: str):
+        """Возвращает последний известный статус работы или None."""
+        return self._statuses.get(homework_name)
+
+    def values(self):
+        """Возвращает последние известные статусы всех работ."""
+        return self._statuses.values()
+
+    def pending(self, homeworks) -> list:
+        """Возвращает переходы вместе с работами, не запоминая статусы.
+
+        Каждый переход — кортеж `(homework, status, message)`.
+        Работа разбирается через `Homework.from_json`, поэтому
+        некорректная работа вызывает исключение, и ни один статус ответа
+        не считается увиденным. Статусы запоминает `commit` после того,
+        как переходы сохранены.
+        """
+        transitions = []
+        statuses = self._statuses
+        render = self._render
+        seen = {}
+        for homework in homeworks:
+            name = homework.get("homework_name")
+            status = homework.get("status")
+            if seen.get(name, statuses.get(name)) == status:
+                continue
+            record = Homework.from_json(homework)
+            message = record.message if render is None else render(homework)
+            seen[name] = record.status
+            transitions.append((homework, record.status, message))
+        return transitions
+
+    def commit(self, transitions: list) -> None:
+        """Запоминает статусы переходов, полученных от `pending`."""
+        statuses = self._statuses
+        for homework, status, _ in transitions:
+            statuses[homework.get("homework_name")] = status
@@ -0,0 +1,32 @@
+"""HTTP-страница /metrics в текстовом формате Prometheus."""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """Отдаёт метрики по GET /metrics."""
+
+    def do_GET(self):
+        """Формирует страницу метрик."""
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.server.registry.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """Не пишет журнал запросов в stdout бота."""
+
+
+class MetricsServer(ThreadingHTTPServer):
+    """Сервер метрик: `registry.render()` отдаётся по GET /metrics."""
+
+    daemon_threads = True
+
+    def __init__(self, registry, host: str = "0.0.0.0", port: int = 0):
+        """Занимает порт `port`; 0 — любой свободный."""
+        super().__init__((host, port), _MetricsHandler)
+        self.registry = registry
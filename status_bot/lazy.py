@@ -0,0 +1,30 @@
+"""Отложенный импорт тяжёлых зависимостей."""
+import importlib
+
+
+class LazyModule:
+    """Модуль, который импортируется при первом обращении к атрибуту.
+
+    Атрибуты каждый раз берутся из настоящего модуля, поэтому подмены
+    через monkeypatch (например, `telegram.Bot` в тестах) видны так же,
+    как при обычном импорте.
+    """
+
+    __slots__ = ("_name", "_module")
+
+    def __init__(self, name: str):
+        """Запоминает имя модуля, не импортируя его."""
+        self._name = name
+        self._module = None
+
+    def __repr__(self) -> str:
+        """Показывает имя модуля и загружен ли он."""
+        state = "загружен" if self._module is not None else "не загружен"
+        return f"<LazyModule {self._name!r}, {state}>"
+
+    def __getattr__(self, attr: str):
+        """Импортирует модуль при первом обращении и берёт `attr`."""
+        module = self._module
+        if module is None:
+            module = self._module = importlib.import_module(self._name)
+        return getattr(module, attr)
@@ -0,0 +1,196 @@
+"""Аренды для нескольких копий бота: опрашивает только держатель."""
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 15.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS leases (
+    name TEXT PRIMARY KEY,
+    holder TEXT NOT NULL,
+    expires REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+class MemoryLeaseStore:
+    """Аренды в памяти процесса, для одной копии бота и тестов."""
+
+    def __init__(self):
+        """Создаёт пустую таблицу аренд."""
+        self._leases = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, name: str, holder: str, expires: float, now: float):
+        """Берёт или продлевает аренду; True, если она теперь у `holder`."""
+        with self._lock:
+            current = self._leases.get(name)
+            if current is None or current[0] == holder or current[1] <= now:
+                self._leases[name] = (holder, expires)
+                return True
+            return False
+
+    def release(self, name: str, holder: str) -> None:
+        """Отдаёт аренду, если она у `holder`."""
+        with self._lock:
+            if self._leases.get(name, (None,))[0] == holder:
+                del self._leases[name]
+
+    def close(self) -> None:
+        """Ничего не делает: данные живут только в памяти."""
+
+
+class SqliteLeaseStore:
+    """Аренды в строках SQLite, общие для процессов на одной машине.
+
+    Захват — один UPSERT: строка меняется, только если аренда уже у
+    этого держателя или истекла, поэтому две копии не могут взять её
+    одновременно.
+    """
+
+    def __init__(self, path: str, timeout: float = 5.0):
+        """Открывает базу `path` и создаёт таблицу аренд."""
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            path, timeout=timeout, check_same_thread=False,
+            isolation_level=None,
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(SCHEMA)
+
+    def acquire(self, name: str, holder: str, expires: float, now: float):
+        """Берёт или продлевает аренду; True, если она теперь у `holder`."""
+        with self._lock:
+            cursor = self._connection.execute(
+                "INSERT INTO leases (name, holder, expires) VALUES (?, ?, ?) "
+                "ON CONFLICT (name) DO UPDATE SET "
+                "holder = excluded.holder, expires = excluded.expires "
+                "WHERE leases.holder = excluded.holder "
+                "OR leases.expires <= ?",
+                (name, holder, expires, now),
+            )
+            return cursor.rowcount == 1
+
+    def release(self, name: str, holder: str) -> None:
+        """Отдаёт аренду, если она у `holder`."""
+        with self._lock:
+            self._connection.execute(
+                "DELETE FROM leases WHERE name = ? AND holder = ?",
+                (name, holder),
+            )
+
+    def close(self) -> None:
+        """Закрывает соединение с базой."""
+        self._connection.close()
+
+
+def open_lease_store(location: str):
+    """Создаёт хранилище аренд: `memory` или путь к файлу SQLite."""
+    if location == "memory":
+        return MemoryLeaseStore()
+    return SqliteLeaseStore(location)
+
+
+def default_holder() -> str:
+    """Возвращает имя держателя, уникальное для процесса."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def lease_term(lease):
+    """Возвращает срок аренды или None, если опрашивает другая копия.
+
+    Без аренды (`lease` равен None) срок всегда 0.
+    """
+    if lease is None:
+        return 0
+    return lease.term if lease.held else None
+
+
+class Lease:
+    """Аренда `name` на `ttl` секунд, продлеваемая в фоновом потоке.
+
+    Поток каждые `ttl / 3` секунд продлевает аренду или пытается взять
+    её. Держатель считает аренду своей до `ttl - ttl / 3` после
+    последнего продления, то есть раньше, чем её сможет забрать другая
+    копия. Резервная копия забирает истёкшую аренду не позже чем через
+    `ttl + ttl / 3` после последнего продления упавшего держателя.
+    `term` растёт при каждом новом захвате: по нему держатель узнаёт,
+    что нужно перечитать состояние, записанное предыдущим держателем.
+    """
+
+    def __init__(
+        self,
+        store,
+        name: str,
+        holder: str = None,
+        ttl: float = DEFAULT_TTL,
+        clock=time.time,
+    ):
+        """Готовит фоновое продление; запускает его `start`."""
+        self.store = store
+        self.name = name
+        self.holder = holder or default_holder()
+        self.ttl = ttl
+        self.renew_interval = ttl / 3
+        self.clock = clock
+        self.term = 0
+        self._valid_until = 0.0
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name=f"lease-{name}", daemon=True
+        )
+
+    @property
+    def held(self) -> bool:
+        """Аренда принадлежит этой копии."""
+        return self.clock() < self._valid_until
+
+    def renew(self) -> bool:
+        """Продлевает или берёт аренду; True, если она у этой копии."""
+        now = self.clock()
+        held = self.held
+        try:
+            acquired = self.store.acquire(
+                self.name, self.holder, now + self.ttl, now
+            )
+        except Exception as error:
+            logger.error("Сбой продления аренды %s: %s", self.name, error)
+            return held
+        if not acquired:
+            if held:
+                logger.warning("Аренда %s перешла другой копии", self.name)
+            self._valid_until = 0.0
+            return False
+        if not held:
+            self.term += 1
+            logger.warning("Аренда %s получена: %s", self.name, self.holder)
+        self._valid_until = now + self.ttl - self.renew_interval
+        return True
+
+    def _run(self) -> None:
+        """Цикл фонового потока."""
+        while not self._stopped.is_set():
+            self.renew()
+            self._stopped.wait(self.renew_interval)
+
+    def start(self) -> "Lease":
+        """Запускает фоновое продление."""
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Останавливает продление и отдаёт аренду резервной копии."""
+        self._stopped.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        if self.held:
+            self._valid_until = 0.0
+            self.store.release(self.name, self.holder)
@@ -0,0 +1,146 @@
+"""Журнал бота: очередь с фоновой записью и формат JSON."""
+import atexit
+import itertools
+import json
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+from status_bot.metrics import LOG_DROPPED
+
+DEFAULT_QUEUE_SIZE = 10000
+TEXT_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+# Поля, которые можно передать через `extra=` и которые попадают в JSON.
+FIELDS = ("subscription", "chat_id", "stage", "latency", "status_code")
+
+
+class JsonFormatter(logging.Formatter):
+    """Пишет запись одной строкой JSON.
+
+    Кроме времени, уровня, имени журнала и сообщения в строку попадают
+    поля из FIELDS, переданные через `extra=`, например
+    `logger.error(..., extra={"subscription": key, "stage": "poll"})`.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        """Возвращает запись в виде строки JSON."""
+        entry = {
+            "time": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for name in FIELDS:
+            value = getattr(record, name, None)
+            if value is not None:
+                entry[name] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class DebugSampler(logging.Filter):
+    """Пропускает одну из `every` записей уровня DEBUG, остальные — все."""
+
+    def __init__(self, every: int):
+        """Пропускает каждую `every`-ю запись DEBUG."""
+        super().__init__()
+        self.every = every
+        self._counter = itertools.count()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Решает, попадёт ли запись в журнал."""
+        if record.levelno > logging.DEBUG:
+            return True
+        return next(self._counter) % self.every == 0
+
+
+class DroppingQueueHandler(QueueHandler):
+    """Кладёт записи в ограниченную очередь, не блокируя вызывающий поток.
+
+    Сообщение собирается из аргументов сразу, а форматирование и запись
+    в поток делает QueueListener в фоновом потоке. Если очередь
+    заполнена, новая запись ниже WARNING отбрасывается, а для WARNING
+    и выше из очереди вытесняется самая старая запись. Отброшенные
+    записи считаются в `dropped` и в метрике bot_log_records_dropped_total.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_QUEUE_SIZE):
+        """Создаёт очередь на `maxsize` записей."""
+        super().__init__(queue.Queue(maxsize))
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Фиксирует сообщение и трассировку до передачи в другой поток."""
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(
+                record.exc_info
+            )
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        """Кладёт запись в очередь или отбрасывает по правилам выше."""
+        try:
+            self.queue.put_nowait(record)
+            return
+        except queue.Full:
+            pass
+        if record.levelno >= logging.WARNING:
+            try:
+                self.queue.get_nowait()
+                self.queue.put_nowait(record)
+            except (queue.Empty, queue.Full):
+                pass
+        self.dropped += 1
+        LOG_DROPPED.inc()
+
+
+class _Listener(QueueListener):
+    """QueueListener, который при остановке дописывает всю очередь."""
+
+    def enqueue_sentinel(self) -> None:
+        # Штатный put_nowait падает на заполненной очереди.
+        self.queue.put(self._sentinel)
+
+    def stop(self) -> None:
+        """Дописывает очередь; повторный вызов ничего не делает."""
+        if self._thread is not None:
+            super().stop()
+
+
+def setup_logging(
+    loggers,
+    stream,
+    json_format: bool = False,
+    asynchronous: bool = False,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+    debug_every: int = 1,
+):
+    """Направляет журналы `loggers` в `stream`.
+
+    При `asynchronous=True` запись идёт через DroppingQueueHandler и
+    фоновый поток; возвращается запущенный QueueListener, который
+    останавливается при выходе из процесса. Иначе возвращается None.
+    """
+    target = logging.StreamHandler(stream)
+    target.setFormatter(
+        JsonFormatter() if json_format else logging.Formatter(TEXT_FORMAT)
+    )
+    handler = target
+    listener = None
+    if asynchronous:
+        handler = DroppingQueueHandler(queue_size)
+        listener = _Listener(handler.queue, target)
+        listener.start()
+        atexit.register(listener.stop)
+    if debug_every > 1:
+        handler.addFilter(DebugSampler(debug_every))
+    for logger in loggers:
+        logger.setLevel(logging.DEBUG)
+        logger.addHandler(handler)
+    return listener
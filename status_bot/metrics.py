@@ -0,0 +1,318 @@
+"""Метрики бота в текстовом формате Prometheus."""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+
+class _Shards:
+    """Массивы значений, по одному на поток.
+
+    Запись идёт в массив текущего потока без блокировок; блокировка
+    берётся только при появлении нового потока и при чтении.
+    """
+
+    def __init__(self, size: int):
+        self._size = size
+        self._local = threading.local()
+        self._shards = []
+        self._lock = threading.Lock()
+
+    def get(self) -> list:
+        """Возвращает массив текущего потока."""
+        try:
+            return self._local.values
+        except AttributeError:
+            values = self._local.values = [0] * self._size
+            with self._lock:
+                self._shards.append(values)
+            return values
+
+    def total(self) -> list:
+        """Складывает значения всех потоков."""
+        with self._lock:
+            shards = list(self._shards)
+        return [sum(column) for column in zip(*shards)] or [0] * self._size
+
+
+class _CounterChild:
+    """Счётчик с конкретными значениями меток."""
+
+    __slots__ = ("_shards",)
+
+    def __init__(self):
+        self._shards = _Shards(1)
+
+    def inc(self, amount: float = 1) -> None:
+        """Увеличивает счётчик."""
+        self._shards.get()[0] += amount
+
+    @property
+    def value(self) -> float:
+        """Текущее значение счётчика."""
+        return self._shards.total()[0]
+
+    def totals(self) -> list:
+        """Возвращает сырые значения для сложения между процессами."""
+        return self._shards.total()
+
+
+class _HistogramChild:
+    """Гистограмма с конкретными значениями меток."""
+
+    __slots__ = ("_buckets", "_shards")
+
+    def __init__(self, buckets: tuple):
+        self._buckets = buckets
+        # Ячейки: по одной на границу, +Inf и сумма наблюдений.
+        self._shards = _Shards(len(buckets) + 2)
+
+    def observe(self, value: float) -> None:
+        """Учитывает одно наблюдение."""
+        values = self._shards.get()
+        values[bisect_left(self._buckets, value)] += 1
+        values[-1] += value
+
+    @contextmanager
+    def time(self):
+        """Измеряет длительность блока в секундах."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+    def totals(self) -> list:
+        """Возвращает сырые значения для сложения между процессами."""
+        return self._shards.total()
+
+    def snapshot(self) -> tuple:
+        """Возвращает накопленные счётчики корзин, число и сумму."""
+        return _cumulative(self.totals())
+
+
+def _cumulative(values: list) -> tuple:
+    """Переводит значения гистограммы в накопленные корзины, число и сумму."""
+    cumulative, running = [], 0
+    for count in values[:-1]:
+        running += count
+        cumulative.append(running)
+    return cumulative, running, values[-1]
+
+
+class _Metric:
+    """Общая часть метрик: имя, описание и дочерние метрики по меткам."""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values):
+        """Возвращает метрику для значений меток."""
+        values = tuple(str(value) for value in values)
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _label_text(self, values: tuple, extra: str = "") -> str:
+        """Форматирует метки в виде {a="1",b="2"}."""
+        pairs = [
+            f'{name}="{value}"'
+            for name, value in zip(self.labelnames, values)
+        ]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def collect(self) -> dict:
+        """Возвращает сырые значения дочерних метрик по меткам."""
+        return {
+            values: child.totals()
+            for values, child in list(self._children.items())
+        }
+
+    def render(self, collected: dict = None) -> list:
+        """Возвращает строки метрики в формате Prometheus.
+
+        Если передан `collected` (результат `collect`, возможно сложенный
+        из нескольких процессов), выводятся его значения.
+        """
+        if collected is None:
+            collected = self.collect()
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        for values, totals in sorted(collected.items()):
+            lines.extend(self._render_values(values, totals))
+        return lines
+
+
+class Counter(_Metric):
+    """Монотонно растущий счётчик."""
+
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1) -> None:
+        """Увеличивает счётчик без меток."""
+        self.labels().inc(amount)
+
+    def _render_values(self, values, totals):
+        yield f"{self.name}{self._label_text(values)} {totals[0]}"
+
+
+class Histogram(_Metric):
+    """Гистограмма длительностей."""
+
+    kind = "histogram"
+
+    def __init__(
+        self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS
+    ):
+        """Задаёт верхние границы корзин `buckets`."""
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        """Учитывает наблюдение без меток."""
+        self.labels().observe(value)
+
+    def time(self):
+        """Измеряет длительность блока без меток."""
+        return self.labels().time()
+
+    def _render_values(self, values, totals):
+        cumulative, count, total = _cumulative(totals)
+        bounds = [repr(float(bound)) for bound in self.buckets] + ["+Inf"]
+        for bound, value in zip(bounds, cumulative):
+            labels = self._label_text(values, f'le="{bound}"')
+            yield f"{self.name}_bucket{labels} {value}"
+        yield f"{self.name}_sum{self._label_text(values)} {total}"
+        yield f"{self.name}_count{self._label_text(values)} {count}"
+
+
+class Registry:
+    """Набор метрик, отдаваемых одной страницей."""
+
+    def __init__(self):
+        """Создаёт пустой набор."""
+        self._metrics = []
+
+    def register(self, metric):
+        """Добавляет метрику и возвращает её."""
+        self._metrics.append(metric)
+        return metric
+
+    def collect(self) -> dict:
+        """Возвращает сырые значения всех метрик по имени."""
+        return {metric.name: metric.collect() for metric in self._metrics}
+
+    def render(self, collected: dict = None) -> str:
+        """Возвращает все метрики в текстовом формате Prometheus."""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render(
+                None if collected is None else collected.get(metric.name, {})
+            ))
+        return "\n".join(lines) + "\n"
+
+
+def merge_collected(snapshots) -> dict:
+    """Складывает результаты `Registry.collect` нескольких процессов."""
+    merged = {}
+    for snapshot in snapshots:
+        for name, children in snapshot.items():
+            target = merged.setdefault(name, {})
+            for values, totals in children.items():
+                current = target.get(values)
+                target[values] = list(totals) if current is None else [
+                    left + right for left, right in zip(current, totals)
+                ]
+    return merged
+
+
+REGISTRY = Registry()
+
+API_LATENCY = REGISTRY.register(Histogram(
+    "bot_get_api_answer_seconds", "Длительность запроса к API Практикума."
+))
+STAGE_LATENCY = REGISTRY.register(Histogram(
+    "bot_stage_seconds",
+    "Длительность check_response и parse_status.",
+    labelnames=("stage",),
+))
+CHECK_RESPONSE_LATENCY = STAGE_LATENCY.labels("check_response")
+PARSE_STATUS_LATENCY = STAGE_LATENCY.labels("parse_status")
+SEND_LATENCY = REGISTRY.register(Histogram(
+    "bot_send_message_seconds", "Длительность отправки сообщения в Telegram."
+))
+API_RESPONSES = REGISTRY.register(Counter(
+    "bot_api_responses_total",
+    "Ответы API Практикума по HTTP-коду.",
+    labelnames=("code",),
+))
+TELEGRAM_ERRORS = REGISTRY.register(Counter(
+    "bot_telegram_errors_total",
+    "Ошибки отправки в Telegram по типу.",
+    labelnames=("error",),
+))
+NOTIFICATIONS = REGISTRY.register(Counter(
+    "bot_notifications_sent_total", "Отправленные уведомления."
+))
+LOG_DROPPED = REGISTRY.register(Counter(
+    "bot_log_records_dropped_total",
+    "Записи журнала, отброшенные из-за заполненной очереди.",
+))
+API_HEDGES = REGISTRY.register(Counter(
+    "bot_api_hedged_requests_total",
+    "Дубли медленных запросов к API Практикума.",
+))
+POLLS_DEFERRED = REGISTRY.register(Counter(
+    "bot_polls_deferred_total",
+    "Опросы, отложенные из-за общего бюджета запросов к API.",
+))
+CIRCUIT_TRANSITIONS = REGISTRY.register(Counter(
+    "bot_circuit_transitions_total",
+    "Переходы выключателей по новому состоянию.",
+    labelnames=("breaker", "state"),
+))
+CIRCUIT_REJECTED = REGISTRY.register(Counter(
+    "bot_circuit_rejected_total",
+    "Вызовы, отклонённые разомкнутым выключателем.",
+    labelnames=("breaker",),
+))
+
+
+def start_metrics_server(
+    port: int, host: str = "0.0.0.0", registry: Registry = REGISTRY
+):
+    """Запускает HTTP-сервер метрик в фоновом потоке."""
+    # http.server заметно замедляет импорт, а нужен только с METRICS_PORT.
+    from status_bot.exposition import MetricsServer
+
+    server = MetricsServer(registry, host, port)
+    threading.Thread(
+        target=server.serve_forever, name="metrics", daemon=True
+    ).start()
+    return server
@@ -0,0 +1,157 @@
+"""Доставка уведомлений из outbox хранилища состояния."""
+import logging
+import threading
+import time
+from functools import partial
+
+from status_bot import tracing
+from status_bot.sender import SendQueue
+from status_bot.state import StateBatch
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_RETENTION = 7 * 24 * 3600
+
+
+class OutboxDispatcher:
+    """Отправляет уведомления из outbox и отмечает их доставленными.
+
+    Уведомления записываются в outbox той же транзакцией, что и новые
+    статусы, а `drain` читает недоставленные пачками по `batch_size`
+    и отправляет их по порядку. Отметки о доставке записываются каждые
+    `commit_every` сообщений. Поэтому после падения процесса ни одно
+    уведомление не теряется. Повторно уходят только сообщения, которые
+    Telegram уже принял, но которые ещё не отмечены: при `commit_every=1`
+    таких не больше одного.
+
+    Если `send` — SendQueue, сообщения отмечаются по мере фактической
+    отправки из очереди, а ещё не отправленные не ставятся в неё снова.
+    Если отправка в чат не удалась, его следующие сообщения ждут
+    следующего `drain`, чтобы не нарушить порядок. Ключи идемпотентности
+    доставленных уведомлений хранятся `retention` секунд.
+
+    `keys` — ключи подписок, уведомления которых доставляет диспетчер.
+    Шарды с общей базой состояния задают свои ключи, иначе каждый
+    отправлял бы и чужие уведомления. None — все подписки базы.
+    """
+
+    def __init__(
+        self,
+        store,
+        send,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        commit_every: int = 1,
+        retention: float = DEFAULT_RETENTION,
+        clock=time.time,
+        keys=None,
+    ):
+        """Запоминает хранилище и способ отправки; ничего не читает."""
+        self.store = store
+        self.send = send
+        self.batch_size = batch_size
+        self.commit_every = commit_every
+        self.retention = retention
+        self.clock = clock
+        self.keys = None if keys is None else frozenset(keys)
+        self.delivered = 0
+        self._inflight = set()
+        self._acked = []
+        self._lock = threading.Lock()
+
+    def drain(self) -> int:
+        """Отправляет недоставленные уведомления.
+
+        Возвращает число сообщений, переданных в `send`.
+        """
+        with tracing.span("outbox_drain") as span:
+            sent = self._drain()
+            span.set_attribute("sent", sent)
+        return sent
+
+    def _drain(self) -> int:
+        """Тело `drain` внутри спана."""
+        failed_chats = set()
+        after = 0
+        sent = 0
+        while True:
+            rows = self.store.pending(after, self.batch_size, self.keys)
+            if not rows:
+                break
+            after = rows[-1].id
+            for row in rows:
+                if row.id in self._inflight or row.chat_id in failed_chats:
+                    continue
+                if self._send(row):
+                    sent += 1
+                else:
+                    failed_chats.add(row.chat_id)
+        self.flush()
+        self.store.prune(self.clock() - self.retention)
+        return sent
+
+    def _send(self, row) -> bool:
+        """Передаёт уведомление в `send`; False, если отправка не удалась."""
+        with self._lock:
+            self._inflight.add(row.id)
+        if isinstance(self.send, SendQueue):
+            self.send.put(
+                row.chat_id, row.message, on_done=partial(self._done, row.id)
+            )
+            return True
+        try:
+            with tracing.span("send_message", chat_id=row.chat_id):
+                self.send(row.chat_id, row.message)
+        except Exception as error:
+            logger.error(
+                "Сбой отправки в чат %s: %s",
+                row.chat_id,
+                error,
+                extra={"subscription": row.key, "stage": "send"},
+            )
+            self._done(row.id, error)
+            return False
+        self._done(row.id, None)
+        return True
+
+    def _done(self, row_id: int, error) -> None:
+        """Запоминает результат отправки уведомления."""
+        with self._lock:
+            if error is not None:
+                self._inflight.discard(row_id)
+                return
+            # Отправленное, но ещё не отмеченное сообщение остаётся
+            # в _inflight, чтобы drain не отправил его снова.
+            self._acked.append(row_id)
+            full = len(self._acked) >= self.commit_every
+        if not full:
+            return
+        try:
+            self.flush()
+        except Exception as error:
+            # Вызов может прийти из потока SendQueue: отметки останутся
+            # до следующего flush.
+            logger.error("Сбой записи отметок о доставке: %s", error)
+
+    def flush(self) -> int:
+        """Записывает накопленные отметки о доставке.
+
+        Возвращает число отмеченных уведомлений.
+        """
+        with self._lock:
+            acked, self._acked = self._acked, []
+        if not acked:
+            return 0
+        batch = StateBatch()
+        for row_id in acked:
+            batch.mark_delivered(row_id)
+        try:
+            self.store.write(batch)
+        except Exception:
+            with self._lock:
+                self._acked[:0] = acked
+            raise
+        with self._lock:
+            self._inflight.difference_update(acked)
+        self.delivered += len(acked)
+        return len(acked)
@@ -0,0 +1,493 @@
+"""Асинхронный опрос API Практикума для множества подписок."""
+import asyncio
+import contextvars
+import logging
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from status_bot import api, tracing
+from status_bot.breaker import CircuitOpenError
+from status_bot.clock import SYSTEM_CLOCK
+from status_bot.deadline import Deadline
+from status_bot.diff import StatusDiff
+from status_bot.lease import lease_term
+from status_bot.metrics import CHECK_RESPONSE_LATENCY, PARSE_STATUS_LATENCY
+from status_bot.outbox import OutboxDispatcher
+from status_bot.schedule import DEFAULT_JITTER, DEFAULT_TICK, PollScheduler
+from status_bot.state import (MemoryStateStore, StateBatch, notification_key,
+                              subscription_key)
+from status_bot.streaming import stream_api_answer
+from status_bot.transport import DEFAULT_TOTAL_TIMEOUT
+from status_bot.watermark import Watermark
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY = 64
+DEFAULT_PERIOD = 600
+
+
+class LeaseLost(Exception):
+    """Копия потеряла аренду и не должна отправлять уведомления."""
+
+
+CycleStats = namedtuple(
+    "CycleStats", ("polled", "failed", "messages", "elapsed")
+)
+
+
+@dataclass
+class Subscription:
+    """Подписка: токен Практикума, чат Telegram и метка from_date."""
+
+    token: str = field(repr=False)
+    chat_id: str
+    timestamp: int = 0
+    headers: dict = field(init=False, repr=False)
+    key: str = field(init=False, repr=False)
+    statuses: StatusDiff = field(
+        default_factory=StatusDiff, compare=False, repr=False
+    )
+    watermark: Watermark = field(
+        default_factory=Watermark, compare=False, repr=False
+    )
+
+    def __post_init__(self):
+        """Заранее готовит заголовки авторизации и ключ состояния."""
+        self.headers = api.auth_headers(self.token)
+        self.key = subscription_key(self.token, self.chat_id)
+
+
+def load_subscriptions(path: str, timestamp: int = 0) -> list:
+    """Читает подписки из файла со строками вида `<токен> <chat_id>`.
+
+    На строке другого вида бросает ValueError с именем файла и номером
+    строки; саму строку в сообщение не включает: в ней токен.
+    """
+    subscriptions = []
+    with open(path, encoding="utf-8") as file:
+        for number, line in enumerate(file, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            fields = line.split()
+            if len(fields) != 2:
+                raise ValueError(
+                    f"{path}:{number}: ожидается строка `<токен> <chat_id>`, "
+                    f"полей: {len(fields)}"
+                )
+            token, chat_id = fields
+            subscriptions.append(Subscription(token, chat_id, timestamp))
+    return subscriptions
+
+
+class AsyncPoller:
+    """Опрашивает API для всех подписок с ограничением параллельности.
+
+    Блокирующие вызовы `fetch_api_answer` и `send` выполняются в пуле
+    потоков, а семафор не даёт запустить больше `concurrency` опросов
+    одновременно. Общий `session` (HttpPool) стоит создавать с
+    `pool_size` не меньше `concurrency`.
+
+    Метки from_date, статусы и уведомления копятся в `StateBatch`
+    и записываются в `store` одной пачкой за цикл. Статусы и метки
+    подписок в памяти меняются только после записи: если она упала,
+    следующий цикл получит те же переходы снова. После записи
+    уведомления отправляет `outbox` (OutboxDispatcher), поэтому
+    переход статуса не теряется и не отправляется дважды, даже если
+    процесс упал между опросом и отправкой.
+
+    Метка from_date сдвигается только по ответу со списком работ: пока
+    работ нет, запрос остаётся тем же, и `cache` (ResponseCache) может
+    ответить без разбора JSON. Запрос уходит с меткой минус `overlap`
+    секунд (бот передаёт WATERMARK_OVERLAP), а работы, повторно
+    попавшие в перекрытие, отсеивает Watermark подписки. При
+    `streaming=True` и без кэша ответ разбирается потоково
+    (HomeworkStream), без загрузки всего тела.
+
+    Если передан `breaker` (CircuitBreaker), запросы к API идут через
+    него, и пока цепь разомкнута, опросы завершаются сбоем без запроса.
+
+    Если передан `lease` (Lease), опрашивает и отправляет только копия,
+    держащая аренду; остальные ждут её освобождения. Получив аренду,
+    копия заново читает состояние из `store`. Если за время цикла
+    аренда потеряна или перехвачена заново, его результат не
+    записывается и не отправляется.
+
+    `cycle_budget` — срок в секундах на все запросы цикла: каждый
+    запрос получает `request_budget`, но не больше остатка срока цикла
+    (Deadline). Если передан `hedger` (Hedger), запросы выполняются
+    через него, а медленные дублируются.
+
+    `run_forever` опрашивает каждую подписку раз в `period` секунд по
+    расписанию PollScheduler: сроки разнесены по периоду со сдвигом
+    `jitter` и не дрейфуют от длительности опроса. Подписки, чей срок
+    наступил, опрашиваются пачкой не чаще раза в `tick` секунд.
+
+    Если передан `policy` (AdaptivePolicy), после каждого опроса период
+    подписки выбирается по статусам её работ. Если передан `budget`
+    (RequestBudget), опросы сверх бюджета откладываются до появления
+    токенов; первыми опрашиваются подписки с самым коротким периодом.
+
+    Если передан `snapshots` (SnapshotCache из status_bot.commands),
+    после записи смены статуса снимок работ подписки сбрасывается,
+    чтобы /status не отвечал устаревшим статусом.
+
+    Расписание, сроки цикла и паузы берут время из `clock`
+    (SystemClock или VirtualClock из status_bot.clock).
+    """
+
+    def __init__(
+        self,
+        subscriptions,
+        send,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        period: int = DEFAULT_PERIOD,
+        endpoint: str = api.ENDPOINT,
+        session=None,
+        store=None,
+        cache=None,
+        streaming: bool = False,
+        breaker=None,
+        lease=None,
+        overlap: int = 0,
+        cycle_budget: float = None,
+        request_budget: float = DEFAULT_TOTAL_TIMEOUT,
+        hedger=None,
+        tick: float = DEFAULT_TICK,
+        jitter: float = DEFAULT_JITTER,
+        policy=None,
+        budget=None,
+        snapshots=None,
+        clock=SYSTEM_CLOCK,
+    ):
+        """Ставит подписки в расписание и готовит пул потоков."""
+        self.subscriptions = list(subscriptions)
+        self.send = send
+        self.concurrency = concurrency
+        self.period = period
+        self.endpoint = endpoint
+        self.session = session
+        self.store = store or MemoryStateStore()
+        self.cache = cache
+        self.streaming = streaming
+        self.breaker = breaker
+        self.lease = lease
+        self.overlap = overlap
+        for subscription in self.subscriptions:
+            subscription.watermark = Watermark(overlap)
+        self.cycle_budget = cycle_budget
+        self.request_budget = request_budget
+        self.hedger = hedger
+        self.tick = tick
+        self.clock = clock
+        self.policy = policy
+        self.budget = budget
+        self.snapshots = snapshots
+        self.scheduler = PollScheduler(
+            max(period, tick), jitter, tick, clock=clock
+        )
+        self._by_key = {}
+        for subscription in self.subscriptions:
+            self._by_key[subscription.key] = subscription
+            self.scheduler.add(subscription.key)
+        self._guarded_fetch = (
+            self._fetch if breaker is None else breaker.wrap(self._fetch)
+        )
+        self.outbox = OutboxDispatcher(self.store, send, keys=self._by_key)
+        self._batch = StateBatch()
+        self._polled = []
+        self._executor = ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix="poller"
+        )
+
+    def poll(self, subscription: Subscription, deadline=None) -> int:
+        """Выполняет один цикл опроса подписки.
+
+        Возвращает число уведомлений, добавленных в outbox.
+        """
+        with tracing.span("poll", subscription=subscription.key):
+            return self._poll(subscription, deadline)
+
+    def _poll(self, subscription: Subscription, deadline) -> int:
+        """Тело `poll` внутри спана подписки."""
+        response, homeworks, changed = self._guarded_fetch(
+            subscription, deadline
+        )
+        transitions = []
+        if changed:
+            with PARSE_STATUS_LATENCY.time(), tracing.span("parse_status"):
+                transitions = subscription.statuses.pending(
+                    subscription.watermark.fresh(homeworks)
+                )
+        if self.lease is not None and not self.lease.held:
+            raise LeaseLost(f"аренда {self.lease.name} потеряна")
+        batch = self._batch
+        key = subscription.key
+        for homework, status, message in transitions:
+            batch.status(key, homework.get("homework_name"), status)
+            batch.add_pending(
+                key,
+                subscription.chat_id,
+                message,
+                notification_key(key, homework),
+            )
+        timestamp = subscription.timestamp
+        if homeworks:
+            timestamp = subscription.watermark.advance(timestamp, response)
+            batch.watermark(subscription.key, timestamp)
+        self._polled.append((subscription, transitions, timestamp))
+        return len(transitions)
+
+    def _commit(self, subscription: Subscription, transitions, timestamp):
+        """Запоминает в памяти результат опроса, уже записанный в store."""
+        if self.cache is not None:
+            self.cache.commit(
+                subscription.headers,
+                subscription.watermark.request_from(subscription.timestamp),
+                self.endpoint,
+            )
+        subscription.statuses.commit(transitions)
+        if transitions and self.snapshots is not None:
+            self.snapshots.invalidate(subscription.token)
+        subscription.watermark.commit(timestamp)
+        subscription.timestamp = timestamp
+
+    def _fetch(self, subscription: Subscription, deadline=None) -> tuple:
+        """Возвращает ответ API, список работ и признак их изменения."""
+        args = (
+            subscription.headers,
+            subscription.watermark.request_from(subscription.timestamp),
+            self.endpoint,
+            self.session,
+        )
+        options = {}
+        if deadline is not None:
+            options["deadline"] = deadline.within(self.request_budget)
+        if self.hedger is not None:
+            options["hedger"] = self.hedger
+        if self.cache is not None:
+            return self.cache.fetch(*args, **options)
+        if self.streaming:
+            stream = stream_api_answer(*args, **options)
+            return stream, stream, True
+        response = api.fetch_api_answer(*args, **options)
+        with CHECK_RESPONSE_LATENCY.time(), tracing.span("check_response"):
+            homeworks = api.check_response(response)
+        return response, homeworks, True
+
+    def restore(self) -> int:
+        """Загружает сохранённое состояние подписок.
+
+        Возвращает число подписок, для которых состояние найдено.
+        """
+        states = self.store.load()
+        restored = 0
+        for subscription in self.subscriptions:
+            state = states.get(subscription.key)
+            if state is None:
+                continue
+            subscription.timestamp = state.from_date
+            subscription.statuses = StatusDiff(statuses=state.statuses)
+            restored += 1
+        return restored
+
+    def deliver_pending(self) -> int:
+        """Отправляет недоставленные уведомления из outbox.
+
+        Возвращает число сообщений, переданных в `send`.
+        """
+        if self.lease is not None and not self.lease.held:
+            return 0
+        return self.outbox.drain()
+
+    async def _poll_guarded(self, semaphore, subscription, deadline=None):
+        """Опрашивает подписку под семафором, не пропуская исключения."""
+        loop = asyncio.get_running_loop()
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                # Поток пула получает копию контекста, чтобы спан подписки
+                # стал дочерним для спана цикла.
+                return await loop.run_in_executor(
+                    self._executor,
+                    contextvars.copy_context().run,
+                    self.poll,
+                    subscription,
+                    deadline,
+                )
+            except (CircuitOpenError, LeaseLost):
+                return None
+            except Exception as error:
+                logger.error(
+                    "Сбой опроса подписки %s: %s",
+                    subscription.chat_id,
+                    error,
+                    extra={
+                        "subscription": subscription.key,
+                        "stage": "poll",
+                        "latency": time.perf_counter() - started,
+                        "status_code": getattr(error, "status_code", None),
+                    },
+                )
+                return None
+
+    async def run_cycle(self, subscriptions=None) -> CycleStats:
+        """Опрашивает один раз `subscriptions`, по умолчанию все подписки."""
+        if subscriptions is None:
+            subscriptions = self.subscriptions
+        with tracing.span("poll_cycle", subscriptions=len(subscriptions)):
+            return await self._run_cycle(subscriptions)
+
+    async def _run_cycle(self, subscriptions) -> CycleStats:
+        """Тело `run_cycle` внутри спана цикла."""
+        started = time.perf_counter()
+        term = lease_term(self.lease)
+        self._batch = batch = StateBatch()
+        self._polled = polled = []
+        semaphore = asyncio.Semaphore(self.concurrency)
+        deadline = None
+        if self.cycle_budget is not None:
+            deadline = Deadline(self.cycle_budget, self.clock)
+        results = await asyncio.gather(
+            *(
+                self._poll_guarded(semaphore, subscription, deadline)
+                for subscription in subscriptions
+            )
+        )
+        failed = sum(1 for result in results if result is None)
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        messages = sum(result for result in results if result)
+        if not self._leading(term):
+            return CycleStats(
+                polled=len(results),
+                failed=len(results),
+                messages=0,
+                elapsed=time.perf_counter() - started,
+            )
+        try:
+            await loop.run_in_executor(
+                self._executor, context.run, self.store.write, batch
+            )
+        except Exception as error:
+            # Отложенные переходы, метки и ответы кэша остаются
+            # незапомненными: следующий цикл получит их снова.
+            logger.error(
+                "Сбой записи состояния цикла: %s", error,
+                extra={"stage": "store"},
+            )
+            failed, messages = len(results), 0
+        else:
+            for subscription, transitions, timestamp in polled:
+                self._commit(subscription, transitions, timestamp)
+            if self.policy is not None:
+                self._adapt(subscriptions, results)
+        try:
+            if self._leading(term):
+                await loop.run_in_executor(
+                    self._executor, context.run, self.deliver_pending
+                )
+        except Exception as error:
+            logger.error(
+                "Сбой доставки из outbox: %s", error,
+                extra={"stage": "outbox"},
+            )
+        return CycleStats(
+            polled=len(results),
+            failed=failed,
+            messages=messages,
+            elapsed=time.perf_counter() - started,
+        )
+
+    def _leading(self, term) -> bool:
+        """Проверяет, что аренда всё ещё у этой копии и в сроке `term`."""
+        if term is not None and lease_term(self.lease) == term:
+            return True
+        logger.warning(
+            "Аренда потеряна во время цикла опроса, цикл прерван.",
+            extra={"stage": "cycle"},
+        )
+        return False
+
+    def _adapt(self, subscriptions, results) -> None:
+        """Назначает подпискам период по итогам опроса."""
+        scheduler = self.scheduler
+        for subscription, result in zip(subscriptions, results):
+            if result is None:
+                continue
+            key = subscription.key
+            scheduler.set_period(key, self.policy.interval(
+                scheduler.period_of(key),
+                subscription.statuses.values(),
+                result > 0,
+            ))
+
+    async def _start_term(self) -> None:
+        """Восстанавливает состояние и отправляет отложенные уведомления."""
+        restored = self.restore()
+        delivered = await asyncio.get_running_loop().run_in_executor(
+            self._executor, self.deliver_pending
+        )
+        logger.debug(
+            "Восстановлено подписок: %s, доставлено отложенных: %s",
+            restored,
+            delivered,
+        )
+
+    async def run_forever(self) -> None:
+        """Бесконечно опрашивает подписки по расписанию `scheduler`.
+
+        Перед первым циклом (и после каждого нового получения аренды)
+        восстанавливает состояние из `store` и отправляет отложенные
+        уведомления. Сбой хранилища логируется, и опрос продолжается:
+        незаписанный результат цикла будет получен заново.
+        """
+        term = None
+        while True:
+            lease = self.lease
+            if lease is not None and not lease.held:
+                await self.clock.wait(lease.renew_interval)
+                continue
+            current = lease.term if lease is not None else 0
+            if current != term:
+                try:
+                    await self._start_term()
+                except Exception as error:
+                    logger.error(
+                        "Сбой восстановления состояния: %s", error,
+                        extra={"stage": "restore"},
+                    )
+                    await self.clock.wait(self.tick)
+                    continue
+                term = current
+            due = self.scheduler.due()
+            if due and self.budget is not None:
+                due = self.budget.admit(self.scheduler, due)
+            if due:
+                stats = await self.run_cycle(
+                    [self._by_key[key] for key in due]
+                )
+                logger.debug(
+                    "Цикл опроса: %s подписок, %s сбоев, %s сообщений "
+                    "за %.2f с",
+                    stats.polled,
+                    stats.failed,
+                    stats.messages,
+                    stats.elapsed,
+                    extra={"stage": "cycle", "latency": stats.elapsed},
+                )
+            await self.clock.wait(self._pause())
+
+    def _pause(self) -> float:
+        """Возвращает паузу до ближайшего срока, но не меньше `tick`."""
+        next_at = self.scheduler.next_at()
+        if next_at is None:
+            return self.period
+        return max(next_at - self.clock(), self.tick)
+
+    def close(self) -> None:
+        """Останавливает пул потоков и записывает отметки о доставке."""
+        self._executor.shutdown(wait=True)
+        self.outbox.flush()
@@ -0,0 +1,54 @@
+"""Компактные записи о домашних работах."""
+from functools import lru_cache
+
+from status_bot.api import (MESSAGE_CACHE_SIZE, STATUS_CODES, homework_error,
+                            render_message)
+
+
+class Homework:
+    """Работа из ответа API: название, статус и готовый текст уведомления.
+
+    `__slots__` убирает словарь экземпляра, статус хранится как
+    интернированный код из STATUS_CODES, а текст собирается один раз
+    при создании. `from_json` возвращает общий экземпляр для каждой
+    пары (название, статус), поэтому повторные опросы не создают новых
+    объектов.
+    """
+
+    __slots__ = ("name", "status", "message")
+
+    def __init__(self, name: str, status: str):
+        """Запоминает работу и собирает текст уведомления о ней."""
+        self.name = name
+        self.status = status
+        self.message = render_message(name, status)
+
+    def __repr__(self) -> str:
+        """Возвращает название и статус работы."""
+        return f"Homework({self.name!r}, {self.status!r})"
+
+    def __eq__(self, other) -> bool:
+        """Сравнивает работы по названию и статусу."""
+        if not isinstance(other, Homework):
+            return NotImplemented
+        return self.name == other.name and self.status is other.status
+
+    def __hash__(self) -> int:
+        """Возвращает хэш пары (название, статус)."""
+        return hash((self.name, self.status))
+
+    @classmethod
+    def from_json(cls, homework: dict) -> "Homework":
+        """Строит запись из элемента `homeworks` по правилам parse_status."""
+        try:
+            return _shared_homework(
+                homework["homework_name"], STATUS_CODES[homework["status"]]
+            )
+        except KeyError:
+            raise homework_error(homework) from None
+
+
+@lru_cache(maxsize=MESSAGE_CACHE_SIZE)
+def _shared_homework(name: str, status: str) -> Homework:
+    """Возвращает общий экземпляр Homework для пары (название, статус)."""
+    return Homework(name, status)
@@ -0,0 +1,153 @@
+"""Расписание опросов подписок без дрейфа и без всплесков."""
+import heapq
+import math
+import random
+import time
+
+DEFAULT_JITTER = 0.05
+DEFAULT_TICK = 1.0
+
+# Метка записи, снятой с расписания: из слота она уходит лениво.
+_REMOVED = object()
+
+
+class PollScheduler:
+    """Колесо таймеров со сроками следующего опроса множества подписок.
+
+    Ключ подписки опрашивается раз в `period` секунд по сетке
+    `start + k * period`: срок следующего опроса считается от прошлого
+    срока, а не от момента, когда опрос закончился, поэтому время
+    цикла не накапливается. Если срок пропущен целиком (процесс стоял),
+    опрос выполняется один раз, а пропущенные сроки копятся в `missed`.
+
+    Первый опрос новой подписки приходится на случайный момент первого
+    периода, а каждый следующий сдвигается на случайную долю
+    `jitter * period` от сетки. Так подписки не собираются в пачку на
+    границе RETRY_PERIOD, а сдвиги не копятся.
+
+    Период задаётся и для отдельного ключа (`add`, `set_period`): так
+    AdaptivePolicy чаще опрашивает подписки с работой на проверке.
+
+    Сроки округляются вверх до слотов по `resolution` секунд. Слот —
+    список записей, а номера непустых слотов лежат в куче, поэтому
+    постановка и срабатывание стоят O(1) на подписку, а куча растёт
+    с числом слотов (около `period / resolution`), а не подписок.
+    """
+
+    def __init__(
+        self,
+        period: float,
+        jitter: float = DEFAULT_JITTER,
+        resolution: float = DEFAULT_TICK,
+        clock=time.monotonic,
+        seed=None,
+    ):
+        """Создаёт пустое расписание; период должен быть больше нуля."""
+        if period <= 0:
+            raise ValueError(f"Период должен быть больше нуля: {period}")
+        self.period = period
+        self.jitter = jitter
+        self.resolution = resolution
+        self.clock = clock
+        self.missed = 0
+        self._random = random.Random(seed)
+        self._entries = {}
+        self._slots = {}
+        self._order = []
+
+    def __len__(self) -> int:
+        """Возвращает число подписок в расписании."""
+        return len(self._entries)
+
+    def __contains__(self, key) -> bool:
+        """Проверяет, стоит ли `key` в расписании."""
+        return key in self._entries
+
+    def _place(self, entry: list, nominal: float) -> None:
+        """Кладёт запись в слот срока `nominal` со случайным сдвигом."""
+        fire = nominal + self._random.random() * self.jitter * entry[2]
+        slot = math.ceil(fire / self.resolution)
+        bucket = self._slots.get(slot)
+        if bucket is None:
+            bucket = self._slots[slot] = []
+            heapq.heappush(self._order, slot)
+        bucket.append(entry)
+
+    def add(self, key, delay: float = None, period: float = None) -> None:
+        """Ставит `key` в расписание с первым опросом через `delay` секунд.
+
+        Без `delay` первый опрос приходится на случайный момент периода.
+        Если `key` уже в расписании, прежний срок отменяется, а период
+        без `period` сохраняется.
+        """
+        if period is None:
+            period = self.period_of(key)
+        if delay is None:
+            delay = self._random.random() * period
+        self.discard(key)
+        entry = [self.clock() + delay, key, period]
+        self._entries[key] = entry
+        self._place(entry, entry[0])
+
+    def period_of(self, key) -> float:
+        """Возвращает период опроса `key` (общий, если ключа нет)."""
+        entry = self._entries.get(key)
+        return self.period if entry is None else entry[2]
+
+    def set_period(self, key, period: float) -> None:
+        """Меняет период опроса `key`.
+
+        Следующий срок отсчитывается от прошлого с новым периодом, но не
+        раньше текущего момента.
+        """
+        if period <= 0:
+            raise ValueError(f"Период должен быть больше нуля: {period}")
+        entry = self._entries.get(key)
+        if entry is None or entry[2] == period:
+            return
+        nominal = max(entry[0] - entry[2] + period, self.clock())
+        self.discard(key)
+        entry = [nominal, key, period]
+        self._entries[key] = entry
+        self._place(entry, nominal)
+
+    def discard(self, key) -> None:
+        """Снимает `key` с расписания, если он там есть."""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            entry[1] = _REMOVED
+
+    def next_at(self):
+        """Возвращает ближайший срок опроса или None, если расписание пусто."""
+        order = self._order
+        while order:
+            bucket = self._slots[order[0]]
+            if any(entry[1] is not _REMOVED for entry in bucket):
+                return order[0] * self.resolution
+            del self._slots[heapq.heappop(order)]
+        return None
+
+    def due(self, now: float = None) -> list:
+        """Возвращает ключи, чей срок наступил, и назначает им следующий."""
+        if now is None:
+            now = self.clock()
+        order = self._order
+        limit = math.floor(now / self.resolution)
+        ready = []
+        while order and order[0] <= limit:
+            for entry in self._slots.pop(heapq.heappop(order)):
+                key = entry[1]
+                if key is _REMOVED:
+                    continue
+                period = entry[2]
+                nominal = entry[0] + period
+                if nominal <= now:
+                    skipped = int((now - nominal) // period) + 1
+                    self.missed += skipped
+                    nominal += skipped * period
+                # Следующий срок позже `now`, поэтому запись попадает
+                # в слот за `limit` и в этом проходе не встретится.
+                entry[0] = nominal
+                self._place(entry, nominal)
+                ready.append(key)
+        return ready
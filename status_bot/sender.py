@@ -0,0 +1,279 @@
+"""Очередь исходящих сообщений Telegram с ограничением скорости."""
+import heapq
+import itertools
+import logging
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
+
+from status_bot import tracing
+from status_bot.metrics import NOTIFICATIONS, SEND_LATENCY, TELEGRAM_ERRORS
+
+logger = logging.getLogger(__name__)
+
+GLOBAL_RATE = 30
+PER_CHAT_RATE = 1
+DEFAULT_MAXSIZE = 1000
+DEFAULT_MAX_CHATS = 10000
+
+
+class TokenBucket:
+    """Ведро токенов: `rate` токенов в секунду, не больше `capacity`."""
+
+    __slots__ = ("rate", "capacity", "_tokens", "_updated")
+
+    def __init__(self, rate: float, capacity: float = 1, now: float = 0.0):
+        """Наполняет корзину до `capacity` токенов на момент `now`."""
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = now
+
+    def _refill(self, now: float) -> None:
+        """Начисляет токены за прошедшее время."""
+        if now > self._updated:
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+
+    def delay(self, now: float) -> float:
+        """Возвращает, сколько секунд ждать до появления токена."""
+        self._refill(now)
+        if self._tokens >= 1:
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    def consume(self, now: float) -> None:
+        """Забирает один токен."""
+        self._refill(now)
+        self._tokens -= 1
+
+
+class SendQueue:
+    """Очередь отправки с общим и поканальным ограничением скорости.
+
+    `put` блокируется, когда в очереди уже `maxsize` сообщений, поэтому
+    опросчики замедляются вместо неограниченного роста памяти. Один
+    поток-диспетчер отправляет сообщения, соблюдая порядок внутри чата,
+    лимит `global_rate` сообщений в секунду на бота и `per_chat_rate` на
+    чат. Ошибка с атрибутом `retry_after` (telegram.error.RetryAfter)
+    приостанавливает всю отправку на указанное время, а сообщение
+    возвращается в начало очереди своего чата.
+
+    Если при `put` передан `on_done`, он вызывается из потока-диспетчера
+    после отправки сообщения: с None при успехе или с исключением, если
+    сообщение не доставлено.
+
+    Время лимитов берётся из `clock`. Если у часов есть `sleep`
+    (SystemClock, VirtualClock), паузы до появления токена и после 429
+    идут через него, и на VirtualClock очередь не ждёт настоящего
+    времени. Пауза через `sleep` не прерывается новым сообщением,
+    поэтому с ней сообщение в новый чат может подождать до конца
+    текущей паузы.
+    """
+
+    def __init__(
+        self,
+        send,
+        global_rate: float = GLOBAL_RATE,
+        per_chat_rate: float = PER_CHAT_RATE,
+        maxsize: int = DEFAULT_MAXSIZE,
+        max_chats: int = DEFAULT_MAX_CHATS,
+        on_failure=None,
+        clock=time.monotonic,
+    ):
+        """Запускает поток отправки с общим и поканальным лимитами."""
+        self.send = send
+        self.global_rate = global_rate
+        self.per_chat_rate = per_chat_rate
+        self.max_chats = max_chats
+        self.on_failure = on_failure
+        self.clock = clock
+        self._sleep = getattr(clock, "sleep", None)
+        self.delivered = 0
+        self.failed = 0
+        self.retried = 0
+        self._slots = threading.BoundedSemaphore(maxsize)
+        self._condition = threading.Condition()
+        self._global = TokenBucket(global_rate, 1, clock())
+        self._buckets = OrderedDict()
+        self._chats = {}
+        self._ready = []
+        self._sequence = itertools.count()
+        self._paused_until = 0.0
+        self._size = 0
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._run, name="send-queue", daemon=True
+        )
+        self._thread.start()
+
+    def __len__(self) -> int:
+        """Возвращает число сообщений в очереди."""
+        return self._size
+
+    def put(
+        self, chat_id, message: str, timeout: float = None, on_done=None
+    ) -> None:
+        """Ставит сообщение в очередь, ожидая места не дольше `timeout`.
+
+        Если место не освободилось, выбрасывает `queue.Full`.
+        """
+        if not self._slots.acquire(timeout=timeout):
+            raise queue.Full("очередь отправки переполнена")
+        with self._condition:
+            if self._closed:
+                self._slots.release()
+                raise RuntimeError("очередь отправки закрыта")
+            messages = self._chats.get(chat_id)
+            if messages is None:
+                messages = self._chats[chat_id] = deque()
+                self._schedule(chat_id, self.clock())
+            messages.append((message, on_done))
+            self._size += 1
+            self._condition.notify()
+
+    def __call__(self, chat_id, message: str) -> None:
+        """Позволяет передавать очередь вместо функции `send`."""
+        self.put(chat_id, message)
+
+    def _schedule(self, chat_id, ready: float) -> None:
+        """Помещает чат в кучу готовности."""
+        heapq.heappush(self._ready, (ready, next(self._sequence), chat_id))
+
+    def _bucket(self, chat_id, now: float) -> TokenBucket:
+        """Возвращает ведро чата, вытесняя давно неактивные чаты."""
+        bucket = self._buckets.get(chat_id)
+        if bucket is None:
+            bucket = self._buckets[chat_id] = TokenBucket(
+                self.per_chat_rate, 1, now
+            )
+            if len(self._buckets) > self.max_chats:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(chat_id)
+        return bucket
+
+    def _next_ready(self):
+        """Возвращает (chat_id, message, on_done) или время ожидания."""
+        while True:
+            now = self.clock()
+            if now < self._paused_until:
+                return self._paused_until - now
+            if not self._ready:
+                return None
+            ready, _, chat_id = self._ready[0]
+            if ready > now:
+                return ready - now
+            wait = self._global.delay(now)
+            if wait:
+                return wait
+            heapq.heappop(self._ready)
+            bucket = self._bucket(chat_id, now)
+            wait = bucket.delay(now)
+            if wait:
+                self._schedule(chat_id, now + wait)
+                continue
+            bucket.consume(now)
+            self._global.consume(now)
+            messages = self._chats[chat_id]
+            message, on_done = messages.popleft()
+            if messages:
+                self._schedule(chat_id, now + bucket.delay(now))
+            else:
+                del self._chats[chat_id]
+            return chat_id, message, on_done
+
+    def _run(self) -> None:
+        """Цикл потока-диспетчера."""
+        while True:
+            with self._condition:
+                item = self._next_ready()
+                while not isinstance(item, tuple):
+                    if self._closed and not self._size:
+                        return
+                    self._wait(item)
+                    item = self._next_ready()
+            self._deliver(*item)
+
+    def _wait(self, seconds) -> None:
+        """Ждёт `seconds` секунд по часам очереди или нового сообщения.
+
+        Вызывается под `_condition`; None — ждать, пока не появится
+        сообщение.
+        """
+        if seconds is None or self._sleep is None:
+            self._condition.wait(seconds)
+            return
+        self._condition.release()
+        try:
+            self._sleep(seconds)
+        finally:
+            self._condition.acquire()
+
+    def _deliver(self, chat_id, message: str, on_done=None) -> None:
+        """Отправляет сообщение и обрабатывает ответ Telegram."""
+        try:
+            with SEND_LATENCY.time(), tracing.span(
+                "send_message", chat_id=chat_id
+            ):
+                self.send(chat_id, message)
+        except Exception as error:
+            TELEGRAM_ERRORS.labels(type(error).__name__).inc()
+            retry_after = getattr(error, "retry_after", None)
+            if retry_after is not None:
+                self._requeue(chat_id, (message, on_done), retry_after)
+                return
+            self.failed += 1
+            logger.error(
+                "Сбой отправки в чат %s: %s",
+                chat_id,
+                error,
+                extra={"chat_id": chat_id, "stage": "send"},
+            )
+            if self.on_failure is not None:
+                self.on_failure(chat_id, message, error)
+            if on_done is not None:
+                on_done(error)
+        else:
+            self.delivered += 1
+            NOTIFICATIONS.inc()
+            if on_done is not None:
+                on_done(None)
+        with self._condition:
+            self._size -= 1
+            self._condition.notify_all()
+        self._slots.release()
+
+    def _requeue(self, chat_id, item: tuple, retry_after: float) -> None:
+        """Возвращает сообщение в начало очереди чата после 429."""
+        logger.warning(
+            "Telegram просит подождать %s с перед отправкой", retry_after
+        )
+        with self._condition:
+            self.retried += 1
+            self._paused_until = self.clock() + retry_after
+            messages = self._chats.get(chat_id)
+            if messages is None:
+                messages = self._chats[chat_id] = deque()
+                self._schedule(chat_id, self._paused_until)
+            messages.appendleft(item)
+            self._condition.notify()
+
+    def join(self, timeout: float = None) -> bool:
+        """Ждёт отправки всех сообщений.
+
+        Возвращает True, если очередь опустела до истечения `timeout`.
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._size, timeout)
+
+    def close(self, timeout: float = None) -> None:
+        """Дожидается отправки очереди и останавливает диспетчер."""
+        self.join(timeout)
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
@@ -0,0 +1,320 @@
+"""Распределение подписок по процессам-шардам."""
+import hashlib
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+from bisect import bisect
+from collections import defaultdict
+
+from status_bot.metrics import REGISTRY, merge_collected
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_VNODES = 160
+DEFAULT_REPORT_INTERVAL = 5.0
+DEFAULT_CHECK_INTERVAL = 1.0
+DEFAULT_RESTART_DELAY = 1.0
+DEFAULT_MAX_RESTART_DELAY = 300.0
+DEFAULT_MAX_FAILURES = 10
+DEFAULT_STABLE_AFTER = 60.0
+
+
+def _point(key: str) -> int:
+    """Возвращает положение ключа на кольце."""
+    return int.from_bytes(
+        hashlib.blake2b(key.encode(), digest_size=8).digest(), "big"
+    )
+
+
+def shard_name(index: int) -> str:
+    """Возвращает имя шарда по номеру."""
+    return f"shard-{index}"
+
+
+class HashRing:
+    """Согласованное хеширование с `vnodes` виртуальными узлами на шард.
+
+    При добавлении или удалении шарда переезжает около 1/K ключей,
+    остальные остаются на своих шардах.
+    """
+
+    def __init__(self, nodes=(), vnodes: int = DEFAULT_VNODES):
+        """Ставит на кольцо узлы `nodes` по `vnodes` точек на каждый."""
+        self.vnodes = vnodes
+        self.nodes = set()
+        self._points = []
+        self._owners = []
+        for node in nodes:
+            self.add(node)
+
+    def __len__(self) -> int:
+        """Возвращает число узлов кольца."""
+        return len(self.nodes)
+
+    def _rebuild(self, ring: dict) -> None:
+        """Сохраняет кольцо в виде двух отсортированных списков."""
+        self._points = sorted(ring)
+        self._owners = [ring[point] for point in self._points]
+
+    def add(self, node: str) -> None:
+        """Добавляет шард на кольцо."""
+        ring = dict(zip(self._points, self._owners))
+        for replica in range(self.vnodes):
+            ring[_point(f"{node}#{replica}")] = node
+        self.nodes.add(node)
+        self._rebuild(ring)
+
+    def remove(self, node: str) -> None:
+        """Убирает шард с кольца."""
+        self.nodes.discard(node)
+        self._rebuild({
+            point: owner
+            for point, owner in zip(self._points, self._owners)
+            if owner != node
+        })
+
+    def node_for(self, key: str) -> str:
+        """Возвращает шард, которому принадлежит ключ."""
+        if not self._points:
+            raise LookupError("на кольце нет шардов")
+        index = bisect(self._points, _point(key)) % len(self._points)
+        return self._owners[index]
+
+    def assign(self, subscriptions) -> dict:
+        """Раскладывает подписки по шардам по их `key`."""
+        shards = {node: [] for node in self.nodes}
+        for subscription in subscriptions:
+            shards[self.node_for(subscription.key)].append(subscription)
+        return shards
+
+
+def _run_worker(name, target, subscriptions, reports, interval) -> None:
+    """Точка входа процесса-шарда: конвейер и отправка метрик."""
+    stopped = threading.Event()
+
+    def report():
+        while not stopped.wait(interval):
+            reports.put((name, REGISTRY.collect()))
+
+    threading.Thread(target=report, name="metrics-report", daemon=True).start()
+    try:
+        target(subscriptions)
+    finally:
+        stopped.set()
+        reports.put((name, REGISTRY.collect()))
+
+
+class Supervisor:
+    """Запускает по процессу на шард и перезапускает упавшие.
+
+    Каждый процесс получает свою часть подписок и вызывает
+    `target(subscriptions)` — конвейер опроса, разбора и отправки.
+    Процессы раз в `report_interval` секунд присылают значения метрик,
+    а `render` складывает их в одну страницу /metrics. Значения
+    процесса, который упал и перезапущен, сохраняются, поэтому счётчики
+    не уменьшаются.
+
+    Упавший шард перезапускается сразу, а если он снова упал быстрее
+    чем за `stable_after` секунд после запуска — через `restart_delay`
+    секунд, и пауза удваивается с каждым быстрым падением подряд до
+    `max_restart_delay`. После `max_failures` быстрых падений подряд
+    шард больше не перезапускается: он попадает в `failed`, а в журнал
+    уходит критическая ошибка.
+    """
+
+    def __init__(
+        self,
+        subscriptions,
+        target,
+        workers: int,
+        vnodes: int = DEFAULT_VNODES,
+        report_interval: float = DEFAULT_REPORT_INTERVAL,
+        context=None,
+        restart_delay: float = DEFAULT_RESTART_DELAY,
+        max_restart_delay: float = DEFAULT_MAX_RESTART_DELAY,
+        max_failures: int = DEFAULT_MAX_FAILURES,
+        stable_after: float = DEFAULT_STABLE_AFTER,
+        clock=time.monotonic,
+    ):
+        """Делит подписки между `workers` шардами; запуск — `start`."""
+        self.subscriptions = list(subscriptions)
+        self.target = target
+        self.report_interval = report_interval
+        self.ring = HashRing(map(shard_name, range(workers)), vnodes)
+        self.restart_delay = restart_delay
+        self.max_restart_delay = max_restart_delay
+        self.max_failures = max_failures
+        self.stable_after = stable_after
+        self.clock = clock
+        self.restarts = 0
+        self.failed = set()
+        self._started_at = {}
+        self._failures = defaultdict(int)
+        self._restart_at = {}
+        self._context = context or multiprocessing.get_context("spawn")
+        self._reports = self._context.Queue()
+        self._processes = {}
+        self._assignments = {}
+        self._latest = {}
+        self._retired = defaultdict(dict)
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+
+    def _spawn(self, name: str) -> None:
+        """Запускает процесс шарда."""
+        process = self._context.Process(
+            target=_run_worker,
+            args=(
+                name,
+                self.target,
+                self._assignments[name],
+                self._reports,
+                self.report_interval,
+            ),
+            name=name,
+            daemon=True,
+        )
+        process.start()
+        self._processes[name] = process
+        self._started_at[name] = self.clock()
+        logger.debug(
+            "Запущен %s: %s подписок", name, len(self._assignments[name])
+        )
+
+    def _retire(self, name: str) -> None:
+        """Переносит последние метрики остановленного процесса в итог."""
+        self.drain()
+        with self._lock:
+            snapshot = self._latest.pop(name, None)
+            if snapshot is not None:
+                self._retired = merge_collected([self._retired, snapshot])
+
+    def start(self) -> "Supervisor":
+        """Раскладывает подписки и запускает все шарды."""
+        self._assignments = self.ring.assign(self.subscriptions)
+        for name in sorted(self._assignments):
+            self._spawn(name)
+        return self
+
+    def drain(self) -> None:
+        """Забирает присланные процессами метрики."""
+        while True:
+            try:
+                name, snapshot = self._reports.get_nowait()
+            except queue.Empty:
+                return
+            with self._lock:
+                self._latest[name] = snapshot
+
+    def check(self) -> int:
+        """Перезапускает завершившиеся процессы и возвращает их число.
+
+        Процесс, чья пауза перед перезапуском ещё не прошла, ждёт
+        следующей проверки.
+        """
+        restarted = 0
+        now = self.clock()
+        for name, process in list(self._processes.items()):
+            if process.is_alive() or self._stopped.is_set():
+                continue
+            if name not in self._restart_at and not self._schedule_restart(
+                name, process.exitcode, now
+            ):
+                continue
+            if now < self._restart_at[name]:
+                continue
+            del self._restart_at[name]
+            self._retire(name)
+            self._spawn(name)
+            restarted += 1
+        self.restarts += restarted
+        self.drain()
+        return restarted
+
+    def _schedule_restart(self, name: str, exitcode, now: float) -> bool:
+        """Назначает перезапуск упавшего шарда; False, если он брошен."""
+        if now - self._started_at[name] >= self.stable_after:
+            self._failures[name] = 0
+        failures = self._failures[name] = self._failures[name] + 1
+        if failures > self.max_failures:
+            logger.critical(
+                "%s упал %s раз подряд сразу после запуска (код %s), "
+                "перезапуски прекращены",
+                name,
+                failures,
+                exitcode,
+            )
+            self._processes.pop(name)
+            self._retire(name)
+            self.failed.add(name)
+            return False
+        delay = 0.0
+        if failures > 1:
+            delay = min(
+                self.restart_delay * 2 ** (failures - 2),
+                self.max_restart_delay,
+            )
+        logger.error(
+            "%s завершился с кодом %s, перезапуск через %.0f с",
+            name,
+            exitcode,
+            delay,
+        )
+        self._restart_at[name] = now + delay
+        return True
+
+    def resize(self, workers: int) -> int:
+        """Меняет число шардов и возвращает число переехавших подписок.
+
+        Перезапускаются только шарды, у которых изменился набор подписок.
+        """
+        wanted = set(map(shard_name, range(workers)))
+        for name in self.ring.nodes - wanted:
+            self.ring.remove(name)
+        for name in wanted - self.ring.nodes:
+            self.ring.add(name)
+        previous = self._assignments
+        self._assignments = self.ring.assign(self.subscriptions)
+        moved = 0
+        for name in set(previous) | set(self._assignments):
+            before = {item.key for item in previous.get(name, ())}
+            after = {item.key for item in self._assignments.get(name, ())}
+            moved += len(after - before)
+            if before == after:
+                continue
+            self._stop_process(name)
+            self._restart_at.pop(name, None)
+            self._failures.pop(name, None)
+            self.failed.discard(name)
+            if name in self._assignments:
+                self._spawn(name)
+        return moved
+
+    def _stop_process(self, name: str, timeout: float = 5.0) -> None:
+        """Останавливает процесс шарда, если он запущен."""
+        process = self._processes.pop(name, None)
+        if process is None:
+            return
+        process.terminate()
+        process.join(timeout)
+        self._retire(name)
+
+    def render(self) -> str:
+        """Возвращает метрики всех шардов одной страницей Prometheus."""
+        self.drain()
+        with self._lock:
+            snapshots = [self._retired, *self._latest.values()]
+        return REGISTRY.render(merge_collected(snapshots))
+
+    def run_forever(self, interval: float = DEFAULT_CHECK_INTERVAL) -> None:
+        """Следит за процессами, пока не вызван `stop`."""
+        while not self._stopped.wait(interval):
+            self.check()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Останавливает все шарды."""
+        self._stopped.set()
+        for name in list(self._processes):
+            self._stop_process(name, timeout)
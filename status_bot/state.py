@@ -0,0 +1,308 @@
+"""Хранение состояния подписок между перезапусками бота."""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from dataclasses import dataclass, field
+
+SubscriptionState = namedtuple("SubscriptionState", ("from_date", "statuses"))
+Pending = namedtuple("Pending", ("id", "key", "chat_id", "message"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS watermarks (
+    subscription TEXT PRIMARY KEY,
+    from_date INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS statuses (
+    subscription TEXT NOT NULL,
+    homework_name TEXT NOT NULL,
+    status TEXT NOT NULL,
+    PRIMARY KEY (subscription, homework_name)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    idempotency_key TEXT UNIQUE,
+    subscription TEXT NOT NULL,
+    chat_id TEXT NOT NULL,
+    message TEXT NOT NULL,
+    delivered_at INTEGER
+);
+CREATE INDEX IF NOT EXISTS outbox_pending ON outbox (id)
+    WHERE delivered_at IS NULL;
+"""
+
+# До outbox неотправленные уведомления хранились в таблице pending.
+MIGRATE_PENDING = """
+BEGIN;
+INSERT INTO outbox (subscription, chat_id, message)
+    SELECT subscription, chat_id, message FROM pending ORDER BY id;
+DROP TABLE pending;
+COMMIT;
+"""
+
+
+def subscription_key(token: str, chat_id) -> str:
+    """Возвращает ключ подписки, не раскрывающий токен."""
+    digest = hashlib.sha256(str(token).encode()).hexdigest()[:16]
+    return f"{chat_id}:{digest}"
+
+
+def notification_key(key: str, homework: dict):
+    """Возвращает ключ идемпотентности уведомления о статусе работы.
+
+    Ключ строится из ключа подписки (токен и чат), названия работы,
+    статуса и `date_updated`: один и тот же переход попадает в outbox
+    один раз, сколько бы раз его ни вернул API. Без `date_updated`
+    повторный переход в тот же статус не отличить от старого, поэтому
+    ключ не строится.
+    """
+    date_updated = homework.get("date_updated")
+    if date_updated is None:
+        return None
+    raw = "\0".join((
+        key,
+        str(homework.get("homework_name")),
+        str(homework.get("status")),
+        str(date_updated),
+    ))
+    return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+
+
+@dataclass
+class StateBatch:
+    """Изменения состояния за один цикл опроса."""
+
+    watermarks: dict = field(default_factory=dict)
+    statuses: list = field(default_factory=list)
+    pending: list = field(default_factory=list)
+    delivered: list = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        """Проверяет, есть ли в пачке хоть одно изменение."""
+        return bool(
+            self.watermarks or self.statuses or self.pending or self.delivered
+        )
+
+    def watermark(self, key: str, from_date: int) -> None:
+        """Запоминает новую метку from_date подписки."""
+        self.watermarks[key] = from_date
+
+    def status(self, key: str, homework_name: str, status: str) -> None:
+        """Запоминает новый статус работы."""
+        self.statuses.append((key, homework_name, status))
+
+    def add_pending(
+        self, key: str, chat_id, message: str, idempotency_key: str = None
+    ) -> None:
+        """Кладёт уведомление в outbox.
+
+        Уведомление с уже известным `idempotency_key` не добавляется.
+        """
+        self.pending.append((idempotency_key, key, str(chat_id), message))
+
+    def mark_delivered(self, pending_id: int) -> None:
+        """Отмечает уведомление из outbox доставленным."""
+        self.delivered.append((pending_id,))
+
+
+class MemoryStateStore:
+    """Хранилище состояния в памяти процесса, без сохранения на диск."""
+
+    def __init__(self, clock=time.time):
+        """Создаёт пустое хранилище."""
+        self.clock = clock
+        self._watermarks = {}
+        self._statuses = {}
+        self._pending = {}
+        self._keys = {}
+        self._delivered = {}
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def load(self) -> dict:
+        """Возвращает состояние всех известных подписок."""
+        with self._lock:
+            return {
+                key: SubscriptionState(
+                    from_date, dict(self._statuses.get(key, {}))
+                )
+                for key, from_date in self._watermarks.items()
+            }
+
+    def pending(
+        self, after: int = 0, limit: int = None, keys=None
+    ) -> list:
+        """Возвращает недоставленные уведомления в порядке добавления.
+
+        Читаются только уведомления с `id` больше `after`, не больше
+        `limit` штук; если задано `keys`, то только этих подписок.
+        """
+        with self._lock:
+            rows = [
+                row for row_id, row in self._pending.items()
+                if row_id > after and (keys is None or row.key in keys)
+            ]
+        return rows[:limit]
+
+    def write(self, batch: StateBatch) -> None:
+        """Применяет изменения цикла."""
+        with self._lock:
+            self._watermarks.update(batch.watermarks)
+            for key, homework_name, status in batch.statuses:
+                self._statuses.setdefault(key, {})[homework_name] = status
+            for idempotency_key, key, chat_id, message in batch.pending:
+                if idempotency_key in self._keys:
+                    continue
+                if idempotency_key is not None:
+                    self._keys[idempotency_key] = self._next_id
+                self._pending[self._next_id] = Pending(
+                    self._next_id, key, chat_id, message
+                )
+                self._next_id += 1
+            now = self.clock()
+            for (pending_id,) in batch.delivered:
+                if self._pending.pop(pending_id, None) is not None:
+                    self._delivered[pending_id] = now
+
+    def prune(self, before: float) -> int:
+        """Удаляет доставленные до `before` уведомления и их ключи."""
+        with self._lock:
+            expired = {
+                row_id for row_id, delivered_at in self._delivered.items()
+                if delivered_at < before
+            }
+            for row_id in expired:
+                del self._delivered[row_id]
+            self._keys = {
+                idempotency_key: row_id
+                for idempotency_key, row_id in self._keys.items()
+                if row_id not in expired
+            }
+            return len(expired)
+
+    def close(self) -> None:
+        """Ничего не делает: данные живут только в памяти."""
+
+
+class SqliteStateStore:
+    """Хранилище состояния в SQLite в режиме WAL.
+
+    Все изменения цикла записываются одной транзакцией через
+    `executemany`, а при старте состояние читается тремя запросами.
+    Уведомления попадают в outbox в той же транзакции, что и новые
+    статусы, поэтому переход статуса не может сохраниться без своего
+    уведомления.
+    """
+
+    def __init__(self, path: str, clock=time.time):
+        """Открывает базу `path`, создаёт схему и переносит pending."""
+        self.path = path
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(SCHEMA)
+        if self._connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'pending'"
+        ).fetchone():
+            self._connection.executescript(MIGRATE_PENDING)
+
+    def load(self) -> dict:
+        """Возвращает состояние всех известных подписок."""
+        with self._lock:
+            cursor = self._connection.cursor()
+            statuses = {}
+            for key, homework_name, status in cursor.execute(
+                "SELECT subscription, homework_name, status FROM statuses"
+            ):
+                statuses.setdefault(key, {})[homework_name] = status
+            return {
+                key: SubscriptionState(from_date, statuses.get(key, {}))
+                for key, from_date in cursor.execute(
+                    "SELECT subscription, from_date FROM watermarks"
+                )
+            }
+
+    def pending(
+        self, after: int = 0, limit: int = None, keys=None
+    ) -> list:
+        """Возвращает недоставленные уведомления в порядке добавления.
+
+        Читаются только уведомления с `id` больше `after`, не больше
+        `limit` штук; если задано `keys`, то только этих подписок.
+        Ключи передаются одним параметром-массивом JSON, поэтому их
+        число не ограничено лимитом параметров SQLite.
+        """
+        query = (
+            "SELECT id, subscription, chat_id, message FROM outbox "
+            "WHERE delivered_at IS NULL AND id > ? "
+        )
+        parameters = [after]
+        if keys is not None:
+            query += (
+                "AND subscription IN (SELECT value FROM json_each(?)) "
+            )
+            parameters.append(json.dumps(list(keys)))
+        parameters.append(-1 if limit is None else limit)
+        with self._lock:
+            return [
+                Pending(*row)
+                for row in self._connection.execute(
+                    query + "ORDER BY id LIMIT ?", parameters
+                )
+            ]
+
+    def write(self, batch: StateBatch) -> None:
+        """Применяет изменения цикла одной транзакцией."""
+        if not batch:
+            return
+        with self._lock:
+            connection = self._connection
+            connection.execute("BEGIN")
+            try:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO watermarks VALUES (?, ?)",
+                    batch.watermarks.items(),
+                )
+                connection.executemany(
+                    "INSERT OR REPLACE INTO statuses VALUES (?, ?, ?)",
+                    batch.statuses,
+                )
+                connection.executemany(
+                    "INSERT OR IGNORE INTO outbox "
+                    "(idempotency_key, subscription, chat_id, message) "
+                    "VALUES (?, ?, ?, ?)",
+                    batch.pending,
+                )
+                now = int(self.clock())
+                connection.executemany(
+                    "UPDATE outbox SET delivered_at = ? WHERE id = ?",
+                    ((now, pending_id) for (pending_id,) in batch.delivered),
+                )
+            except Exception:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+
+    def prune(self, before: float) -> int:
+        """Удаляет доставленные до `before` уведомления и их ключи."""
+        with self._lock:
+            return self._connection.execute(
+                "DELETE FROM outbox WHERE delivered_at < ?", (int(before),)
+            ).rowcount
+
+    def close(self) -> None:
+        """Закрывает соединение с базой."""
+        self._connection.close()
+
+
+def open_state_store(location: str):
+    """Создаёт хранилище по адресу: `memory` или путь к файлу SQLite."""
+    if location == "memory":
+        return MemoryStateStore()
+    return SqliteStateStore(location)
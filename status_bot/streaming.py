@@ -0,0 +1,203 @@
+"""Потоковый разбор ответа homework_statuses без загрузки всего тела."""
+import codecs
+import json
+
+from status_bot import api
+from status_bot.deadline import DeadlineExceeded
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+WHITESPACE = " \t\n\r"
+
+
+class HomeworkStream:
+    """Перебирает работы из массива `homeworks` по одной.
+
+    Тело читается кусками по `chunk_size` байт, в памяти держится
+    только необработанный хвост буфера и текущий элемент. Конверт
+    проверяется по правилам `check_response`: объект верхнего уровня
+    должен быть словарём, а `homeworks` — списком; отсутствие ключа
+    обнаруживается после чтения всего ответа. Остальные ключи (например,
+    `current_date`) доступны через `get` после перебора.
+
+    Когда перебор закончен, прерван или упал, источник кусков
+    закрывается через `close`.
+    """
+
+    def __init__(self, chunks):
+        """Готовит разбор кусков `chunks`; читать их начинает перебор."""
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+        self._consumed = False
+        self.count = 0
+        self.meta = {}
+
+    def __len__(self) -> int:
+        """Возвращает число уже разобранных работ."""
+        return self.count
+
+    def get(self, key: str, default=None):
+        """Возвращает ключ ответа, кроме `homeworks`, как dict.get."""
+        return self.meta.get(key, default)
+
+    def close(self) -> None:
+        """Прекращает чтение тела и закрывает источник кусков."""
+        close = getattr(self._chunks, "close", None)
+        if close is not None:
+            close()
+
+    def _fill(self) -> bool:
+        """Дочитывает следующий кусок тела; False, если тело кончилось."""
+        if self._eof:
+            return False
+        for chunk in self._chunks:
+            if chunk:
+                self._buffer += self._decoder.decode(chunk)
+                return True
+        self._buffer += self._decoder.decode(b"", final=True)
+        self._eof = True
+        return False
+
+    def _peek(self) -> str:
+        """Возвращает следующий значимый символ, не сдвигая позицию."""
+        if self._pos > len(self._buffer) // 2:
+            self._buffer = self._buffer[self._pos:]
+            self._pos = 0
+        while True:
+            buffer = self._buffer
+            while self._pos < len(buffer) and buffer[self._pos] in WHITESPACE:
+                self._pos += 1
+            if self._pos < len(buffer):
+                return buffer[self._pos]
+            if not self._fill():
+                raise ValueError("Ответ API домашки оборвался")
+
+    def _expect(self, *chars: str) -> str:
+        """Забирает символ, который должен быть одним из `chars`."""
+        char = self._peek()
+        if char not in chars:
+            raise ValueError(
+                f"Некорректный JSON в ответе API домашки: {char!r}"
+            )
+        self._pos += 1
+        return char
+
+    def _value(self):
+        """Разбирает одно JSON-значение целиком."""
+        self._peek()
+        while True:
+            try:
+                value, end = self._json.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # Число в конце буфера могло быть обрезано на границе куска.
+            if end < len(self._buffer) or self._eof or not self._fill():
+                self._pos = end
+                return value
+
+    def __iter__(self):
+        """Выдаёт элементы `homeworks` по мере чтения тела."""
+        if self._consumed:
+            raise RuntimeError("Ответ API домашки уже прочитан")
+        self._consumed = True
+        try:
+            yield from self._parse()
+        finally:
+            self.close()
+
+    def _parse(self):
+        """Разбирает конверт ответа и выдаёт элементы `homeworks`."""
+        first = self._peek()
+        if first != "{":
+            raise TypeError(
+                "В ответе был получен не объект, ожидался объект типа dict"
+            )
+        self._pos += 1
+        seen_homeworks = False
+        if self._peek() == "}":
+            self._pos += 1
+        else:
+            while True:
+                key = self._value()
+                self._expect(":")
+                if key == "homeworks":
+                    seen_homeworks = True
+                    yield from self._homeworks()
+                else:
+                    self.meta[key] = self._value()
+                if self._expect(",", "}") == "}":
+                    break
+        if not seen_homeworks:
+            raise ValueError("в ответе API домашки нет ключа homeworks")
+
+    def _homeworks(self):
+        """Выдаёт элементы массива `homeworks`."""
+        if self._peek() != "[":
+            raise TypeError(
+                "Под ключом homeworks получен не список, "
+                "ожидался объект типа list"
+            )
+        self._pos += 1
+        if self._peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            homework = self._value()
+            if not isinstance(homework, dict):
+                raise TypeError(
+                    f"В списке homeworks получен объект типа "
+                    f"{type(homework)}, ожидался объект типа dict"
+                )
+            self.count += 1
+            yield homework
+            if self._expect(",", "]") == "]":
+                return
+
+
+def stream_api_answer(
+    headers: dict,
+    timestamp: int,
+    endpoint: str = api.ENDPOINT,
+    session=None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    deadline=None,
+    hedger=None,
+) -> HomeworkStream:
+    """Делает запрос к API и возвращает потоковый разбор ответа.
+
+    `deadline` и `hedger` ограничивают ожидание заголовков ответа.
+    Тело читается уже при разборе, и тот же `deadline` ограничивает
+    его чтение; ответ закрывается, когда разбор закончен или прерван.
+    """
+    response = api.request_api(
+        headers, timestamp, endpoint, session, stream=True,
+        deadline=deadline, hedger=hedger,
+    )
+    return HomeworkStream(read_body(response, chunk_size, deadline))
+
+
+def read_body(response, chunk_size: int, deadline=None):
+    """Выдаёт куски тела `response` и закрывает его в конце.
+
+    Если `deadline` истёк, чтение прерывается DeadlineExceeded.
+    """
+    try:
+        for chunk in response.iter_content(chunk_size):
+            if deadline is not None and deadline.expired:
+                raise DeadlineExceeded(
+                    f"Срок чтения ответа API ({deadline.budget:.1f} с) истёк"
+                )
+            yield chunk
+    finally:
+        response.close()
+
+
+def iter_messages(homeworks):
+    """Лениво превращает работы в сообщения через `parse_status`."""
+    for homework in homeworks:
+        yield api.parse_status(homework)
@@ -0,0 +1,361 @@
+"""Трассировка этапов цикла опроса: спаны и их экспорт.
+
+Пока экспортёр не задан (`configure(None)`), `span` возвращает общий
+пустой спан, и цена трассировки — один вызов функции и проверка
+глобальной переменной.
+"""
+import contextvars
+import json
+import logging
+import queue
+import random
+import threading
+import time
+from functools import wraps
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 512
+DEFAULT_QUEUE_SIZE = 8192
+DEFAULT_INTERVAL = 5.0
+SERVICE_NAME = "telegram-status-bot"
+
+_current = contextvars.ContextVar("status_bot_span", default=None)
+_exporter = None
+
+
+class Span:
+    """Отрезок работы с идентификаторами трассы и родителя.
+
+    Время начала и конца — в наносекундах Unix. Закрытый спан передаётся
+    экспортёру; исключение, вышедшее из блока `with`, записывается
+    в `error`.
+    """
+
+    __slots__ = (
+        "name", "trace_id", "span_id", "parent_id", "attributes",
+        "start", "end", "error", "_token",
+    )
+    recording = True
+
+    def __init__(self, name: str, parent=None, attributes=None):
+        """Берёт trace id у `parent` или заводит новый."""
+        self.name = name
+        if parent is None:
+            self.trace_id = f"{random.getrandbits(128):032x}"
+            self.parent_id = None
+        else:
+            self.trace_id = parent.trace_id
+            self.parent_id = parent.span_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.attributes = attributes or {}
+        self.start = self.end = 0
+        self.error = None
+
+    def set_attribute(self, key: str, value) -> None:
+        """Добавляет атрибут спана, например код ответа HTTP."""
+        self.attributes[key] = value
+
+    def __enter__(self):
+        """Открывает спан и делает его текущим."""
+        self.start = time.time_ns()
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        """Закрывает спан, записывает ошибку и отдаёт его экспортёру."""
+        self.end = time.time_ns()
+        _current.reset(self._token)
+        if exc_type is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        exporter = _exporter
+        if exporter is not None:
+            exporter.export(self)
+        return False
+
+    @property
+    def duration(self) -> float:
+        """Длительность спана в секундах."""
+        return (self.end - self.start) / 1e9
+
+    def to_dict(self) -> dict:
+        """Возвращает спан в виде словаря для JSON."""
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start": self.start,
+            "end": self.end,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class _NoopSpan:
+    """Спан, который ничего не записывает: трассировка выключена."""
+
+    __slots__ = ()
+    recording = False
+
+    def set_attribute(self, key: str, value) -> None:
+        """Ничего не делает."""
+
+    def __enter__(self):
+        """Возвращает сам спан."""
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        """Не подавляет исключения."""
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def span(name: str, **attributes):
+    """Возвращает спан `name` для блока `with`.
+
+    Спан становится дочерним для текущего спана контекста. Атрибуты,
+    которые дорого вычислять, стоит добавлять после проверки
+    `span.recording`.
+    """
+    if _exporter is None:
+        return NOOP_SPAN
+    return Span(name, _current.get(), attributes)
+
+
+def traced(name: str = None):
+    """Декоратор: выполняет функцию внутри спана `name`."""
+    def decorator(func):
+        span_name = name or func.__name__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if _exporter is None:
+                return func(*args, **kwargs)
+            with Span(span_name, _current.get()):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def current_span():
+    """Возвращает текущий спан контекста или None."""
+    return _current.get()
+
+
+def configure(exporter):
+    """Задаёт экспортёр спанов; None выключает трассировку.
+
+    Возвращает прежний экспортёр.
+    """
+    global _exporter
+    previous, _exporter = _exporter, exporter
+    return previous
+
+
+def current_exporter():
+    """Возвращает заданный экспортёр спанов или None."""
+    return _exporter
+
+
+class MemoryExporter:
+    """Хранит закрытые спаны в списке `spans`, для тестов и отладки."""
+
+    def __init__(self):
+        """Создаёт пустой список спанов."""
+        self.spans = []
+
+    def export(self, span: Span) -> None:
+        """Сохраняет спан."""
+        self.spans.append(span)
+
+    def shutdown(self) -> None:
+        """Ничего не делает: спаны живут в памяти."""
+
+
+class JsonLinesExporter:
+    """Дописывает каждый спан строкой JSON в файл `path`."""
+
+    def __init__(self, path: str):
+        """Открывает файл `path` на дозапись."""
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        """Записывает спан в файл."""
+        line = json.dumps(span.to_dict(), ensure_ascii=False, default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def shutdown(self) -> None:
+        """Закрывает файл."""
+        with self._lock:
+            self._file.close()
+
+
+def _otlp_value(value) -> dict:
+    """Возвращает значение атрибута в кодировке OTLP/JSON."""
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def otlp_span(span: Span) -> dict:
+    """Возвращает спан в формате OTLP/JSON."""
+    entry = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": 1,
+        "startTimeUnixNano": str(span.start),
+        "endTimeUnixNano": str(span.end),
+        "attributes": [
+            {"key": key, "value": _otlp_value(value)}
+            for key, value in span.attributes.items()
+        ],
+    }
+    if span.parent_id is not None:
+        entry["parentSpanId"] = span.parent_id
+    if span.error is not None:
+        entry["status"] = {"code": 2, "message": span.error}
+    return entry
+
+
+class OtlpExporter:
+    """Отправляет спаны пачками по `batch_size` в коллектор OTLP/HTTP.
+
+    Тело запроса — JSON по спецификации OTLP на `<endpoint>/v1/traces`.
+    `export` только кладёт спан в очередь на `max_queue` спанов, а пачки
+    отправляет фоновый поток, так что опрос не ждёт коллектор. Пачка
+    уходит, когда в ней `batch_size` спанов или когда первый спан
+    пролежал в ней `interval` секунд. Если очередь полна или коллектор
+    ответил сбоем, спаны отбрасываются и учитываются в `dropped`.
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        timeout: float = 5.0,
+        max_queue: int = DEFAULT_QUEUE_SIZE,
+        interval: float = DEFAULT_INTERVAL,
+    ):
+        """Запускает поток, шлющий пачки на `<endpoint>/v1/traces`."""
+        self.url = endpoint.rstrip("/") + "/v1/traces"
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.interval = interval
+        self.exported = 0
+        self.dropped = 0
+        self._queue = queue.Queue(max_queue)
+        self._thread = threading.Thread(
+            target=self._run, name="otlp-exporter", daemon=True
+        )
+        self._thread.start()
+
+    def export(self, span: Span) -> None:
+        """Ставит спан в очередь отправки, не дожидаясь коллектора."""
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self, timeout: float = None) -> bool:
+        """Отправляет спаны, поставленные в очередь до вызова.
+
+        Возвращает True, если отправка закончилась до `timeout`.
+        """
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def shutdown(self) -> None:
+        """Отправляет оставшиеся спаны и останавливает поток."""
+        self._queue.put(None)
+        self._thread.join()
+
+    def _next(self, deadline):
+        """Ждёт элемент очереди до `deadline`; False, если не дождался."""
+        timeout = None
+        if deadline is not None:
+            timeout = max(deadline - time.monotonic(), 0)
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return False
+
+    def _run(self) -> None:
+        """Цикл фонового потока: собирает пачки и отправляет их.
+
+        В очереди, кроме спанов, бывают Event от `flush` и None от
+        `shutdown`: оба отправляют неполную пачку.
+        """
+        spans = []
+        deadline = None
+        while True:
+            item = self._next(deadline)
+            if isinstance(item, Span):
+                spans.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.interval
+                if len(spans) < self.batch_size:
+                    continue
+            if spans:
+                self._post(spans)
+                spans, deadline = [], None
+            if item is None:
+                return
+            if isinstance(item, threading.Event):
+                item.set()
+
+    def _post(self, spans: list) -> None:
+        """Отправляет пачку спанов коллектору."""
+        from urllib.request import Request, urlopen
+
+        body = json.dumps({"resourceSpans": [{
+            "resource": {"attributes": [{
+                "key": "service.name",
+                "value": {"stringValue": SERVICE_NAME},
+            }]},
+            "scopeSpans": [{
+                "scope": {"name": "status_bot"},
+                "spans": [otlp_span(span) for span in spans],
+            }],
+        }]}).encode()
+        request = Request(
+            self.url, body, {"Content-Type": "application/json"}
+        )
+        try:
+            with urlopen(request, timeout=self.timeout) as response:
+                response.read()
+        except OSError as error:
+            self.dropped += len(spans)
+            logger.error("Сбой отправки спанов в %s: %s", self.url, error)
+            return
+        self.exported += len(spans)
+
+
+def open_exporter(spec: str):
+    """Создаёт экспортёр по строке из окружения.
+
+    `memory`, `jsonl:<путь к файлу>` или `otlp:<адрес коллектора>`;
+    пустая строка — трассировка выключена (None).
+    """
+    if not spec:
+        return None
+    if spec == "memory":
+        return MemoryExporter()
+    kind, _, target = spec.partition(":")
+    if kind == "jsonl":
+        return JsonLinesExporter(target)
+    if kind == "otlp":
+        return OtlpExporter(target)
+    raise ValueError(f"Неизвестный экспортёр спанов: {spec}")
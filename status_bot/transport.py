@@ -0,0 +1,91 @@
+"""Общий пул keep-alive соединений для API Практикума и Telegram."""
+from status_bot.lazy import LazyModule
+
+requests = LazyModule("requests")
+
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_READ_TIMEOUT = 30.0
+DEFAULT_TIMEOUT = (DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT)
+# Общий срок запроса вместе с чтением тела ответа.
+DEFAULT_TOTAL_TIMEOUT = 60.0
+DEFAULT_POOL_HOSTS = 4
+DEFAULT_POOL_SIZE = 10
+
+
+class HttpPool:
+    """Сессия requests с ограниченным пулом соединений на каждый хост.
+
+    Соединения переиспользуются между запросами, поэтому TCP и TLS
+    рукопожатия выполняются один раз на соединение, а не на каждый
+    `get_api_answer`. При `block=True` запросы сверх `pool_size` ждут
+    свободного соединения вместо открытия новых.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        pool_hosts: int = DEFAULT_POOL_HOSTS,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float = DEFAULT_READ_TIMEOUT,
+        block: bool = True,
+        verify=True,
+    ):
+        """Создаёт сессию requests с пулом на `pool_size` соединений."""
+        self.pool_size = pool_size
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.verify = verify
+        from requests.adapters import HTTPAdapter
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_hosts,
+            pool_maxsize=pool_size,
+            pool_block=block,
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    @property
+    def timeout(self) -> tuple:
+        """Таймауты соединения и чтения в формате requests."""
+        return (self.connect_timeout, self.read_timeout)
+
+    def get(self, url: str, **kwargs) -> "requests.Response":
+        """Выполняет GET-запрос через пул с таймаутами по умолчанию."""
+        kwargs.setdefault("timeout", self.timeout)
+        kwargs.setdefault("verify", self.verify)
+        return self.session.get(url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> "requests.Response":
+        """Выполняет POST-запрос через пул с таймаутами по умолчанию."""
+        kwargs.setdefault("timeout", self.timeout)
+        kwargs.setdefault("verify", self.verify)
+        return self.session.post(url, **kwargs)
+
+    def telegram_request(self):
+        """Возвращает объект Request для telegram.Bot с теми же лимитами.
+
+        python-telegram-bot держит собственный пул urllib3, поэтому
+        соединения с Telegram настраиваются отдельно, но по тем же
+        параметрам размера пула и таймаутов.
+        """
+        from telegram.utils.request import Request
+
+        return Request(
+            con_pool_size=self.pool_size,
+            connect_timeout=self.connect_timeout,
+            read_timeout=self.read_timeout,
+        )
+
+    def close(self) -> None:
+        """Закрывает все соединения пула."""
+        self.session.close()
+
+    def __enter__(self):
+        """Возвращает сам пул."""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Закрывает все соединения пула."""
+        self.close()
@@ -0,0 +1,97 @@
+"""Метка from_date с окном перекрытия и отсевом повторов."""
+import logging
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OVERLAP = 60
+
+
+def updated_at(homework: dict):
+    """Возвращает `date_updated` работы в секундах Unix или None."""
+    value = homework.get("date_updated")
+    if not isinstance(value, str):
+        return None
+    try:
+        return int(
+            datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+        )
+    except ValueError:
+        return None
+
+
+class Watermark:
+    """Окно перекрытия для метки from_date одной подписки.
+
+    Сама метка — `current_date` последнего ответа — хранится в
+    хранилище состояния. Запрос уходит с меткой, уменьшенной на
+    `overlap` секунд, чтобы расхождение часов бота и API не потеряло
+    работу, обновлённую на границе. Работы, которые попали в ответ
+    повторно из-за перекрытия, `fresh` отсеивает по паре
+    (`homework_name`, `date_updated`), а `commit` запоминает их, когда
+    результат цикла записан.
+
+    Отсев держится только в памяти: после перезапуска повтор отсеет
+    StatusDiff (статус не изменился) и ключ идемпотентности outbox.
+    """
+
+    __slots__ = ("overlap", "_seen", "_staged")
+
+    def __init__(self, overlap: int = DEFAULT_OVERLAP):
+        """Задаёт окно перекрытия `overlap` в секундах."""
+        self.overlap = overlap
+        self._seen = {}
+        self._staged = {}
+
+    def __len__(self) -> int:
+        """Возвращает число запомненных работ."""
+        return len(self._seen)
+
+    def request_from(self, from_date: int) -> int:
+        """Возвращает значение from_date для запроса с учётом перекрытия."""
+        return max(from_date - self.overlap, 0)
+
+    def fresh(self, homeworks):
+        """Лениво пропускает работы, ещё не встречавшиеся в перекрытии.
+
+        Пропущенные работы откладываются и считаются увиденными только
+        после `commit`: если обработка ответа или запись её результата
+        упали, в следующем цикле работы придут снова. Каждый вызов
+        отбрасывает работы, отложенные прошлым вызовом.
+        """
+        seen = self._seen
+        staged = self._staged = {}
+        for homework in homeworks:
+            key = (homework.get("homework_name"), homework.get("date_updated"))
+            if key in seen or key in staged:
+                continue
+            yield homework
+            staged[key] = updated_at(homework)
+
+    def advance(self, from_date: int, response) -> int:
+        """Возвращает новую метку по `current_date` ответа.
+
+        Если `current_date` нет или это не число, метка не меняется:
+        иначе следующий запрос ушёл бы без from_date и вернул бы всю
+        историю.
+        """
+        current = response.get("current_date")
+        if isinstance(current, bool) or not isinstance(current, int):
+            logger.warning(
+                "В ответе API некорректный current_date: %r", current
+            )
+            return from_date
+        return current
+
+    def commit(self, from_date: int) -> None:
+        """Запоминает работы последнего `fresh` после записи состояния.
+
+        Запомненные работы старше окна метки `from_date` забываются.
+        """
+        horizon = self.request_from(from_date)
+        self._seen.update(self._staged)
+        self._staged = {}
+        self._seen = {
+            key: updated for key, updated in self._seen.items()
+            if updated is not None and updated >= horizon
+        }
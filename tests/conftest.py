@@ -1,5 +1,12 @@
-import sys
+import json
 import os
+import sys
+from http import HTTPStatus
+
+import pytest
+import requests
+
+import utils
 
 
 root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -25,4 +32,62 @@ pytest_plugins = [
 os.environ['PRACTICUM_TOKEN'] = 'sometoken'
 os.environ['TELEGRAM_TOKEN'] = '1234:abcdefg'
 os.environ['TELEGRAM_CHAT_ID'] = '12345'
+os.environ['STATE_DB'] = 'memory'
+
+
+class FakePracticum:
+    """Замена `requests.get`: API Практикума с заданным ответом.
+
+    Отвечает `body`, если он задан, иначе `homeworks` и `current_date`;
+    `step` сдвигает current_date на каждый запрос. Аргументы запросов
+    копятся в `calls`. Перед ответом вызывается `on_request` с теми же
+    аргументами: он может замедлить ответ или бросить исключение.
+    С `etag` на запрос с совпавшим `If-None-Match` приходит 304.
+    """
+
+    def __init__(self):
+        self.homeworks = []
+        self.current_date = 1
+        self.step = 0
+        self.body = None
+        self.status = HTTPStatus.OK
+        self.etag = None
+        self.on_request = None
+        self.calls = []
+
+    def __call__(self, *args, **kwargs):
+        self.calls.append(kwargs)
+        if self.on_request is not None:
+            self.on_request(*args, **kwargs)
+        self.current_date += self.step
+        headers = kwargs.get('headers') or {}
+        if self.etag and headers.get('If-None-Match') == self.etag:
+            response = utils.MockResponseGET(
+                http_status=HTTPStatus.NOT_MODIFIED
+            )
+            response.content = b''
+            response.headers = {}
+            return response
+        data = self.body if self.body is not None else {
+            'homeworks': self.homeworks, 'current_date': self.current_date,
+        }
+        response = utils.MockResponseGET(http_status=self.status)
+        response.json = lambda: data
+        response.content = json.dumps(data).encode()
+        response.headers = {'ETag': self.etag} if self.etag else {}
+        return response
+
+    @property
+    def tokens(self) -> list:
+        return [call['headers']['Authorization'] for call in self.calls]
+
+    @property
+    def from_dates(self) -> list:
+        return [call['params']['from_date'] for call in self.calls]
+
 
+@pytest.fixture
+def practicum(monkeypatch):
+    fake = FakePracticum()
+    monkeypatch.setattr(requests, 'get', fake)
+    return fake
@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+
+from status_bot import poller
+from status_bot.adaptive import AdaptivePolicy, RequestBudget
+from status_bot.clock import VirtualClock
+from status_bot.schedule import PollScheduler
+
+
+class TestAdaptivePolicy:
+    policy = AdaptivePolicy(600, active=120, ceiling=2400, backoff=2)
+
+    def test_reviewing_polled_faster(self):
+        assert self.policy.interval(
+            2400, ['approved', 'reviewing'], False
+        ) == 120, 'Работу на проверке нужно опрашивать чаще.'
+
+    def test_rejected_and_changed_keep_period(self):
+        assert self.policy.interval(120, ['rejected'], False) == 600
+        assert self.policy.interval(2400, ['approved'], True) == 600
+
+    def test_idle_backs_off_to_ceiling(self):
+        intervals = [120]
+        for _ in range(4):
+            intervals.append(
+                self.policy.interval(intervals[-1], ['approved'], False)
+            )
+        assert intervals == [120, 1200, 2400, 2400, 2400], (
+            'Убедитесь, что период без изменений растёт до потолка.'
+        )
+        assert self.policy.interval(600, [], False) == 1200
+
+
+class TestRequestBudget:
+
+    def test_take_limited_by_rate(self):
+        budget = RequestBudget(60, now=0)
+        assert budget.take(10, 0) == 2
+        assert budget.take(10, 0) == 0
+        assert budget.take(10, 1) == 1
+        assert budget.delay(0, 1) == pytest.approx(1)
+        assert budget.delay(2, 1) == pytest.approx(3)
+
+    def test_admit_defers_excess(self):
+        clock = VirtualClock(start=1000.0)
+        scheduler = PollScheduler(600, jitter=0, clock=clock)
+        for key, period in (('idle', 1200), ('active', 120), ('new', 600)):
+            scheduler.add(key, delay=0, period=period)
+        budget = RequestBudget(60, now=clock.now)
+        due = budget.admit(scheduler, scheduler.due())
+        assert due == ['active', 'new'], (
+            'Убедитесь, что первыми проходят подписки с коротким периодом.'
+        )
+        assert scheduler.next_at() == 1001
+        clock.now = 1001
+        assert budget.admit(scheduler, scheduler.due()) == ['idle']
+
+
+def test_poller_applies_policy(practicum):
+    practicum.homeworks = [{'homework_name': 'hw1', 'status': 'reviewing'}]
+    subscription = poller.Subscription('token', '1')
+    instance = poller.AsyncPoller(
+        [subscription],
+        send=lambda chat_id, message: None,
+        policy=AdaptivePolicy(600, active=120),
+    )
+    try:
+        asyncio.run(instance.run_cycle())
+    finally:
+        instance.close()
+    assert instance.scheduler.period_of(subscription.key) == 120
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,40 @@
+import pytest
+
+from status_bot.api import STATUS_CODES, parse_status, render_message
+
+
+class TestParseStatus:
+
+    def test_message_shared_between_calls(self):
+        data = {'homework_name': 'hw1', 'status': 'reviewing', 'id': 1}
+        assert parse_status(data) is parse_status(dict(data)), (
+            'Убедитесь, что текст уведомления берётся из кэша.'
+        )
+
+    def test_status_codes_are_interned(self):
+        status = ''.join(['appr', 'oved'])
+        assert STATUS_CODES[status] is STATUS_CODES['approved']
+
+    @pytest.mark.parametrize('data', [
+        {'homework_name': 'hw1', 'status': 'unknown'},
+        {'homework_name': 'hw1'},
+        {'status': 'approved'},
+    ])
+    def test_invalid_homework(self, data):
+        with pytest.raises(KeyError) as error:
+            parse_status(data)
+        assert repr(error.value) not in (
+            "KeyError('unknown')", "KeyError('homework_name')",
+            "KeyError('status')"
+        ), 'Убедитесь, что текст ошибки объясняет проблему.'
+
+
+def test_render_message_is_cached():
+    render_message.cache_clear()
+    first = render_message('hw1', 'approved')
+    assert render_message('hw1', 'approved') is first
+    assert render_message.cache_info().hits == 1
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,165 @@
+import asyncio
+from http import HTTPStatus
+
+import pytest
+
+import homework
+from benchmarks.simulation import RecordingBot
+from status_bot.api import ApiStatusError, is_outage
+from status_bot.breaker import (CLOSED, HALF_OPEN, OPEN, CircuitBreaker,
+                                CircuitOpenError)
+from status_bot.clock import VirtualClock
+from status_bot.deadline import DeadlineExceeded
+from status_bot.poller import AsyncPoller, Subscription
+from status_bot.state import MemoryStateStore
+
+
+def fail():
+    raise SystemError('сеть недоступна')
+
+
+def make_breaker(clock, **kwargs):
+    kwargs.setdefault('window', 4)
+    kwargs.setdefault('min_calls', 4)
+    kwargs.setdefault('reset_timeout', 10)
+    return CircuitBreaker('api', clock=clock, **kwargs)
+
+
+def trip(breaker):
+    for _ in range(breaker.min_calls):
+        with pytest.raises(SystemError):
+            breaker.call(fail)
+
+
+class TestCircuitBreaker:
+
+    def test_opens_on_failure_rate(self):
+        breaker = make_breaker(VirtualClock(), failure_rate=0.5)
+        breaker.call(lambda: None)
+        breaker.call(lambda: None)
+        with pytest.raises(SystemError):
+            breaker.call(fail)
+        assert breaker.state == CLOSED
+        with pytest.raises(SystemError):
+            breaker.call(fail)
+        assert breaker.state == OPEN, (
+            'Убедитесь, что выключатель размыкается при доле сбоев 50%.'
+        )
+
+    def test_open_rejects_without_calling(self):
+        breaker = make_breaker(VirtualClock())
+        trip(breaker)
+        calls = []
+        with pytest.raises(CircuitOpenError) as error:
+            breaker.call(calls.append, 1)
+        assert not calls, 'Разомкнутый выключатель не должен вызывать службу.'
+        assert error.value.retry_after == 10
+        assert breaker.rejected == 1
+
+    def test_half_open_probe_closes(self):
+        clock = VirtualClock()
+        breaker = make_breaker(clock)
+        trip(breaker)
+        clock.now = 10
+        assert breaker.allow()
+        assert breaker.state == HALF_OPEN
+        assert not breaker.allow(), 'Допускается только один пробный вызов.'
+        breaker.record(True)
+        assert breaker.state == CLOSED
+
+    def test_failed_probe_doubles_timeout(self):
+        clock = VirtualClock()
+        breaker = make_breaker(clock, max_reset_timeout=15)
+        trip(breaker)
+        clock.now = 10
+        with pytest.raises(SystemError):
+            breaker.call(fail)
+        assert breaker.state == OPEN
+        assert breaker.retry_after() == 15, (
+            'Срок размыкания растёт вдвое, но не выше max_reset_timeout.'
+        )
+
+    def test_ignored_errors_do_not_trip(self):
+        breaker = make_breaker(VirtualClock(), is_failure=is_outage)
+
+        def bad_token():
+            raise ApiStatusError('401', 401)
+
+        for _ in range(10):
+            with pytest.raises(ApiStatusError):
+                breaker.call(bad_token)
+        assert breaker.state == CLOSED
+
+    def test_stalled_api_trips(self):
+        breaker = make_breaker(VirtualClock(), is_failure=is_outage)
+
+        def stalled():
+            raise DeadlineExceeded('срок запроса истёк')
+
+        for _ in range(breaker.min_calls):
+            with pytest.raises(DeadlineExceeded):
+                breaker.call(stalled)
+        assert breaker.state == OPEN, (
+            'Убедитесь, что зависания API размыкают цепь.'
+        )
+
+    def test_transition_events(self):
+        clock = VirtualClock()
+        breaker = make_breaker(clock)
+        events = []
+        breaker.subscribe(lambda *event: events.append(event))
+        trip(breaker)
+        clock.now = 10
+        breaker.call(lambda: None)
+        assert events == [
+            ('api', CLOSED, OPEN),
+            ('api', OPEN, HALF_OPEN),
+            ('api', HALF_OPEN, CLOSED),
+        ]
+
+
+def test_poller_stops_calling_flaky_api(practicum):
+    practicum.status = HTTPStatus.SERVICE_UNAVAILABLE
+    breaker = CircuitBreaker('api', min_calls=5, is_failure=is_outage)
+    poller = AsyncPoller(
+        [Subscription(f'token-{i}', str(i)) for i in range(50)],
+        send=lambda chat_id, message: None,
+        concurrency=1,
+        breaker=breaker,
+    )
+    try:
+        stats = asyncio.run(poller.run_cycle())
+    finally:
+        poller.close()
+    assert stats.failed == 50
+    assert len(practicum.calls) == 5, (
+        'Убедитесь, что после размыкания выключателя запросы к API '
+        'не отправляются.'
+    )
+    assert breaker.rejected == 45
+
+
+def test_main_loop_uses_breakers(caplog):
+    clock = VirtualClock()
+    calls = []
+
+    def fetch(timestamp):
+        calls.append(timestamp)
+        raise ApiStatusError('API недоступен', 503)
+
+    bot = RecordingBot(clock)
+    loop = homework.PollLoop(bot, MemoryStateStore(), fetch=fetch, clock=clock)
+    for _ in range(10):
+        loop.cycle()
+        clock.sleep(1)
+    assert loop.api_breaker.state == OPEN and len(calls) == 5, (
+        'Убедитесь, что main() опрашивает API через выключатель.'
+    )
+    assert len(bot.messages) == 1, (
+        'Разомкнутый выключатель не должен сообщаться как новая ошибка.'
+    )
+    assert loop.bot.breaker is loop.telegram_breaker
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,90 @@
+import pytest
+
+from status_bot.cache import ResponseCache
+
+
+class TestResponseCache:
+    HEADERS = {'Authorization': 'OAuth token'}
+
+    @pytest.fixture
+    def server(self, practicum):
+        practicum.homeworks = [{'homework_name': 'hw1', 'status': 'reviewing'}]
+        practicum.current_date = 100
+        practicum.step = 1
+        return practicum
+
+    def test_unchanged_body_is_hit(self, server):
+        cache = ResponseCache()
+        first = cache.fetch(self.HEADERS, 0)
+        cache.commit(self.HEADERS, 0)
+        second = cache.fetch(self.HEADERS, 0)
+        assert first.changed and not second.changed
+        assert second.homeworks is first.homeworks, (
+            'Убедитесь, что при совпадении тела ответ не разбирается заново.'
+        )
+        assert second.response['current_date'] == server.current_date
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_changed_body_is_miss(self, server):
+        cache = ResponseCache()
+        cache.fetch(self.HEADERS, 0)
+        cache.commit(self.HEADERS, 0)
+        server.homeworks = [{'homework_name': 'hw1', 'status': 'approved'}]
+        result = cache.fetch(self.HEADERS, 0)
+        assert result.changed and result.homeworks[0]['status'] == 'approved'
+
+    def test_conditional_request(self, server):
+        server.etag = '"v1"'
+        cache = ResponseCache()
+        cache.fetch(self.HEADERS, 0)
+        cache.commit(self.HEADERS, 0)
+        result = cache.fetch(self.HEADERS, 0)
+        assert server.calls[1]['headers']['If-None-Match'] == '"v1"', (
+            'Убедитесь, что повторный запрос отправляет `If-None-Match`.'
+        )
+        assert 'If-None-Match' not in self.HEADERS
+        assert not result.changed and cache.not_modified == 1
+
+    def test_ttl_and_key(self, server):
+        now = [0]
+        cache = ResponseCache(ttl=10, clock=lambda: now[0])
+        cache.fetch(self.HEADERS, 0)
+        cache.commit(self.HEADERS, 0)
+        assert cache.fetch(self.HEADERS, 1).changed, (
+            'Убедитесь, что ключ кэша учитывает from_date.'
+        )
+        now[0] = 11
+        assert cache.fetch(self.HEADERS, 0).changed, (
+            'Убедитесь, что устаревшая запись не используется.'
+        )
+
+    def test_lru_bound(self, server):
+        cache = ResponseCache(maxsize=2)
+        for timestamp in range(5):
+            cache.fetch(self.HEADERS, timestamp)
+            cache.commit(self.HEADERS, timestamp)
+        assert len(cache) == 2
+
+    def test_uncommitted_response_not_cached(self, server):
+        server.etag = '"v1"'
+        cache = ResponseCache()
+        cache.fetch(self.HEADERS, 0)
+        result = cache.fetch(self.HEADERS, 0)
+        assert result.changed and (
+            'If-None-Match' not in server.calls[1]['headers']
+        ), (
+            'Убедитесь, что ответ попадает в кэш только после `commit`.'
+        )
+        cache.commit(self.HEADERS, 0)
+        assert len(cache) == 1
+
+    def test_invalid_response_not_cached(self, server):
+        server.body = {'current_date': 1}
+        cache = ResponseCache()
+        with pytest.raises(ValueError):
+            cache.fetch(self.HEADERS, 0)
+        assert len(cache) == 0
+
+
+if __name__ == '__main__':
+    pytest.main()
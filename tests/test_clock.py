@@ -0,0 +1,103 @@
+import asyncio
+import collections
+import logging
+
+import pytest
+
+from benchmarks.simulation import Outage, StatusChange, simulate
+from status_bot import poller
+from status_bot.clock import VirtualClock
+
+PERIOD = 600
+
+
+class TestVirtualClock:
+
+    def test_sleep_moves_time(self):
+        clock = VirtualClock(epoch=1000)
+        clock.sleep(30)
+        clock.sleep(-5)
+        assert clock() == 30 and clock.time() == 1030
+
+    def test_wait_moves_time(self):
+        clock = VirtualClock()
+        asyncio.run(clock.wait(600))
+        assert clock() == 600
+
+
+class TestSimulation:
+
+    @pytest.fixture(autouse=True)
+    def quiet(self):
+        logging.disable(logging.CRITICAL)
+        yield
+        logging.disable(logging.NOTSET)
+
+    def test_notified_within_period(self):
+        timeline = [
+            StatusChange(100, 'hw1', 'reviewing'),
+            StatusChange(5000, 'hw1', 'approved'),
+        ]
+        report = simulate(timeline, 2 * 86400, latency=0.5)
+        assert report.missed == 0 and len(report.latencies) == 2
+        assert all(0 <= latency <= PERIOD + 1 for latency in report.latencies)
+        assert report.api_calls == 288, (
+            'Убедитесь, что main() опрашивает API раз в RETRY_PERIOD.'
+        )
+
+    def test_outage_reported_once(self):
+        timeline = [
+            Outage(1000, 2000, '5xx'),
+            StatusChange(1500, 'hw1', 'approved'),
+        ]
+        report = simulate(timeline, 86400)
+        assert report.failures_reported == 1, (
+            'Убедитесь, что повторы одной ошибки не сообщаются.'
+        )
+        assert report.resolved_reported == 1
+        assert report.latencies and 1500 + report.latencies[0] >= 3000, (
+            'Уведомление должно прийти после окончания сбоя.'
+        )
+
+    def test_missing_current_date_keeps_watermark(self):
+        timeline = [
+            StatusChange(100, 'hw1', 'reviewing'),
+            Outage(1000, 5000, 'no_date'),
+            StatusChange(3000, 'hw1', 'approved'),
+            StatusChange(3100, 'hw2', 'reviewing'),
+        ]
+        report = simulate(timeline, 86400)
+        assert report.missed == 0 and len(report.latencies) == 3
+        assert report.failures_reported == 0
+
+
+def test_poller_runs_on_virtual_clock(practicum):
+    clock = VirtualClock()
+    instance = poller.AsyncPoller(
+        [poller.Subscription(f'token-{i}', str(i)) for i in range(3)],
+        send=lambda chat_id, message: None,
+        period=PERIOD,
+        jitter=0,
+        clock=clock,
+    )
+
+    async def run_briefly():
+        try:
+            await asyncio.wait_for(instance.run_forever(), 0.5)
+        except asyncio.TimeoutError:
+            pass
+
+    try:
+        asyncio.run(run_briefly())
+    finally:
+        instance.close()
+    periods = clock() // PERIOD
+    calls = collections.Counter(practicum.tokens)
+    assert periods >= 3, 'Паузы опроса должны идти по виртуальным часам.'
+    assert all(
+        periods - 1 <= count <= periods + 1 for count in calls.values()
+    ), 'Убедитесь, что расписание берёт время из часов опросчика.'
+
+
+if __name__ == '__main__':
+    pytest.main()
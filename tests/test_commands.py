@@ -0,0 +1,165 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from status_bot.clock import VirtualClock
+from status_bot.commands import (NO_HOMEWORKS, NOT_SUBSCRIBED, UNAVAILABLE,
+                                 CommandPoller, Commands, SnapshotCache,
+                                 parse_command)
+
+HOMEWORKS = [
+    {'homework_name': 'hw2', 'status': 'reviewing'},
+    {'homework_name': 'hw1', 'status': 'approved'},
+]
+
+
+class TestSnapshotCache:
+
+    def test_ttl(self):
+        calls = []
+        clock = VirtualClock()
+        cache = SnapshotCache(
+            lambda token: calls.append(token) or HOMEWORKS,
+            ttl=60,
+            clock=clock,
+        )
+        assert cache.get('token') == HOMEWORKS
+        clock.now = 60
+        cache.get('token')
+        assert len(calls) == 1, 'Убедитесь, что ответ берётся из кэша.'
+        clock.now = 61
+        cache.get('token')
+        assert len(calls) == 2, 'Убедитесь, что устаревший ответ обновляется.'
+
+    def test_invalidate(self):
+        calls = []
+        cache = SnapshotCache(lambda token: calls.append(token) or HOMEWORKS)
+        cache.get('token')
+        cache.invalidate('token')
+        cache.get('token')
+        assert len(calls) == 2
+
+    def test_single_flight(self):
+        calls = []
+        release = threading.Event()
+
+        def slow_fetch(token):
+            calls.append(token)
+            release.wait(5)
+            return HOMEWORKS
+
+        cache = SnapshotCache(slow_fetch)
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(cache.get('t')))
+            for _ in range(20)
+        ]
+        for thread in threads:
+            thread.start()
+        while cache.misses + cache.coalesced < 20:
+            time.sleep(0.001)
+        release.set()
+        for thread in threads:
+            thread.join()
+        assert calls == ['t'], (
+            'Убедитесь, что одновременные промахи объединяются в один запрос.'
+        )
+        assert results == [HOMEWORKS] * 20
+
+    def test_error_is_not_cached(self):
+        def failing_fetch(token):
+            raise SystemError('сеть недоступна')
+
+        cache = SnapshotCache(failing_fetch)
+        for _ in range(2):
+            with pytest.raises(SystemError):
+                cache.get('token')
+        assert cache.misses == 2
+
+
+class TestCommands:
+
+    def make_commands(self, homeworks=HOMEWORKS):
+        return Commands({12345: 'token'}, SnapshotCache(lambda t: homeworks))
+
+    def test_status(self):
+        reply = self.make_commands().reply('/status', '12345')
+        assert 'hw2' in reply and 'взята на проверку' in reply
+        assert 'hw1' not in reply
+
+    def test_status_picks_latest_update(self):
+        homeworks = [
+            {'homework_name': 'hw1', 'status': 'approved',
+             'date_updated': '2024-01-01T00:00:00Z'},
+            {'homework_name': 'hw2', 'status': 'reviewing',
+             'date_updated': '2024-02-01T00:00:00Z'},
+        ]
+        reply = self.make_commands(homeworks).reply('/status', 12345)
+        assert 'hw2' in reply and 'hw1' not in reply, (
+            'Убедитесь, что /status описывает работу с самым поздним '
+            '`date_updated`, а не первую в ответе.'
+        )
+
+    def test_list(self):
+        reply = self.make_commands().reply('/list', 12345)
+        assert reply.count('\n') == 1
+        assert 'ревьюеру всё понравилось' in reply
+
+    def test_empty(self):
+        assert self.make_commands([]).reply('/list', 12345) == NO_HOMEWORKS
+
+    def test_unknown_chat(self):
+        assert self.make_commands().reply('/status', 1) == NOT_SUBSCRIBED
+
+    def test_api_failure(self):
+        def failing_fetch(token):
+            raise SystemError('сеть недоступна')
+
+        commands = Commands({1: 'token'}, SnapshotCache(failing_fetch))
+        assert commands.reply('/status', 1) == UNAVAILABLE
+
+    @pytest.mark.parametrize('text, command', [
+        ('/status', '/status'),
+        ('/list@status_bot', '/list'),
+        ('/STATUS please', '/status'),
+        ('/start', None),
+        ('status', None),
+        (None, None),
+    ])
+    def test_parse_command(self, text, command):
+        assert parse_command(text) == command
+
+
+def test_command_poller_answers():
+    sent = []
+    answered = threading.Event()
+
+    class FakeBot:
+
+        def get_updates(self, offset, timeout, allowed_updates):
+            return [
+                SimpleNamespace(update_id=7, message=SimpleNamespace(
+                    text='/status', chat_id=12345
+                )),
+                SimpleNamespace(update_id=8, message=None),
+            ]
+
+        def send_message(self, chat_id, text):
+            sent.append((chat_id, text))
+            answered.set()
+
+    poller = CommandPoller(
+        FakeBot(),
+        Commands({12345: 'token'}, SnapshotCache(lambda t: HOMEWORKS)),
+    )
+    assert poller.poll_once() == 2
+    assert answered.wait(5)
+    poller.stop()
+    assert sent[0][0] == 12345 and 'hw2' in sent[0][1]
+    assert poller._offset == 9
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,172 @@
+import itertools
+import threading
+import time
+
+import pytest
+
+from benchmarks.stand_in import PracticumStandIn, make_homeworks
+from status_bot import api
+from status_bot.clock import VirtualClock
+from status_bot.deadline import Deadline, DeadlineExceeded, Hedger
+
+
+class TestDeadline:
+
+    def test_timeouts_capped_by_remaining(self):
+        clock = VirtualClock(start=100.0)
+        deadline = Deadline(10, clock=clock)
+        assert deadline.timeout((5, 30)) == (5, 10)
+        clock.now += 8
+        assert deadline.timeout((5, 30)) == (2, 2), (
+            'Убедитесь, что таймауты соединения и чтения не больше '
+            'остатка срока.'
+        )
+        clock.now += 2
+        assert deadline.expired
+        with pytest.raises(DeadlineExceeded):
+            deadline.timeout((5, 30))
+
+    def test_within_parent(self):
+        clock = VirtualClock(start=100.0)
+        cycle = Deadline(10, clock=clock)
+        assert cycle.within(3).remaining() == 3
+        clock.now += 8
+        assert cycle.within(3).remaining() == 2, (
+            'Срок запроса не должен выходить за срок цикла.'
+        )
+
+
+class Response:
+
+    def __init__(self, number):
+        self.number = number
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def warmed_hedger(**kwargs):
+    hedger = Hedger(min_samples=5, window=5, workers=4, **kwargs)
+    for _ in range(5):
+        hedger.call(lambda: Response(-1), Deadline(5))
+    assert hedger.hedge_delay() is not None
+    return hedger
+
+
+class TestHedger:
+
+    def test_slow_attempt_hedged(self):
+        hedger = warmed_hedger()
+        release = threading.Event()
+        numbers = itertools.count()
+        responses = []
+
+        def attempt():
+            response = Response(next(numbers))
+            responses.append(response)
+            if response.number == 0:
+                release.wait(5)
+            return response
+
+        started = time.monotonic()
+        result = hedger.call(attempt, Deadline(5))
+        assert time.monotonic() - started < 1
+        assert result.number == 1, 'Должен победить ответ дубля.'
+        assert hedger.hedged == 1 and hedger.hedge_wins == 1
+        release.set()
+        deadline = time.monotonic() + 5
+        while not responses[0].closed:
+            assert time.monotonic() < deadline, (
+                'Убедитесь, что ответ проигравшей попытки закрывается.'
+            )
+            time.sleep(0.01)
+        assert not result.closed
+        hedger.close()
+
+    def test_no_hedge_before_samples(self):
+        hedger = Hedger(min_samples=5)
+        calls = []
+
+        def attempt():
+            calls.append(1)
+            time.sleep(0.05)
+            return Response(0)
+
+        hedger.call(attempt, Deadline(5))
+        assert len(calls) == 1 and hedger.hedged == 0
+        hedger.close()
+
+    def test_hedge_budget(self):
+        hedger = warmed_hedger(max_ratio=0)
+        numbers = itertools.count()
+
+        def attempt():
+            if next(numbers) in (0, 2):
+                time.sleep(0.2)
+            return Response(0)
+
+        hedger.call(attempt, Deadline(5))
+        hedger.call(attempt, Deadline(5))
+        assert hedger.hedged == 1, (
+            'Убедитесь, что дубли не запускаются сверх бюджета.'
+        )
+        hedger.close()
+
+    def test_deadline_exceeded(self):
+        hedger = Hedger()
+        release = threading.Event()
+        started = time.monotonic()
+        with pytest.raises(DeadlineExceeded):
+            hedger.call(lambda: release.wait(5), Deadline(0.2))
+        assert time.monotonic() - started < 1
+        release.set()
+        hedger.close()
+
+    def test_error_propagates(self):
+        hedger = Hedger()
+
+        def attempt():
+            raise ValueError('boom')
+
+        with pytest.raises(ValueError):
+            hedger.call(attempt, Deadline(5))
+        hedger.close()
+
+
+@pytest.fixture
+def stalling_api():
+    with PracticumStandIn(
+        make_homeworks(20), stall_rate=1.0, stall=3.0
+    ) as server:
+        yield server
+
+
+class TestStalledApi:
+
+    def test_stalled_body_bounded_by_deadline(self, stalling_api):
+        hedger = Hedger()
+        started = time.monotonic()
+        with pytest.raises(DeadlineExceeded):
+            api.fetch_api_answer(
+                api.auth_headers('token'), 0, stalling_api.url,
+                deadline=Deadline(0.5), hedger=hedger,
+            )
+        assert time.monotonic() - started < 1.5, (
+            'Убедитесь, что зависший ответ не задерживает вызов дольше '
+            'срока.'
+        )
+        hedger.close()
+
+    def test_read_timeout_capped_without_hedger(self, stalling_api):
+        started = time.monotonic()
+        with pytest.raises(SystemError):
+            api.fetch_api_answer(
+                api.auth_headers('token'), 0, stalling_api.url,
+                deadline=Deadline(0.5),
+            )
+        assert time.monotonic() - started < 1.5
+
+
+if __name__ == '__main__':
+    pytest.main()
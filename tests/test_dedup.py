@@ -0,0 +1,122 @@
+import time
+
+import pytest
+import requests
+import telegram
+
+import utils
+from status_bot.api import ApiStatusError
+from status_bot.clock import VirtualClock
+from status_bot.dedup import ErrorDedup, fingerprint
+
+
+def api_error(status_code, from_date):
+    return ApiStatusError(
+        'При проверке статуса сервера, API домашки возвращаеткод '
+        f'{status_code}, отличный от 200.Параметры запроса: '
+        f"{{'params': {{'from_date': {from_date}}}}}Ответ API: b''",
+        status_code,
+    )
+
+
+class TestFingerprint:
+
+    def test_ignores_request_params(self):
+        assert fingerprint(api_error(503, 1549962000)) == fingerprint(
+            api_error(503, 1549962600)
+        ), 'Убедитесь, что from_date не влияет на отпечаток ошибки.'
+
+    def test_ignores_timestamps(self):
+        assert fingerprint(KeyError('2024-01-01T10:00:00Z 1700000000')) == (
+            fingerprint(KeyError('2024-01-02T11:30:00Z 1700000600'))
+        )
+
+    def test_distinguishes_status_and_type(self):
+        assert fingerprint(api_error(503, 1)) != fingerprint(api_error(500, 1))
+        assert fingerprint(KeyError('x')) != fingerprint(TypeError('x'))
+
+
+class TestErrorDedup:
+
+    def test_suppresses_repeats_within_window(self):
+        clock = VirtualClock()
+        errors = ErrorDedup(window=600, clock=clock)
+        assert errors.report(api_error(503, 1))
+        clock.now = 300
+        assert not errors.report(api_error(503, 2)), (
+            'Убедитесь, что повтор ошибки в пределах окна подавляется.'
+        )
+        clock.now = 599
+        assert not errors.report(api_error(503, 3))
+        clock.now = 600
+        assert errors.report(api_error(503, 4)), (
+            'Убедитесь, что по истечении окна ошибка сообщается снова.'
+        )
+        assert errors.suppressed == 2
+
+    def test_resolved_once(self):
+        errors = ErrorDedup()
+        assert not errors.resolve()
+        errors.report(TypeError('нет ключа homeworks'))
+        assert errors.resolve()
+        assert not errors.resolve(), (
+            'Сообщение о восстановлении отправляется один раз.'
+        )
+
+    def test_flapping_reported_once_per_window(self):
+        clock = VirtualClock()
+        errors = ErrorDedup(window=600, clock=clock)
+        reported = resolved = 0
+        for cycle in range(6):
+            clock.now = cycle * 60
+            if cycle % 2:
+                resolved += errors.resolve()
+            else:
+                reported += errors.report(api_error(503, cycle))
+        assert (reported, resolved) == (1, 1), (
+            'Убедитесь, что мигающий сбой не сообщается в каждом цикле.'
+        )
+
+    def test_bounded(self):
+        errors = ErrorDedup(maxsize=10)
+        for index in range(1000):
+            assert errors.report(KeyError(f'ключ {index}'))
+        assert len(errors) == 10
+
+
+def test_main_reports_error_once(monkeypatch, homework_module):
+    sent = []
+    cycles = iter(range(3))
+
+    def sleep(secs):
+        if next(cycles, None) is None:
+            raise utils.BreakInfiniteLoop('break')
+
+    def failing_get(*args, **kwargs):
+        response = utils.MockResponseGET(*args, http_status=503, **kwargs)
+        response.content = b''
+        return response
+
+    for name, value in (
+        ('PRACTICUM_TOKEN', 'sometoken'),
+        ('TELEGRAM_TOKEN', '1234:abcdefg'),
+        ('TELEGRAM_CHAT_ID', '12345'),
+    ):
+        monkeypatch.setattr(homework_module, name, value)
+    monkeypatch.setattr(time, 'sleep', sleep)
+    monkeypatch.setattr(telegram, 'Bot', lambda *a, **k: None)
+    monkeypatch.setattr(requests, 'get', failing_get)
+    monkeypatch.setattr(
+        homework_module, 'send_message', lambda bot, message: sent.append(
+            message
+        )
+    )
+    with pytest.raises(utils.BreakInfiniteLoop):
+        homework_module.main()
+    assert len(sent) == 1, (
+        'Убедитесь, что об одной и той же ошибке бот сообщает один раз.'
+    )
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,82 @@
+import pytest
+
+from status_bot.diff import StatusDiff
+
+
+def record(statuses, homeworks):
+    """Запоминает статусы ответа и возвращает сообщения о переходах."""
+    transitions = statuses.pending(homeworks)
+    statuses.commit(transitions)
+    return [message for _, _, message in transitions]
+
+
+class TestStatusDiff:
+
+    def test_first_status_is_transition(self):
+        statuses = StatusDiff()
+        messages = record(
+            statuses,
+            [{'homework_name': 'hw1', 'status': 'reviewing'}]
+        )
+        assert len(messages) == 1 and 'hw1' in messages[0]
+        assert statuses.get('hw1') == 'reviewing'
+
+    def test_repeated_status_is_not_sent(self):
+        statuses = StatusDiff()
+        homeworks = [
+            {'homework_name': 'hw1', 'status': 'reviewing'},
+            {'homework_name': 'hw2', 'status': 'approved'},
+        ]
+        record(statuses, homeworks)
+        assert record(statuses, homeworks) == [], (
+            'Убедитесь, что неизменившийся статус не отправляется повторно.'
+        )
+
+    def test_only_changed_homeworks_emitted(self):
+        statuses = StatusDiff()
+        record(statuses, [
+            {'homework_name': 'hw1', 'status': 'reviewing'},
+            {'homework_name': 'hw2', 'status': 'reviewing'},
+        ])
+        messages = record(statuses, [
+            {'homework_name': 'hw1', 'status': 'reviewing'},
+            {'homework_name': 'hw2', 'status': 'approved'},
+        ])
+        assert len(messages) == 1 and 'hw2' in messages[0]
+        assert len(statuses) == 2
+
+    def test_invalid_homework_is_not_recorded(self):
+        statuses = StatusDiff()
+        with pytest.raises(KeyError):
+            record(statuses, [{'homework_name': 'hw1', 'status': 'unknown'}])
+        assert statuses.get('hw1') is None
+
+    def test_pending_remembers_only_on_commit(self):
+        statuses = StatusDiff()
+        homeworks = [
+            {'homework_name': 'hw1', 'status': 'reviewing'},
+            {'homework_name': 'hw1', 'status': 'reviewing'},
+        ]
+        transitions = statuses.pending(homeworks)
+        assert len(transitions) == 1 and statuses.get('hw1') is None, (
+            'Убедитесь, что pending не запоминает статусы.'
+        )
+        statuses.commit(transitions)
+        assert statuses.get('hw1') == 'reviewing'
+        assert statuses.pending(homeworks) == []
+
+    def test_invalid_homework_discards_whole_response(self):
+        statuses = StatusDiff()
+        with pytest.raises(KeyError):
+            statuses.pending([
+                {'homework_name': 'hw1', 'status': 'approved'},
+                {'homework_name': 'hw2', 'status': 'unknown'},
+            ])
+        assert len(statuses) == 0
+
+    def test_empty_response(self):
+        assert record(StatusDiff(), []) == []
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,215 @@
+import asyncio
+import multiprocessing
+import time
+
+import pytest
+
+import homework
+from benchmarks.simulation import RecordingBot
+from status_bot.clock import VirtualClock
+from status_bot.lease import Lease, MemoryLeaseStore, SqliteLeaseStore
+from status_bot.poller import AsyncPoller, Subscription
+from status_bot.state import MemoryStateStore
+
+TTL = 0.6
+
+
+class TestLease:
+
+    def make_pair(self, store):
+        clock = VirtualClock(start=1000.0)
+        return (
+            clock,
+            Lease(store, 'shard-0', 'first', ttl=15, clock=clock),
+            Lease(store, 'shard-0', 'second', ttl=15, clock=clock),
+        )
+
+    @pytest.mark.parametrize('make_store', [
+        MemoryLeaseStore,
+        lambda: SqliteLeaseStore(':memory:'),
+    ])
+    def test_only_one_holder(self, make_store):
+        clock, first, second = self.make_pair(make_store())
+        assert first.renew() is True
+        assert second.renew() is False, (
+            'Убедитесь, что занятую аренду не может взять другая копия.'
+        )
+        clock.now += 9
+        assert first.renew() is True and not second.renew()
+        assert first.held and not second.held
+
+    @pytest.mark.parametrize('make_store', [
+        MemoryLeaseStore,
+        lambda: SqliteLeaseStore(':memory:'),
+    ])
+    def test_expired_lease_taken_over(self, make_store):
+        clock, first, second = self.make_pair(make_store())
+        first.renew()
+        clock.now += 10
+        assert not first.held, (
+            'Держатель должен перестать считать аренду своей раньше, '
+            'чем её сможет забрать другая копия.'
+        )
+        assert not second.renew()
+        clock.now += 5
+        assert second.renew() and second.term == 1
+        assert not first.renew(), (
+            'Убедитесь, что прежний держатель не вернёт себе аренду.'
+        )
+
+    def test_term_grows_on_new_acquisition(self):
+        clock, first, second = self.make_pair(MemoryLeaseStore())
+        first.renew()
+        first.renew()
+        assert first.term == 1
+        clock.now += 15
+        second.renew()
+        clock.now += 15
+        first.renew()
+        assert first.term == 2, (
+            'Убедитесь, что `term` растёт при каждом новом захвате аренды.'
+        )
+
+    def test_stop_releases(self):
+        store = MemoryLeaseStore()
+        first = Lease(store, 'shard-0', 'first', ttl=TTL).start()
+        second = Lease(store, 'shard-0', 'second', ttl=TTL)
+        deadline = time.monotonic() + 5
+        while not first.held:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        first.stop()
+        assert second.renew(), (
+            'Убедитесь, что `stop` отдаёт аренду резервной копии.'
+        )
+
+
+def test_standby_does_not_poll(practicum):
+    store = MemoryLeaseStore()
+    Lease(store, 'cohort', 'leader', ttl=60).renew()
+    standby = Lease(store, 'cohort', 'standby', ttl=60)
+    standby.renew()
+    poller = AsyncPoller(
+        [Subscription('token', '1')],
+        send=lambda chat_id, message: None,
+        period=0,
+        lease=standby,
+    )
+
+    async def run_briefly():
+        try:
+            await asyncio.wait_for(poller.run_forever(), 0.3)
+        except asyncio.TimeoutError:
+            pass
+
+    try:
+        asyncio.run(run_briefly())
+    finally:
+        poller.close()
+    assert practicum.calls == [], 'Резервная копия не должна опрашивать API.'
+
+
+@pytest.mark.parametrize('stall', [True, False])
+def test_main_loop_stops_after_losing_lease(stall):
+    clock = VirtualClock(start=1000)
+    store = MemoryStateStore()
+    bot = RecordingBot(clock)
+
+    def fetch(timestamp):
+        if stall:
+            # Запрос длится дольше, чем действует аренда.
+            clock.sleep(60)
+        return {
+            'homeworks': [{'homework_name': 'hw1', 'status': 'approved'}],
+            'current_date': 100,
+        }
+
+    loop = homework.PollLoop(bot, store, fetch=fetch, clock=clock)
+    loop.lease = Lease(MemoryLeaseStore(), 'main', ttl=30, clock=clock)
+    loop.lease.renew()
+    loop.cycle()
+    if stall:
+        assert bot.messages == [] and store.load() == {}, (
+            'Убедитесь, что копия, потерявшая аренду во время запроса, '
+            'не записывает состояние и не отправляет уведомления.'
+        )
+    else:
+        assert len(bot.messages) == 1 and store.pending() == []
+
+
+def test_poller_drops_cycle_of_old_term(practicum):
+    clock = VirtualClock(start=1000)
+    lease = Lease(MemoryLeaseStore(), 'cohort', ttl=30, clock=clock)
+    lease.renew()
+
+    def renew_during_request(*args, **kwargs):
+        # Аренда истекла во время запроса и снова взята: срок другой.
+        clock.sleep(60)
+        lease.renew()
+
+    practicum.homeworks = [{'homework_name': 'hw1', 'status': 'approved'}]
+    practicum.current_date = 100
+    practicum.on_request = renew_during_request
+    store = MemoryStateStore()
+    sent = []
+    poller = AsyncPoller(
+        [Subscription('token', '1')],
+        send=lambda chat_id, message: sent.append(message),
+        store=store,
+        lease=lease,
+        clock=clock,
+    )
+    try:
+        stats = asyncio.run(poller.run_cycle())
+    finally:
+        poller.close()
+    assert lease.term == 2 and stats.messages == 0
+    assert sent == [] and store.load() == {}, (
+        'Убедитесь, что результат цикла, начатого в прошлом сроке '
+        'аренды, не записывается и не отправляется.'
+    )
+
+
+def hold_lease(path, held):
+    lease = Lease(SqliteLeaseStore(path), 'shard-0', 'leader', ttl=TTL)
+    lease.start()
+    while not lease.held:
+        time.sleep(0.01)
+    held.set()
+    time.sleep(60)
+
+
+def test_failover_after_leader_killed(tmp_path):
+    path = str(tmp_path / 'leases.sqlite3')
+    context = multiprocessing.get_context('spawn')
+    held = context.Event()
+    leader = context.Process(target=hold_lease, args=(path, held))
+    leader.start()
+    try:
+        assert held.wait(30), 'Ведущая копия не получила аренду.'
+        standby = Lease(SqliteLeaseStore(path), 'shard-0', 'standby', ttl=TTL)
+        standby.start()
+        time.sleep(TTL)
+        assert not standby.held, (
+            'Пока ведущая копия жива, резервная не должна брать аренду.'
+        )
+        leader.kill()
+        leader.join()
+        killed = time.monotonic()
+        while not standby.held:
+            assert time.monotonic() - killed < 10
+            time.sleep(0.005)
+        failover = time.monotonic() - killed
+        standby.stop()
+    finally:
+        if leader.is_alive():
+            leader.kill()
+    # Аренда истекает не позже `ttl` после последнего продления, а
+    # резервная копия проверяет её раз в `ttl / 3`.
+    assert failover <= TTL + standby.renew_interval + 0.2, (
+        f'Переключение заняло {failover:.2f} с.'
+    )
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,122 @@
+import io
+import json
+import logging
+
+import pytest
+
+from status_bot.logs import (DebugSampler, DroppingQueueHandler,
+                             JsonFormatter, setup_logging)
+
+
+def make_record(message='event', level=logging.INFO, **extra):
+    record = logging.LogRecord(
+        'status_bot.test', level, __file__, 1, message, None, None
+    )
+    record.__dict__.update(extra)
+    return record
+
+
+@pytest.fixture
+def test_logger():
+    logger = logging.getLogger('status_bot.tests.logs')
+    logger.propagate = False
+    yield logger
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    logger.propagate = True
+
+
+class TestJsonFormatter:
+
+    def test_structured_fields(self):
+        record = make_record(
+            'Сбой опроса', logging.ERROR,
+            subscription='abc', stage='poll', latency=0.25, status_code=503,
+        )
+        entry = json.loads(JsonFormatter().format(record))
+        assert entry['message'] == 'Сбой опроса'
+        assert entry['level'] == 'ERROR'
+        assert {
+            name: entry[name]
+            for name in ('subscription', 'stage', 'latency', 'status_code')
+        } == {
+            'subscription': 'abc', 'stage': 'poll', 'latency': 0.25,
+            'status_code': 503,
+        }, 'Убедитесь, что поля из `extra` попадают в JSON.'
+        assert 'chat_id' not in entry
+
+    def test_exception_included(self, test_logger):
+        stream = io.StringIO()
+        setup_logging((test_logger,), stream, json_format=True)
+        try:
+            raise ValueError('boom')
+        except ValueError:
+            test_logger.exception('Сбой')
+        entry = json.loads(stream.getvalue())
+        assert 'ValueError: boom' in entry['exc']
+
+
+class TestDroppingQueueHandler:
+
+    def test_drops_when_full(self):
+        handler = DroppingQueueHandler(maxsize=3)
+        for index in range(5):
+            handler.emit(make_record(f'info {index}'))
+        assert handler.dropped == 2
+        assert [
+            handler.queue.get_nowait().msg for _ in range(3)
+        ] == ['info 0', 'info 1', 'info 2'], (
+            'При заполненной очереди должны отбрасываться новые записи '
+            'ниже WARNING.'
+        )
+
+    def test_warning_evicts_oldest(self):
+        handler = DroppingQueueHandler(maxsize=2)
+        handler.emit(make_record('info 0'))
+        handler.emit(make_record('info 1'))
+        handler.emit(make_record('error', logging.ERROR))
+        messages = [handler.queue.get_nowait().msg for _ in range(2)]
+        assert messages == ['info 1', 'error'], (
+            'Убедитесь, что WARNING и выше вытесняют самую старую запись.'
+        )
+        assert handler.dropped == 1
+
+    def test_message_merged_before_enqueue(self):
+        handler = DroppingQueueHandler()
+        arguments = ['before']
+        record = logging.LogRecord(
+            'status_bot.test', logging.INFO, __file__, 1, 'value %s',
+            (arguments,), None,
+        )
+        handler.emit(record)
+        arguments[0] = 'after'
+        assert handler.queue.get_nowait().msg == "value ['before']"
+
+
+def test_sampler_keeps_one_in_n():
+    sampler = DebugSampler(10)
+    kept = sum(
+        sampler.filter(make_record(level=logging.DEBUG)) for _ in range(100)
+    )
+    assert kept == 10
+    assert all(
+        sampler.filter(make_record(level=logging.INFO)) for _ in range(10)
+    ), 'Записи выше DEBUG не должны отбрасываться.'
+
+
+def test_listener_flushes_on_stop(test_logger):
+    stream = io.StringIO()
+    listener = setup_logging(
+        (test_logger,), stream, asynchronous=True, queue_size=100000
+    )
+    for index in range(5000):
+        test_logger.info('line %d', index)
+    listener.stop()
+    lines = stream.getvalue().splitlines()
+    assert [line.rsplit(' ', 1)[1] for line in lines] == [
+        str(index) for index in range(5000)
+    ], 'Убедитесь, что при остановке записываются все записи по порядку.'
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,76 @@
+import threading
+import urllib.request
+
+import pytest
+
+from status_bot.metrics import (Counter, Histogram, Registry,
+                                start_metrics_server)
+
+
+class TestCounter:
+
+    def test_render(self):
+        counter = Counter('requests_total', 'Запросы.', labelnames=('code',))
+        counter.labels(200).inc()
+        counter.labels(200).inc(2)
+        counter.labels(500).inc()
+        lines = counter.render()
+        assert '# TYPE requests_total counter' in lines
+        assert 'requests_total{code="200"} 3' in lines
+        assert 'requests_total{code="500"} 1' in lines
+
+    def test_threads(self):
+        counter = Counter('hits_total', 'Попадания.')
+
+        def work():
+            for _ in range(1000):
+                counter.inc()
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert counter.labels().value == 8000, (
+            'Убедитесь, что значения из разных потоков не теряются.'
+        )
+
+
+class TestHistogram:
+
+    def test_buckets_are_cumulative(self):
+        histogram = Histogram('latency_seconds', 'Задержка.', buckets=(1, 5))
+        for value in (0.5, 1, 3, 10):
+            histogram.observe(value)
+        lines = histogram.render()
+        assert 'latency_seconds_bucket{le="1.0"} 2' in lines
+        assert 'latency_seconds_bucket{le="5.0"} 3' in lines
+        assert 'latency_seconds_bucket{le="+Inf"} 4' in lines
+        assert 'latency_seconds_count 4' in lines
+        assert 'latency_seconds_sum 14.5' in lines
+
+    def test_time(self):
+        histogram = Histogram('stage_seconds', 'Этап.', labelnames=('stage',))
+        with histogram.labels('parse_status').time():
+            pass
+        assert (
+            'stage_seconds_count{stage="parse_status"} 1' in histogram.render()
+        )
+
+
+def test_metrics_server():
+    registry = Registry()
+    registry.register(Counter('up_total', 'Проверка.')).inc()
+    server = start_metrics_server(0, host='127.0.0.1', registry=registry)
+    try:
+        url = f'http://127.0.0.1:{server.server_address[1]}/metrics'
+        with urllib.request.urlopen(url) as response:
+            body = response.read().decode()
+        assert 'up_total 1' in body
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == '__main__':
+    pytest.main()
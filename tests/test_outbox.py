@@ -0,0 +1,343 @@
+import asyncio
+import random
+from collections import Counter
+
+import pytest
+
+from status_bot import api
+from status_bot.outbox import OutboxDispatcher
+from status_bot.poller import AsyncPoller, Subscription
+from status_bot.sender import SendQueue
+from status_bot.state import (MemoryStateStore, SqliteStateStore, StateBatch,
+                              notification_key)
+
+
+class Crash(BaseException):
+    """Падение процесса: не перехватывается обработчиками Exception."""
+
+
+class CrashingStore(SqliteStateStore):
+    """SQLite-хранилище, которое «роняет» процесс в заданной точке."""
+
+    def __init__(self, path, crash_at=None):
+        super().__init__(path)
+        self.crash_at = crash_at
+
+    def write(self, batch):
+        if self.crash_at == 'before-commit' and batch.pending:
+            raise Crash()
+        if self.crash_at == 'before-mark' and batch.delivered:
+            raise Crash()
+        super().write(batch)
+        if self.crash_at == 'after-commit' and batch.pending:
+            raise Crash()
+
+
+class Telegram:
+    """Замена Telegram, которая может упасть сразу после приёма сообщения."""
+
+    def __init__(self):
+        self.received = []
+        self.crash_after = None
+
+    def __call__(self, chat_id, message):
+        self.received.append((chat_id, message))
+        if self.crash_after is not None and len(self.received) == (
+            self.crash_after
+        ):
+            self.crash_after = None
+            raise Crash()
+
+
+class PracticumScript:
+    """Ответы API: к каждому раунду у каждой подписки новая работа."""
+
+    def __init__(self, tokens):
+        self.homeworks = {token: [] for token in tokens}
+
+    def advance(self, round_number):
+        for homeworks in self.homeworks.values():
+            homeworks.append({
+                'homework_name': f'hw{round_number}',
+                'status': 'approved',
+                'date_updated': f'2024-01-{round_number + 1:02d}T00:00:00Z',
+            })
+
+    def fetch(self, headers, timestamp, endpoint=None, session=None):
+        token = headers['Authorization'].split()[1]
+        return {
+            'homeworks': list(self.homeworks[token]),
+            'current_date': 1000,
+        }
+
+
+def live(path, telegram, crash_at=None):
+    """Одна «жизнь» процесса: восстановление, доставка и цикл опроса."""
+    store = CrashingStore(path, crash_at)
+    instance = AsyncPoller(
+        [Subscription(f'token-{i}', str(i)) for i in range(SUBSCRIPTIONS)],
+        send=telegram,
+        concurrency=8,
+        store=store,
+    )
+    crashed = False
+    try:
+        instance.restore()
+        instance.deliver_pending()
+        asyncio.run(instance.run_cycle())
+    except Crash:
+        crashed = True
+    finally:
+        # Упавший процесс не успевает записать отметки о доставке.
+        instance._executor.shutdown(wait=True)
+        if not crashed:
+            instance.outbox.flush()
+        store.close()
+    return crashed
+
+
+SUBSCRIPTIONS = 20
+
+
+@pytest.fixture
+def script(monkeypatch):
+    instance = PracticumScript(
+        f'token-{i}' for i in range(SUBSCRIPTIONS)
+    )
+    monkeypatch.setattr(api, 'fetch_api_answer', instance.fetch)
+    return instance
+
+
+def expected(rounds):
+    return Counter(
+        (str(i), api.render_message(f'hw{number}', 'approved'))
+        for i in range(SUBSCRIPTIONS)
+        for number in range(rounds)
+    )
+
+
+class TestCrashInjection:
+
+    @pytest.mark.parametrize(
+        'crash_at', ['before-commit', 'after-commit', 'before-mark']
+    )
+    def test_store_crash_delivers_exactly_once(
+        self, tmp_path, script, crash_at
+    ):
+        path = str(tmp_path / 'state.sqlite3')
+        telegram = Telegram()
+        script.advance(0)
+        assert live(path, telegram, crash_at), 'Сбой не был внедрён.'
+        assert not live(path, telegram)
+        received = Counter(telegram.received)
+        if crash_at == 'before-mark':
+            # Первое сообщение принято Telegram, но не отмечено.
+            assert sum(received.values()) == SUBSCRIPTIONS + 1
+            assert max(received.values()) == 2
+            received = Counter(set(received))
+        assert received == expected(1), (
+            'Убедитесь, что после падения каждое уведомление '
+            'доставляется ровно один раз.'
+        )
+
+    def test_crash_after_send_resends_only_that_message(
+        self, tmp_path, script
+    ):
+        path = str(tmp_path / 'state.sqlite3')
+        telegram = Telegram()
+        script.advance(0)
+        telegram.crash_after = 7
+        assert live(path, telegram)
+        assert not live(path, telegram)
+        received = Counter(telegram.received)
+        duplicates = [item for item, count in received.items() if count > 1]
+        assert len(duplicates) == 1 and received[duplicates[0]] == 2, (
+            'Повторно должно уйти только сообщение, принятое Telegram '
+            'перед падением.'
+        )
+        assert set(received) == set(expected(1))
+
+    def test_random_crashes_over_many_rounds(self, tmp_path, script):
+        path = str(tmp_path / 'state.sqlite3')
+        telegram = Telegram()
+        rng = random.Random(17)
+        after_send = 0
+        rounds = 12
+        for number in range(rounds):
+            script.advance(number)
+            while True:
+                crash_at = rng.choice([
+                    None, None, 'before-commit', 'after-commit',
+                    'before-mark', 'send',
+                ])
+                if crash_at == 'send':
+                    telegram.crash_after = len(telegram.received) + (
+                        rng.randint(1, SUBSCRIPTIONS)
+                    )
+                    crash_at = None
+                sent_before = len(telegram.received)
+                crashed = live(path, telegram, crash_at)
+                if crashed and crash_at in (None, 'before-mark') and len(
+                    telegram.received
+                ) > sent_before:
+                    after_send += 1
+                telegram.crash_after = None
+                if not crashed:
+                    break
+        live(path, telegram)
+        received = Counter(telegram.received)
+        assert set(received) == set(expected(rounds)), (
+            'Убедитесь, что ни одно уведомление не теряется при падениях.'
+        )
+        duplicates = sum(received.values()) - len(received)
+        assert duplicates <= after_send, (
+            'Повторы возможны только для сообщений, принятых Telegram '
+            'непосредственно перед падением.'
+        )
+
+
+class TestIdempotency:
+
+    HOMEWORK = {
+        'homework_name': 'hw1',
+        'status': 'approved',
+        'date_updated': '2024-01-01T00:00:00Z',
+    }
+
+    @pytest.mark.parametrize('make_store', [
+        MemoryStateStore,
+        lambda: SqliteStateStore(':memory:'),
+    ])
+    def test_same_transition_enqueued_once(self, make_store):
+        store = make_store()
+        key = notification_key('1:abc', self.HOMEWORK)
+        for _ in range(2):
+            batch = StateBatch()
+            batch.add_pending('1:abc', 1, 'approved', key)
+            store.write(batch)
+        assert len(store.pending()) == 1
+        batch = StateBatch()
+        batch.mark_delivered(store.pending()[0].id)
+        store.write(batch)
+        batch = StateBatch()
+        batch.add_pending('1:abc', 1, 'approved', key)
+        store.write(batch)
+        assert store.pending() == [], (
+            'Убедитесь, что доставленное уведомление с тем же ключом '
+            'не попадает в outbox снова.'
+        )
+
+    def test_key_depends_on_date_updated(self):
+        later = dict(self.HOMEWORK, date_updated='2024-02-01T00:00:00Z')
+        assert notification_key('1:abc', self.HOMEWORK) != (
+            notification_key('1:abc', later)
+        )
+        assert notification_key('2:abc', self.HOMEWORK) != (
+            notification_key('1:abc', self.HOMEWORK)
+        )
+        assert notification_key('1:abc', {'homework_name': 'hw1'}) is None
+
+    def test_prune_forgets_old_keys(self):
+        store = MemoryStateStore(clock=lambda: 100)
+        key = notification_key('1:abc', self.HOMEWORK)
+        batch = StateBatch()
+        batch.add_pending('1:abc', 1, 'approved', key)
+        store.write(batch)
+        dispatcher = OutboxDispatcher(
+            store, lambda chat_id, message: None, clock=lambda: 200,
+            retention=50,
+        )
+        assert dispatcher.drain() == 1
+        batch = StateBatch()
+        batch.add_pending('1:abc', 1, 'approved', key)
+        store.write(batch)
+        assert len(store.pending()) == 1
+
+
+class TestOutboxDispatcher:
+
+    def test_failed_chat_keeps_order(self):
+        store = MemoryStateStore()
+        batch = StateBatch()
+        for chat_id, message in [(1, 'a'), (2, 'b'), (1, 'c')]:
+            batch.add_pending('key', chat_id, message)
+        store.write(batch)
+        sent = []
+
+        def send(chat_id, message):
+            if message == 'a':
+                raise ConnectionError('telegram is down')
+            sent.append(message)
+
+        dispatcher = OutboxDispatcher(store, send)
+        assert dispatcher.drain() == 1
+        assert sent == ['b'], (
+            'Убедитесь, что после сбоя отправки следующие сообщения '
+            'того же чата ждут следующей попытки.'
+        )
+        assert [row.message for row in store.pending()] == ['a', 'c']
+
+    def test_send_queue_marks_after_delivery(self):
+        store = MemoryStateStore()
+        batch = StateBatch()
+        for index in range(50):
+            batch.add_pending('key', index % 5, f'message {index}')
+        store.write(batch)
+        sent = []
+        queue = SendQueue(
+            lambda chat_id, message: sent.append(message),
+            global_rate=10000, per_chat_rate=10000,
+        )
+        dispatcher = OutboxDispatcher(store, queue, batch_size=8)
+        assert dispatcher.drain() == 50
+        assert dispatcher.drain() == 0, (
+            'Сообщения в очереди не должны ставиться в неё повторно.'
+        )
+        queue.close(timeout=5)
+        dispatcher.flush()
+        assert len(sent) == 50 and store.pending() == []
+        assert dispatcher.delivered == 50
+
+    def test_shards_on_one_database_deliver_own_rows(self, tmp_path):
+        path = str(tmp_path / 'state.sqlite3')
+        stores = [SqliteStateStore(path), SqliteStateStore(path)]
+        batch = StateBatch()
+        for index in range(20):
+            batch.add_pending(f'key-{index % 2}', index, f'message {index}')
+        stores[0].write(batch)
+        sent = Counter()
+        queues = []
+        dispatchers = []
+        for shard, store in enumerate(stores):
+            queue = SendQueue(
+                lambda chat_id, message: sent.update([message]),
+                global_rate=10000, per_chat_rate=10000,
+            )
+            queues.append(queue)
+            dispatchers.append(
+                OutboxDispatcher(store, queue, keys=[f'key-{shard}'])
+            )
+        assert [dispatcher.drain() for dispatcher in dispatchers] == [10, 10]
+        for queue, dispatcher in zip(queues, dispatchers):
+            queue.close(timeout=5)
+            dispatcher.flush()
+        assert sum(sent.values()) == 20 and max(sent.values()) == 1, (
+            'Убедитесь, что шард с общей базой не отправляет уведомления '
+            'чужих подписок.'
+        )
+        assert stores[1].pending() == []
+        for store in stores:
+            store.close()
+
+    def test_pending_filters_keys(self):
+        store = MemoryStateStore()
+        batch = StateBatch()
+        for key in ['a', 'b', 'a']:
+            batch.add_pending(key, 1, key)
+        store.write(batch)
+        assert [row.id for row in store.pending(keys={'a'})] == [1, 3]
+        assert store.pending(1, 1, keys={'a'})[0].id == 3
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,153 @@
+import asyncio
+import threading
+import time
+
+import pytest
+import requests
+
+from status_bot import poller
+from status_bot.commands import SnapshotCache
+
+
+class TestAsyncPoller:
+    DATA = {
+        'homeworks': [{'homework_name': 'hw123', 'status': 'approved'}],
+        'current_date': 1000198991
+    }
+
+    @pytest.fixture
+    def api(self, practicum):
+        practicum.body = self.DATA
+        return practicum
+
+    def make_poller(self, subscriptions, concurrency=4, **kwargs):
+        sent = []
+        instance = poller.AsyncPoller(
+            subscriptions,
+            send=lambda chat_id, message: sent.append((chat_id, message)),
+            concurrency=concurrency,
+            **kwargs,
+        )
+        return instance, sent
+
+    def test_cycle_polls_every_subscription(self, api):
+        subscriptions = [
+            poller.Subscription(f'token-{i}', str(i)) for i in range(10)
+        ]
+        instance, sent = self.make_poller(subscriptions)
+        try:
+            stats = asyncio.run(instance.run_cycle())
+        finally:
+            instance.close()
+        assert stats.polled == 10 and stats.failed == 0
+        assert sorted(chat_id for chat_id, _ in sent) == sorted(
+            str(i) for i in range(10)
+        ), 'Убедитесь, что сообщение уходит в чат своей подписки.'
+        assert all(
+            s.timestamp == self.DATA['current_date'] for s in subscriptions
+        ), 'Убедитесь, что from_date берётся из `current_date` ответа.'
+
+    def test_unchanged_status_not_resent(self, api):
+        instance, sent = self.make_poller([poller.Subscription('a', '1')])
+        try:
+            asyncio.run(instance.run_cycle())
+            stats = asyncio.run(instance.run_cycle())
+        finally:
+            instance.close()
+        assert stats.messages == 0 and len(sent) == 1, (
+            'Убедитесь, что повторный статус не отправляется в чат.'
+        )
+
+    def test_transition_invalidates_snapshot(self, api):
+        fetched = []
+        snapshots = SnapshotCache(lambda token: fetched.append(token) or [])
+        instance, _ = self.make_poller(
+            [poller.Subscription('a', '1')], snapshots=snapshots
+        )
+        try:
+            snapshots.get('a')
+            asyncio.run(instance.run_cycle())
+            snapshots.get('a')
+            asyncio.run(instance.run_cycle())
+            snapshots.get('a')
+        finally:
+            instance.close()
+        assert fetched == ['a', 'a'], (
+            'Убедитесь, что смена статуса сбрасывает снимок /status, '
+            'а повторный статус — нет.'
+        )
+
+    def test_each_subscription_uses_own_token(self, api):
+        instance, _ = self.make_poller(
+            [poller.Subscription('a', '1'), poller.Subscription('b', '2')]
+        )
+        try:
+            asyncio.run(instance.run_cycle())
+        finally:
+            instance.close()
+        assert sorted(api.tokens) == ['OAuth a', 'OAuth b']
+
+    def test_concurrency_cap(self, api):
+        lock = threading.Lock()
+        active = {'now': 0, 'max': 0}
+
+        def slow_request(*args, **kwargs):
+            with lock:
+                active['now'] += 1
+                active['max'] = max(active['max'], active['now'])
+            time.sleep(0.01)
+            with lock:
+                active['now'] -= 1
+
+        api.on_request = slow_request
+        instance, _ = self.make_poller(
+            [poller.Subscription(str(i), str(i)) for i in range(30)],
+            concurrency=3,
+        )
+        try:
+            asyncio.run(instance.run_cycle())
+        finally:
+            instance.close()
+        assert active['max'] <= 3, (
+            'Убедитесь, что число одновременных запросов ограничено.'
+        )
+
+    def test_failed_subscription_does_not_stop_cycle(self, api):
+        def flaky_request(*args, headers=None, **kwargs):
+            if headers['Authorization'] == 'OAuth bad':
+                raise requests.RequestException('Something wrong')
+
+        api.on_request = flaky_request
+        instance, sent = self.make_poller(
+            [poller.Subscription('bad', '1'), poller.Subscription('ok', '2')]
+        )
+        try:
+            stats = asyncio.run(instance.run_cycle())
+        finally:
+            instance.close()
+        assert stats.failed == 1 and [c for c, _ in sent] == ['2']
+
+
+def test_load_subscriptions(tmp_path):
+    path = tmp_path / 'subscriptions.txt'
+    path.write_text('# token chat_id\ntoken-1 100\n\ntoken-2 200\n')
+    subscriptions = poller.load_subscriptions(str(path), timestamp=5)
+    assert [(s.token, s.chat_id, s.timestamp) for s in subscriptions] == [
+        ('token-1', '100', 5), ('token-2', '200', 5)
+    ]
+    assert 'token-1' not in repr(subscriptions[0])
+
+
+@pytest.mark.parametrize('line', ['token-2', 'token-2 200 extra'])
+def test_load_subscriptions_rejects_bad_line(tmp_path, line):
+    path = tmp_path / 'subscriptions.txt'
+    path.write_text(f'token-1 100\n{line}\n')
+    with pytest.raises(ValueError, match=r'subscriptions\.txt:2:') as error:
+        poller.load_subscriptions(str(path))
+    assert 'token-2' not in str(error.value), (
+        'Сообщение об ошибке не должно раскрывать токен.'
+    )
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,66 @@
+import pytest
+
+from status_bot.api import parse_status
+from status_bot.diff import StatusDiff
+from status_bot.records import Homework
+
+
+class TestHomework:
+
+    def test_from_json(self):
+        homework = Homework.from_json(
+            {'homework_name': 'hw1', 'status': 'approved', 'id': 1}
+        )
+        assert homework.name == 'hw1' and homework.status == 'approved'
+        assert homework.message == parse_status(
+            {'homework_name': 'hw1', 'status': 'approved'}
+        )
+
+    def test_slots(self):
+        homework = Homework('hw1', 'approved')
+        assert not hasattr(homework, '__dict__'), (
+            'Убедитесь, что у Homework объявлены `__slots__`.'
+        )
+
+    def test_status_is_interned(self):
+        status = ''.join(['appr', 'oved'])
+        homework = Homework.from_json(
+            {'homework_name': 'hw', 'status': status}
+        )
+        assert homework.status is Homework.from_json(
+            {'homework_name': 'other', 'status': 'approved'}
+        ).status
+
+    def test_shared_instances(self):
+        data = {'homework_name': 'hw1', 'status': 'reviewing'}
+        assert Homework.from_json(data) is Homework.from_json(dict(data))
+
+    def test_status_diff_uses_records(self):
+        statuses = StatusDiff(render=None)
+        (transition,) = statuses.pending(
+            [{'homework_name': 'hw1', 'status': ''.join(['appr', 'oved'])}]
+        )
+        record = Homework.from_json(
+            {'homework_name': 'hw1', 'status': 'approved'}
+        )
+        assert transition[1] is record.status
+        assert transition[2] is record.message, (
+            'Убедитесь, что StatusDiff берёт текст из записи Homework.'
+        )
+
+    @pytest.mark.parametrize('data', [
+        {'homework_name': 'hw1', 'status': 'unknown'},
+        {'homework_name': 'hw1'},
+        {'status': 'approved'},
+    ])
+    def test_invalid_homework(self, data):
+        with pytest.raises(KeyError) as error:
+            Homework.from_json(data)
+        assert repr(error.value) not in (
+            "KeyError('unknown')", "KeyError('homework_name')",
+            "KeyError('status')"
+        ), 'Убедитесь, что текст ошибки объясняет проблему.'
+
+
+if __name__ == '__main__':
+    pytest.main()
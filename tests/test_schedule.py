@@ -0,0 +1,134 @@
+import asyncio
+import collections
+
+import pytest
+
+from status_bot import poller
+from status_bot.clock import VirtualClock
+from status_bot.schedule import PollScheduler
+
+
+class TestPollScheduler:
+
+    def test_periodic_without_drift(self):
+        clock = VirtualClock(start=1000.0)
+        scheduler = PollScheduler(600, jitter=0, clock=clock)
+        scheduler.add('a', delay=0)
+        fired = []
+        for _ in range(5):
+            clock.now = scheduler.next_at()
+            assert scheduler.due() == ['a']
+            fired.append(clock.now)
+            # Опрос длится 30 секунд: срок следующего не должен сдвинуться.
+            clock.now += 30
+            assert scheduler.due() == []
+        assert fired == [1000 + 600 * k for k in range(5)], (
+            'Убедитесь, что срок следующего опроса считается от прошлого '
+            'срока, а не от конца опроса.'
+        )
+
+    def test_jitter_does_not_accumulate(self):
+        clock = VirtualClock(start=1000.0)
+        scheduler = PollScheduler(600, jitter=0.1, clock=clock, seed=1)
+        scheduler.add('a', delay=0)
+        for k in range(1, 50):
+            clock.now = scheduler.next_at()
+            scheduler.due()
+            assert 1000 + 600 * k <= scheduler.next_at() <= 1060 + 600 * k
+
+    def test_first_polls_spread_over_period(self):
+        clock = VirtualClock(start=1000.0)
+        scheduler = PollScheduler(600, jitter=0, clock=clock, seed=1)
+        for key in range(6000):
+            scheduler.add(key)
+        counts = []
+        for minute in range(1, 11):
+            counts.append(len(scheduler.due(1000 + 60 * minute)))
+        assert sum(counts) == 6000
+        assert max(counts) < 700, (
+            'Убедитесь, что первые опросы разнесены по периоду.'
+        )
+
+    def test_missed_periods_fire_once(self):
+        clock = VirtualClock(start=1000.0)
+        scheduler = PollScheduler(10, jitter=0, clock=clock)
+        scheduler.add('a', delay=0)
+        assert scheduler.due(1035) == ['a']
+        assert scheduler.missed == 3
+        assert scheduler.next_at() == 1040
+
+    def test_discard(self):
+        clock = VirtualClock(start=1000.0)
+        scheduler = PollScheduler(10, jitter=0, clock=clock)
+        scheduler.add('a', delay=1)
+        scheduler.add('b', delay=2)
+        scheduler.discard('a')
+        assert 'a' not in scheduler and len(scheduler) == 1
+        assert scheduler.next_at() == 1002
+        assert scheduler.due(1005) == ['b']
+
+    def test_add_reschedules(self):
+        clock = VirtualClock(start=1000.0)
+        scheduler = PollScheduler(10, jitter=0, clock=clock)
+        scheduler.add('a', delay=1)
+        scheduler.add('a', delay=5)
+        assert scheduler.due(1003) == []
+        assert scheduler.due(1005) == ['a']
+
+    def test_set_period_from_previous_deadline(self):
+        clock = VirtualClock(start=1000.0)
+        scheduler = PollScheduler(600, jitter=0, clock=clock)
+        scheduler.add('a', delay=0)
+        assert scheduler.due() == ['a']
+        clock.now += 10
+        scheduler.set_period('a', 120)
+        assert scheduler.period_of('a') == 120
+        assert scheduler.next_at() == 1120, (
+            'Убедитесь, что новый период отсчитывается от прошлого срока.'
+        )
+        clock.now = 1500
+        scheduler.set_period('a', 60)
+        assert scheduler.next_at() == 1500
+        assert scheduler.due() == ['a'] and scheduler.next_at() == 1560
+
+    def test_add_keeps_period(self):
+        clock = VirtualClock(start=1000.0)
+        scheduler = PollScheduler(600, jitter=0, clock=clock)
+        scheduler.add('a', delay=0, period=60)
+        scheduler.add('a', delay=5)
+        assert scheduler.period_of('a') == 60
+        assert scheduler.period_of('b') == 600
+
+    def test_invalid_period(self):
+        with pytest.raises(ValueError):
+            PollScheduler(0)
+
+
+def test_run_forever_polls_by_schedule(practicum):
+    instance = poller.AsyncPoller(
+        [poller.Subscription(f'token-{i}', str(i)) for i in range(4)],
+        send=lambda chat_id, message: None,
+        period=0.3,
+        tick=0.01,
+        jitter=0,
+    )
+
+    async def run_briefly():
+        try:
+            await asyncio.wait_for(instance.run_forever(), 0.75)
+        except asyncio.TimeoutError:
+            pass
+
+    try:
+        asyncio.run(run_briefly())
+    finally:
+        instance.close()
+    calls = collections.Counter(practicum.tokens)
+    assert len(calls) == 4
+    assert all(2 <= count <= 3 for count in calls.values()), (
+        'Убедитесь, что каждая подписка опрашивается раз в период.'
+    )
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,118 @@
+import queue
+import threading
+import time
+
+import pytest
+import telegram
+
+from status_bot.clock import VirtualClock
+from status_bot.sender import SendQueue, TokenBucket
+
+
+class Recorder:
+    def __init__(self):
+        self.sent = []
+
+    def __call__(self, chat_id, message):
+        self.sent.append((chat_id, message, time.monotonic()))
+
+
+def test_token_bucket():
+    bucket = TokenBucket(rate=2, capacity=1, now=0)
+    assert bucket.delay(0) == 0
+    bucket.consume(0)
+    assert bucket.delay(0) == pytest.approx(0.5)
+    assert bucket.delay(0.5) == 0
+
+
+class TestSendQueue:
+
+    def test_delivers_in_chat_order(self):
+        recorder = Recorder()
+        send_queue = SendQueue(recorder, global_rate=1000, per_chat_rate=200)
+        for index in range(10):
+            send_queue.put(index % 2, str(index))
+        send_queue.close(timeout=5)
+        assert send_queue.delivered == 10
+        for chat_id in (0, 1):
+            assert [m for c, m, _ in recorder.sent if c == chat_id] == [
+                str(i) for i in range(chat_id, 10, 2)
+            ], 'Убедитесь, что порядок сообщений в чате сохраняется.'
+
+    def test_per_chat_rate(self):
+        recorder = Recorder()
+        send_queue = SendQueue(recorder, global_rate=1000, per_chat_rate=20)
+        for index in range(4):
+            send_queue.put(1, str(index))
+        send_queue.close(timeout=5)
+        times = [sent_at for _, _, sent_at in recorder.sent]
+        gaps = [later - earlier for earlier, later in zip(times, times[1:])]
+        assert min(gaps) >= 0.045, (
+            'Убедитесь, что сообщения в один чат не отправляются чаще '
+            'лимита.'
+        )
+
+    def test_retry_after_is_honored(self):
+        recorder = Recorder()
+        attempts = []
+
+        def send(chat_id, message):
+            attempts.append(time.monotonic())
+            if len(attempts) == 1:
+                raise telegram.error.RetryAfter(0.1)
+            recorder(chat_id, message)
+
+        send_queue = SendQueue(send, global_rate=1000, per_chat_rate=1000)
+        send_queue.put(1, 'first')
+        send_queue.put(1, 'second')
+        send_queue.close(timeout=5)
+        assert send_queue.retried == 1
+        assert [m for _, m, _ in recorder.sent] == ['first', 'second']
+        assert attempts[1] - attempts[0] >= 0.09, (
+            'Убедитесь, что после 429 отправка ждёт `retry_after` секунд.'
+        )
+
+    def test_rate_limit_waits_on_clock(self):
+        clock = VirtualClock()
+        sent = []
+        send_queue = SendQueue(
+            lambda chat_id, message: sent.append(clock()),
+            global_rate=1000, per_chat_rate=1, clock=clock,
+        )
+        for index in range(4):
+            send_queue.put(1, str(index))
+        assert send_queue.join(timeout=1), (
+            'Убедитесь, что паузы лимитов идут по часам очереди.'
+        )
+        send_queue.close()
+        assert sent == pytest.approx([0, 1, 2, 3])
+
+    def test_backpressure(self):
+        release = threading.Event()
+        send_queue = SendQueue(
+            lambda chat_id, message: release.wait(), maxsize=2
+        )
+        send_queue.put(1, 'a')
+        send_queue.put(2, 'b')
+        with pytest.raises(queue.Full):
+            send_queue.put(3, 'c', timeout=0.05)
+        release.set()
+        send_queue.close(timeout=5)
+        assert send_queue.delivered == 2
+
+    def test_failure_callback(self):
+        failures = []
+
+        def send(chat_id, message):
+            raise telegram.error.TelegramError('Something wrong')
+
+        send_queue = SendQueue(
+            send, on_failure=lambda *args: failures.append(args)
+        )
+        send_queue.put(1, 'a')
+        send_queue.close(timeout=5)
+        assert send_queue.failed == 1 and failures[0][:2] == (1, 'a')
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,146 @@
+import time
+
+import pytest
+
+from status_bot.clock import VirtualClock
+from status_bot.metrics import (NOTIFICATIONS, Counter, Registry,
+                                merge_collected)
+from status_bot.poller import Subscription
+from status_bot.shards import HashRing, Supervisor, shard_name
+
+KEYS = [f'{chat_id}:token' for chat_id in range(10000)]
+
+
+def owners(ring):
+    return {key: ring.node_for(key) for key in KEYS}
+
+
+class TestHashRing:
+
+    def test_balanced(self):
+        ring = HashRing(map(shard_name, range(4)))
+        counts = {}
+        for owner in owners(ring).values():
+            counts[owner] = counts.get(owner, 0) + 1
+        assert len(counts) == 4
+        assert max(counts.values()) < 1.3 * len(KEYS) / 4, (
+            'Убедитесь, что подписки распределяются по шардам равномерно.'
+        )
+
+    def test_add_moves_about_one_kth(self):
+        ring = HashRing(map(shard_name, range(4)))
+        before = owners(ring)
+        ring.add(shard_name(4))
+        after = owners(ring)
+        moved = [key for key in KEYS if before[key] != after[key]]
+        assert 0.1 < len(moved) / len(KEYS) < 0.3, (
+            'При добавлении пятого шарда должно переехать около 1/5 подписок.'
+        )
+        assert {after[key] for key in moved} == {shard_name(4)}
+
+    def test_remove_moves_only_its_keys(self):
+        ring = HashRing(map(shard_name, range(4)))
+        before = owners(ring)
+        ring.remove(shard_name(2))
+        after = owners(ring)
+        assert all(
+            before[key] == after[key]
+            for key in KEYS if before[key] != shard_name(2)
+        )
+
+    def test_empty_ring(self):
+        with pytest.raises(LookupError):
+            HashRing().node_for('key')
+
+
+def test_merge_collected():
+    registry = Registry()
+    counter = registry.register(Counter('sent_total', 'Отправлено.'))
+    counter.inc(2)
+    merged = merge_collected([registry.collect(), registry.collect()])
+    assert 'sent_total 4' in registry.render(merged)
+
+
+def count_and_wait(subscriptions):
+    NOTIFICATIONS.inc(len(subscriptions))
+    time.sleep(60)
+
+
+def notifications(text):
+    for line in text.splitlines():
+        if line.startswith('bot_notifications_sent_total '):
+            return float(line.split()[1])
+    return 0
+
+
+def wait_for(condition, timeout=30):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'Не дождались шардов.'
+        time.sleep(0.05)
+
+
+def test_supervisor_restarts_and_aggregates():
+    subscriptions = [Subscription(f'token-{i}', str(i)) for i in range(30)]
+    supervisor = Supervisor(
+        subscriptions, count_and_wait, workers=3, report_interval=0.05
+    ).start()
+    try:
+        wait_for(
+            lambda: notifications(supervisor.render()) == 30
+        )
+        name, process = sorted(supervisor._processes.items())[0]
+        shard_size = len(supervisor._assignments[name])
+        process.kill()
+        process.join()
+        assert supervisor.check() == 1
+        wait_for(
+            lambda: notifications(supervisor.render()) == 30 + shard_size
+        )
+        assert supervisor._processes[name].is_alive()
+    finally:
+        supervisor.stop()
+
+
+def crash_at_once(subscriptions):
+    raise SystemExit(3)
+
+
+def test_supervisor_backs_off_and_gives_up(caplog):
+    clock = VirtualClock()
+    supervisor = Supervisor(
+        [Subscription('token', '1')], crash_at_once, workers=1,
+        restart_delay=10, max_failures=3, clock=clock,
+    ).start()
+
+    def crashed():
+        process = supervisor._processes['shard-0']
+        process.join(30)
+        return not process.is_alive()
+
+    try:
+        assert crashed() and supervisor.check() == 1
+        for delay in (10, 20):
+            assert crashed() and supervisor.check() == 0, (
+                'Убедитесь, что быстро падающий шард перезапускается '
+                'с паузой.'
+            )
+            clock.sleep(delay - 1)
+            assert supervisor.check() == 0
+            clock.sleep(1)
+            assert supervisor.check() == 1
+        assert crashed() and supervisor.check() == 0
+        clock.sleep(1000)
+        assert supervisor.check() == 0
+        assert supervisor.failed == {'shard-0'}, (
+            'Убедитесь, что после `max_failures` падений подряд шард '
+            'больше не перезапускается.'
+        )
+        assert 'перезапуски прекращены' in caplog.text
+        assert supervisor.restarts == 3
+    finally:
+        supervisor.stop()
+
+
+if __name__ == '__main__':
+    pytest.main()
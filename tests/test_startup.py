@@ -0,0 +1,71 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ('telegram', 'requests', 'asyncio', 'multiprocessing', 'dotenv',
+         'http.server')
+
+
+def run_python(code, **env):
+    output = subprocess.run(
+        [sys.executable, '-c', code],
+        cwd=ROOT,
+        env=dict(os.environ, **env),
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output)
+
+
+def test_import_has_no_side_effects():
+    result = run_python(
+        'import json, sys, homework\n'
+        f'heavy = [name for name in {HEAVY!r} if name in sys.modules]\n'
+        'print(json.dumps({"heavy": heavy,'
+        ' "handlers": len(homework.logger.handlers)}))'
+    )
+    assert result['heavy'] == [], (
+        'Убедитесь, что импорт homework не загружает тяжёлые зависимости: '
+        f'{result["heavy"]}.'
+    )
+    assert result['handlers'] == 0, (
+        'Убедитесь, что журнал настраивается в create_app, а не при импорте.'
+    )
+
+
+@pytest.mark.parametrize('env, entry', [
+    ({}, 'main'),
+    ({'SUBSCRIPTIONS_FILE': 'subscriptions.txt'}, 'run_cohort'),
+    ({'SUBSCRIPTIONS_FILE': 'subscriptions.txt', 'WORKERS': '2'},
+     'run_supervisor'),
+])
+def test_create_app_picks_entry_point(env, entry):
+    result = run_python(
+        'import json, homework\n'
+        'entry = homework.create_app()\n'
+        'print(json.dumps({"entry": entry.__name__,'
+        ' "handlers": len(homework.logger.handlers)}))',
+        **env,
+    )
+    assert result == {'entry': entry, 'handlers': 1}
+
+
+def test_lazy_module_sees_monkeypatch(monkeypatch):
+    import telegram
+
+    from status_bot.lazy import LazyModule
+
+    lazy = LazyModule('telegram')
+    monkeypatch.setattr(telegram, 'Bot', 'patched')
+    assert lazy.Bot == 'patched', (
+        'Убедитесь, что LazyModule берёт атрибуты из настоящего модуля.'
+    )
+
+
+if __name__ == '__main__':
+    pytest.main()
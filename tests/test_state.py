@@ -0,0 +1,230 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+import homework
+from benchmarks.simulation import RecordingBot
+from status_bot import poller
+from status_bot.cache import ResponseCache
+from status_bot.clock import VirtualClock
+from status_bot.state import (MemoryStateStore, SqliteStateStore, StateBatch,
+                              open_state_store, subscription_key)
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def store(request, tmp_path):
+    if request.param == 'memory':
+        instance = MemoryStateStore()
+    else:
+        instance = SqliteStateStore(str(tmp_path / 'state.sqlite3'))
+    yield instance
+    instance.close()
+
+
+class TestStateStore:
+
+    def test_write_and_load(self, store):
+        batch = StateBatch()
+        batch.watermark('a', 100)
+        batch.status('a', 'hw1', 'reviewing')
+        batch.status('a', 'hw1', 'approved')
+        batch.watermark('b', 200)
+        store.write(batch)
+        states = store.load()
+        assert states['a'].from_date == 100
+        assert states['a'].statuses == {'hw1': 'approved'}
+        assert states['b'].statuses == {}
+
+    def test_pending_lifecycle(self, store):
+        batch = StateBatch()
+        batch.add_pending('a', 1, 'first')
+        batch.add_pending('a', 1, 'second')
+        store.write(batch)
+        pending = store.pending()
+        assert [item.message for item in pending] == ['first', 'second']
+        batch = StateBatch()
+        batch.mark_delivered(pending[0].id)
+        store.write(batch)
+        assert [item.message for item in store.pending()] == ['second']
+
+
+def test_sqlite_uses_wal_and_survives_reopen(tmp_path):
+    path = str(tmp_path / 'state.sqlite3')
+    store = SqliteStateStore(path)
+    mode = store._connection.execute('PRAGMA journal_mode').fetchone()[0]
+    assert mode == 'wal'
+    batch = StateBatch()
+    batch.watermark('a', 42)
+    store.write(batch)
+    store.close()
+    reopened = open_state_store(path)
+    assert reopened.load()['a'].from_date == 42, (
+        'Убедитесь, что метка from_date сохраняется между перезапусками.'
+    )
+    reopened.close()
+
+
+def test_sqlite_migrates_old_pending_table(tmp_path):
+    path = str(tmp_path / 'state.sqlite3')
+    connection = sqlite3.connect(path)
+    connection.executescript(
+        'CREATE TABLE pending (id INTEGER PRIMARY KEY AUTOINCREMENT, '
+        'subscription TEXT NOT NULL, chat_id TEXT NOT NULL, '
+        'message TEXT NOT NULL);'
+        "INSERT INTO pending (subscription, chat_id, message) "
+        "VALUES ('a', '1', 'kept');"
+    )
+    connection.close()
+    store = SqliteStateStore(path)
+    assert [item.message for item in store.pending()] == ['kept'], (
+        'Убедитесь, что неотправленные уведомления переносятся в outbox.'
+    )
+    store.close()
+
+
+def test_subscription_key_hides_token():
+    key = subscription_key('secret-token', 123)
+    assert key.startswith('123:') and 'secret-token' not in key
+
+
+class TestPollerWarmRestart:
+    DATA = {
+        'homeworks': [{'homework_name': 'hw1', 'status': 'approved'}],
+        'current_date': 500
+    }
+
+    @pytest.fixture
+    def api(self, practicum):
+        practicum.body = self.DATA
+        return practicum
+
+    def run_cycle(self, store, send):
+        instance = poller.AsyncPoller(
+            [poller.Subscription('token', '1', timestamp=0)],
+            send=send, store=store
+        )
+        instance.restore()
+        try:
+            asyncio.run(instance.run_cycle())
+        finally:
+            instance.close()
+
+    def test_restart_keeps_watermark_and_statuses(self, api, store):
+        sent = []
+        self.run_cycle(store, lambda chat_id, message: sent.append(message))
+        self.run_cycle(store, lambda chat_id, message: sent.append(message))
+        assert api.from_dates == [0, 500], (
+            'Убедитесь, что после перезапуска запрос идёт с сохранённой '
+            'меткой from_date.'
+        )
+        assert len(sent) == 1, (
+            'Убедитесь, что после перезапуска известный статус '
+            'не отправляется повторно.'
+        )
+
+    def test_failed_send_is_kept_and_retried(self, api, store):
+
+        def broken_send(chat_id, message):
+            raise ConnectionError('telegram is down')
+
+        self.run_cycle(store, broken_send)
+        assert len(store.pending()) == 1
+        sent = []
+        instance = poller.AsyncPoller(
+            [poller.Subscription('token', '1', timestamp=0)],
+            send=lambda chat_id, message: sent.append(message),
+            store=store
+        )
+        assert instance.deliver_pending() == 1
+        instance.close()
+        assert len(sent) == 1 and store.pending() == []
+
+
+class FailingStore(MemoryStateStore):
+    """Хранилище, у которого первые `failures` записей падают."""
+
+    def __init__(self, failures):
+        super().__init__()
+        self.failures = failures
+
+    def write(self, batch):
+        if self.failures and batch.statuses:
+            self.failures -= 1
+            raise sqlite3.OperationalError('database is locked')
+        super().write(batch)
+
+
+def homework_item(name, status):
+    return {'homework_name': name, 'status': status}
+
+
+class TestCommitAfterWrite:
+
+    def run_loop(self, store, responses):
+        clock = VirtualClock()
+        bot = RecordingBot(clock)
+        loop = homework.PollLoop(
+            bot, store, fetch=lambda timestamp: responses.pop(0), clock=clock
+        )
+        while responses:
+            loop.cycle()
+        return [text for _, text in bot.messages]
+
+    def test_invalid_item_does_not_lose_earlier_transition(self):
+        approved = homework_item('a', 'approved')
+        responses = [
+            {'homeworks': [approved, homework_item('b', 'weird')],
+             'current_date': 100},
+            {'homeworks': [approved, homework_item('b', 'reviewing')],
+             'current_date': 200},
+        ]
+        texts = self.run_loop(MemoryStateStore(), responses)
+        notified = homework.parse_status(approved)
+        assert texts.count(notified) == 1, (
+            'Убедитесь, что переход, найденный до некорректной работы, '
+            'не считается увиденным и приходит в следующем цикле.'
+        )
+
+    def test_failed_write_keeps_transition(self):
+        approved = homework_item('a', 'approved')
+        responses = [
+            {'homeworks': [approved], 'current_date': 100},
+            {'homeworks': [approved], 'current_date': 200},
+        ]
+        texts = self.run_loop(FailingStore(1), responses)
+        assert texts.count(homework.parse_status(approved)) == 1, (
+            'Убедитесь, что статусы запоминаются только после записи.'
+        )
+
+    @pytest.mark.parametrize('cache', [None, ResponseCache])
+    def test_poller_failed_write_keeps_transition(
+        self, practicum, caplog, cache
+    ):
+        practicum.body = TestPollerWarmRestart.DATA
+        sent = []
+        instance = poller.AsyncPoller(
+            [poller.Subscription('token', '1', timestamp=0)],
+            send=lambda chat_id, message: sent.append(message),
+            store=FailingStore(1),
+            cache=cache and cache(),
+        )
+        try:
+            stats = asyncio.run(instance.run_cycle())
+            assert stats.failed == 1 and 'database is locked' in caplog.text, (
+                'Убедитесь, что сбой записи логируется и не роняет цикл.'
+            )
+            asyncio.run(instance.run_cycle())
+        finally:
+            instance.close()
+        assert practicum.from_dates == [0, 0], (
+            'Убедитесь, что метка from_date не сдвигается без записи.'
+        )
+        assert len(sent) == 1, (
+            'Убедитесь, что после сбоя записи тот же ответ API '
+            'не берётся из кэша как неизменный.'
+        )
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,149 @@
+import asyncio
+import json
+
+import pytest
+import requests
+
+from status_bot import poller
+from status_bot.clock import VirtualClock
+from status_bot.deadline import Deadline, DeadlineExceeded
+from status_bot.streaming import (HomeworkStream, iter_messages,
+                                  stream_api_answer)
+
+
+def chunked(data, size):
+    body = json.dumps(data, ensure_ascii=False).encode()
+    return [body[i:i + size] for i in range(0, len(body), size)]
+
+
+class TestHomeworkStream:
+    DATA = {
+        'homeworks': [
+            {'homework_name': f'Работа №{i}', 'status': 'approved', 'id': i}
+            for i in range(20)
+        ],
+        'current_date': 1000198991
+    }
+
+    @pytest.mark.parametrize('size', [1, 7, 64, 100000])
+    def test_matches_full_parse(self, size):
+        stream = HomeworkStream(chunked(self.DATA, size))
+        assert list(stream) == self.DATA['homeworks']
+        assert stream.get('current_date') == self.DATA['current_date'], (
+            'Убедитесь, что число на границе куска разбирается целиком.'
+        )
+        assert len(stream) == 20
+
+    def test_current_date_before_homeworks(self):
+        data = {'current_date': 5, 'homeworks': []}
+        stream = HomeworkStream(chunked(data, 3))
+        assert list(stream) == [] and stream.get('current_date') == 5
+
+    @pytest.mark.parametrize('data, error', [
+        ([{'homeworks': []}], TypeError),
+        ({'current_date': 1}, ValueError),
+        ({'homeworks': {'homework_name': 'hw'}}, TypeError),
+        ({'homeworks': ['hw']}, TypeError),
+    ])
+    def test_invalid_responses(self, data, error):
+        with pytest.raises(error):
+            list(HomeworkStream(chunked(data, 4)))
+
+    def test_truncated_body(self):
+        body = b'{"homeworks": [{"homework_name": "hw"'
+        with pytest.raises(ValueError):
+            list(HomeworkStream([body]))
+
+    def test_messages_are_lazy(self):
+        stream = HomeworkStream(chunked(self.DATA, 16))
+        messages = iter_messages(stream)
+        assert 'Работа №0' in next(messages)
+        assert stream.count == 1, (
+            'Убедитесь, что работы разбираются по мере запроса сообщений.'
+        )
+
+
+class StreamingResponse:
+    status_code = 200
+
+    def __init__(self, data):
+        self.data = data
+        self.closed = False
+
+    def iter_content(self, chunk_size):
+        return chunked(self.data, 5)
+
+    def close(self):
+        self.closed = True
+
+
+def test_poller_streaming_mode(monkeypatch):
+    data = {
+        'homeworks': [{'homework_name': 'hw1', 'status': 'reviewing'}],
+        'current_date': 77
+    }
+    calls = []
+
+    def mock_get(*args, stream=False, **kwargs):
+        calls.append(stream)
+        return StreamingResponse(data)
+
+    monkeypatch.setattr(requests, 'get', mock_get)
+    sent = []
+    subscription = poller.Subscription('token', '1')
+    instance = poller.AsyncPoller(
+        [subscription], send=lambda chat_id, message: sent.append(message),
+        streaming=True
+    )
+    try:
+        stats = asyncio.run(instance.run_cycle())
+    finally:
+        instance.close()
+    assert calls == [True] and stats.messages == 1
+    assert subscription.timestamp == 77
+
+
+class TestStreamApiAnswer:
+    DATA = {
+        'homeworks': [
+            {'homework_name': f'hw{i}', 'status': 'approved'}
+            for i in range(3)
+        ],
+        'current_date': 77,
+    }
+
+    @pytest.fixture
+    def response(self, monkeypatch):
+        instance = StreamingResponse(self.DATA)
+        monkeypatch.setattr(requests, 'get', lambda *args, **kwargs: instance)
+        return instance
+
+    def test_closes_response(self, response):
+        stream = stream_api_answer({}, 0)
+        assert list(stream) == self.DATA['homeworks']
+        assert response.closed, (
+            'Убедитесь, что ответ закрывается после чтения тела.'
+        )
+
+    def test_closes_abandoned_response(self, response):
+        stream = stream_api_answer({}, 0)
+        for homework in stream:
+            break
+        stream.close()
+        assert response.closed
+
+    def test_deadline_limits_body(self, response):
+        clock = VirtualClock()
+        deadline = Deadline(10, clock)
+        stream = iter(stream_api_answer({}, 0, deadline=deadline))
+        next(stream)
+        clock.sleep(10)
+        with pytest.raises(DeadlineExceeded):
+            list(stream)
+        assert response.closed, (
+            'Убедитесь, что тело ответа читается в пределах срока запроса.'
+        )
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,183 @@
+import asyncio
+import json
+import socket
+import time
+
+import pytest
+
+import homework
+from benchmarks.stand_in import OtlpCollectorStandIn
+from status_bot import tracing
+from status_bot.poller import AsyncPoller, Subscription
+from status_bot.tracing import (NOOP_SPAN, JsonLinesExporter, MemoryExporter,
+                                OtlpExporter, open_exporter)
+
+
+@pytest.fixture
+def exporter():
+    instance = MemoryExporter()
+    previous = tracing.configure(instance)
+    yield instance
+    tracing.configure(previous)
+
+
+class TestSpans:
+
+    def test_nested_spans_share_trace(self, exporter):
+        with tracing.span('cycle', subscriptions=2) as cycle:
+            with tracing.span('poll') as poll:
+                poll.set_attribute('http.status_code', 200)
+        assert [span.name for span in exporter.spans] == ['poll', 'cycle']
+        assert poll.trace_id == cycle.trace_id
+        assert poll.parent_id == cycle.span_id and cycle.parent_id is None
+        assert poll.attributes == {'http.status_code': 200}
+        assert cycle.start <= poll.start <= poll.end <= cycle.end
+        assert tracing.current_span() is None
+
+    def test_error_recorded(self, exporter):
+        with pytest.raises(ValueError):
+            with tracing.span('check_response'):
+                raise ValueError('нет ключа homeworks')
+        assert exporter.spans[0].error == 'ValueError: нет ключа homeworks'
+
+    def test_traced_decorator(self, exporter):
+        @tracing.traced()
+        def parse_status(value):
+            return value * 2
+
+        assert parse_status(2) == 4
+        assert [span.name for span in exporter.spans] == ['parse_status']
+
+    def test_disabled_records_nothing(self):
+        assert tracing.configure(None) is None
+        with tracing.span('poll', subscription='abc') as span:
+            span.set_attribute('http.status_code', 200)
+        assert span is NOOP_SPAN and not span.recording, (
+            'Без экспортёра `span` должен возвращать пустой спан.'
+        )
+
+
+def test_poll_cycle_spans(practicum, exporter):
+    practicum.homeworks = [{'homework_name': 'hw1', 'status': 'approved'}]
+    poller = AsyncPoller(
+        [Subscription(f'token-{i}', str(i)) for i in range(2)],
+        send=lambda chat_id, message: None,
+    )
+    try:
+        asyncio.run(poller.run_cycle())
+    finally:
+        poller.close()
+    spans = {span.span_id: span for span in exporter.spans}
+    (cycle,) = [span for span in spans.values() if span.name == 'poll_cycle']
+    assert {span.trace_id for span in spans.values()} == {cycle.trace_id}, (
+        'Убедитесь, что все спаны цикла относятся к одной трассе.'
+    )
+    polls = [span for span in spans.values() if span.name == 'poll']
+    assert len(polls) == 2
+    assert all(span.parent_id == cycle.span_id for span in polls)
+    children = sorted(
+        span.name for span in spans.values()
+        if spans.get(span.parent_id) is polls[0]
+    )
+    assert children == ['check_response', 'get_api_answer', 'parse_status']
+    (request,) = [
+        span for span in spans.values()
+        if span.name == 'get_api_answer' and span.parent_id == polls[0].span_id
+    ]
+    assert request.attributes == {
+        'http.status_code': 200,
+        'http.response_size': len(json.dumps({
+            'homeworks': practicum.homeworks, 'current_date': 1,
+        })),
+    }
+    sends = [span for span in spans.values() if span.name == 'send_message']
+    assert len(sends) == 2
+
+
+class TestExporters:
+
+    def test_json_lines(self, tmp_path):
+        path = tmp_path / 'spans.jsonl'
+        exporter = JsonLinesExporter(str(path))
+        previous = tracing.configure(exporter)
+        try:
+            with tracing.span('poll', subscription='abc'):
+                pass
+        finally:
+            tracing.configure(previous)
+            exporter.shutdown()
+        (entry,) = [json.loads(line) for line in path.read_text().splitlines()]
+        assert entry['name'] == 'poll'
+        assert entry['attributes'] == {'subscription': 'abc'}
+        assert len(entry['trace_id']) == 32 and len(entry['span_id']) == 16
+
+    def test_otlp_collector(self):
+        with OtlpCollectorStandIn() as collector:
+            exporter = OtlpExporter(collector.url, batch_size=3)
+            previous = tracing.configure(exporter)
+            try:
+                with tracing.span('poll_cycle'):
+                    for _ in range(3):
+                        with tracing.span('poll', status=200):
+                            pass
+            finally:
+                tracing.configure(previous)
+            deadline = time.monotonic() + 5
+            while collector.requests < 1 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert collector.requests == 1, (
+                'Спаны должны уходить в коллектор пачками.'
+            )
+            exporter.shutdown()
+        assert exporter.exported == 4 and collector.requests == 2
+        root = collector.spans[-1]
+        assert root['name'] == 'poll_cycle' and 'parentSpanId' not in root
+        assert collector.spans[0]['parentSpanId'] == root['spanId']
+        assert collector.spans[0]['attributes'] == [
+            {'key': 'status', 'value': {'intValue': '200'}},
+        ]
+
+    def test_otlp_export_does_not_wait_for_collector(self):
+        # Коллектор принимает соединение, но не отвечает.
+        with socket.create_server(('127.0.0.1', 0)) as hung:
+            host, port = hung.getsockname()
+            exporter = OtlpExporter(
+                f'http://{host}:{port}', batch_size=1, timeout=0.2,
+                max_queue=2,
+            )
+            started = time.monotonic()
+            for _ in range(5):
+                exporter.export(tracing.Span('poll'))
+            elapsed = time.monotonic() - started
+            exporter.shutdown()
+        assert elapsed < 0.1, (
+            'Убедитесь, что спаны отправляются из фонового потока.'
+        )
+        assert exporter.exported == 0 and exporter.dropped == 5
+
+    def test_open_exporter(self, tmp_path):
+        assert open_exporter('') is None
+        assert isinstance(open_exporter('memory'), MemoryExporter)
+        assert isinstance(
+            open_exporter('otlp:http://127.0.0.1:4318'), OtlpExporter
+        )
+        with pytest.raises(ValueError):
+            open_exporter('zipkin:http://127.0.0.1')
+
+
+def test_configure_tracing_once(monkeypatch):
+    monkeypatch.setattr(homework, 'TRACING', 'memory')
+    previous = tracing.configure(None)
+    try:
+        exporter = homework.configure_tracing()
+        assert isinstance(exporter, MemoryExporter)
+        assert homework.configure_tracing() is None, (
+            'Убедитесь, что повторный вызов не заменяет экспортёр.'
+        )
+        assert tracing.current_exporter() is exporter
+    finally:
+        tracing.configure(previous)
+
+
+if __name__ == '__main__':
+    pytest.main()
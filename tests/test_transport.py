@@ -0,0 +1,86 @@
+import pytest
+import requests
+
+import homework
+import utils
+from benchmarks.simulation import RecordingBot
+from status_bot import api
+from status_bot.clock import VirtualClock
+from status_bot.state import MemoryStateStore
+from status_bot.transport import DEFAULT_TIMEOUT, HttpPool
+
+
+class TestHttpPool:
+
+    def test_get_uses_session_with_timeouts(self, monkeypatch):
+        pool = HttpPool(connect_timeout=1.5, read_timeout=7)
+        calls = []
+
+        def mock_session_get(url, **kwargs):
+            calls.append(kwargs)
+            return utils.MockResponseGET(url, **kwargs)
+
+        monkeypatch.setattr(pool.session, 'get', mock_session_get)
+        api.fetch_api_answer(api.auth_headers('token'), 0, session=pool)
+        assert calls, 'Убедитесь, что запрос идёт через сессию пула.'
+        assert calls[0]['timeout'] == (1.5, 7), (
+            'Убедитесь, что пул передаёт таймауты соединения и чтения.'
+        )
+
+    def test_explicit_timeout_wins(self, monkeypatch):
+        pool = HttpPool()
+        calls = []
+        monkeypatch.setattr(
+            pool.session, 'get', lambda url, **kwargs: calls.append(kwargs)
+        )
+        pool.get('https://example.com', timeout=1)
+        assert calls[0]['timeout'] == 1
+
+    def test_adapter_limits(self):
+        pool = HttpPool(pool_size=3, pool_hosts=2)
+        adapter = pool.session.get_adapter('https://practicum.yandex.ru')
+        assert adapter._pool_maxsize == 3
+        assert adapter._pool_connections == 2
+        assert adapter._pool_block is True
+
+    def test_telegram_request_shares_settings(self):
+        pool = HttpPool(pool_size=5, connect_timeout=2, read_timeout=9)
+        request = pool.telegram_request()
+        assert request.con_pool_size == 5
+        assert request._connect_timeout == 2
+        timeout = request._con_pool.connection_pool_kw['timeout']
+        assert timeout.read_timeout == 9
+
+
+def test_fetch_without_session_sets_timeout(practicum):
+    api.fetch_api_answer(api.auth_headers('token'), 0)
+    assert practicum.calls[0]['timeout'] == DEFAULT_TIMEOUT, (
+        'Убедитесь, что у запроса без пула есть таймаут.'
+    )
+
+
+def test_main_loop_uses_session(monkeypatch):
+    pool = HttpPool()
+    calls = []
+
+    def mock_session_get(url, **kwargs):
+        calls.append(kwargs['params'])
+        return utils.MockResponseGET(url, random_timestamp=1, **kwargs)
+
+    def unexpected_get(*args, **kwargs):
+        raise AssertionError('requests.get вызван при заданном пуле')
+
+    monkeypatch.setattr(pool.session, 'get', mock_session_get)
+    monkeypatch.setattr(requests, 'get', unexpected_get)
+    clock = VirtualClock()
+    loop = homework.PollLoop(
+        RecordingBot(clock), MemoryStateStore(), clock=clock, session=pool
+    )
+    loop.cycle()
+    assert len(calls) == 1, (
+        'Убедитесь, что main() передаёт пул соединений в запрос к API.'
+    )
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,114 @@
+import asyncio
+import logging
+
+import pytest
+
+from status_bot import poller
+from status_bot.watermark import Watermark, updated_at
+
+
+def homework(name, status, date_updated='2020-02-13T14:40:57Z'):
+    return {
+        'homework_name': name,
+        'status': status,
+        'date_updated': date_updated,
+    }
+
+
+class TestWatermark:
+
+    def test_request_from_with_overlap(self):
+        watermark = Watermark(60)
+        assert watermark.request_from(1000) == 940
+        assert watermark.request_from(30) == 0, (
+            'Убедитесь, что from_date не уходит в отрицательные значения.'
+        )
+
+    def test_updated_at(self):
+        assert updated_at(homework('hw', 'approved')) == 1581604857
+        assert updated_at({'date_updated': 'вчера'}) is None
+        assert updated_at({}) is None
+
+    def test_fresh_skips_items_from_overlap(self):
+        watermark = Watermark(60)
+        first = [homework('hw1', 'reviewing'), homework('hw2', 'approved')]
+        assert list(watermark.fresh(first)) == first
+        watermark.commit(0)
+        second = first + [homework('hw1', 'approved', '2020-02-13T14:41:30Z')]
+        assert list(watermark.fresh(second)) == second[2:], (
+            'Убедитесь, что работа, уже обработанная в перекрытии, '
+            'не обрабатывается повторно.'
+        )
+
+    def test_failed_item_not_marked(self):
+        watermark = Watermark(60)
+        homeworks = [homework('hw1', 'reviewing')]
+        with pytest.raises(RuntimeError):
+            for _ in watermark.fresh(homeworks):
+                raise RuntimeError
+        assert list(watermark.fresh(homeworks)) == homeworks, (
+            'Убедитесь, что работа, обработка которой упала, придёт '
+            'в следующем цикле.'
+        )
+
+    def test_items_seen_only_after_commit(self):
+        watermark = Watermark(60)
+        homeworks = [homework('hw1', 'reviewing')]
+        assert list(watermark.fresh(homeworks)) == homeworks
+        assert list(watermark.fresh(homeworks)) == homeworks, (
+            'Убедитесь, что работа считается увиденной только после '
+            'записи результата цикла.'
+        )
+        watermark.commit(0)
+        assert list(watermark.fresh(homeworks)) == []
+
+    def test_advance_keeps_watermark_without_current_date(self, caplog):
+        watermark = Watermark(60)
+        with caplog.at_level(logging.WARNING):
+            assert watermark.advance(500, {'current_date': None}) == 500
+            assert watermark.advance(500, {}) == 500
+            assert watermark.advance(500, {'current_date': True}) == 500
+        assert 'current_date' in caplog.text
+        assert watermark.advance(500, {'current_date': 700}) == 700
+
+    def test_advance_forgets_items_behind_window(self):
+        watermark = Watermark(60)
+        list(watermark.fresh([
+            homework('old', 'approved', '1970-01-01T00:01:40Z'),
+            homework('new', 'approved', '1970-01-01T00:16:40Z'),
+        ]))
+        watermark.commit(watermark.advance(0, {'current_date': 1000}))
+        assert len(watermark) == 1, (
+            'Убедитесь, что работы старше окна перекрытия забываются.'
+        )
+
+
+class TestPollerOverlap:
+    DATA = {
+        'homeworks': [homework('hw1', 'approved')],
+        'current_date': 1000,
+    }
+
+    def test_overlap_requests_and_dedup(self, practicum):
+        practicum.body = self.DATA
+        sent = []
+        instance = poller.AsyncPoller(
+            [poller.Subscription('token', '1', timestamp=500)],
+            send=lambda chat_id, message: sent.append(message),
+            overlap=60,
+        )
+        try:
+            asyncio.run(instance.run_cycle())
+            asyncio.run(instance.run_cycle())
+        finally:
+            instance.close()
+        assert practicum.from_dates == [440, 940], (
+            'Убедитесь, что from_date запроса меньше метки на перекрытие.'
+        )
+        assert len(sent) == 1, (
+            'Убедитесь, что работа из перекрытия не отправляется повторно.'
+        )
+
+
+if __name__ == '__main__':
+    pytest.main()
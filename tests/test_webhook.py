@@ -0,0 +1,175 @@
+import http.client
+import json
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from status_bot.commands import Commands, SnapshotCache, UpdateDispatcher
+from status_bot.webhook import SECRET_HEADER, WebhookServer
+
+SECRET = 'secret-token'
+HOMEWORKS = [{'homework_name': 'hw1', 'status': 'approved'}]
+
+
+def update(update_id, chat_id=1, text='/status'):
+    return {
+        'update_id': update_id,
+        'message': {'chat': {'id': chat_id}, 'text': text},
+    }
+
+
+class FakeTelegram:
+    """Отправляет обновления на вебхук, как это делает Telegram."""
+
+    def __init__(self, server, secret=SECRET):
+        self.host, self.port = server.server_address
+        self.secret = secret
+        self.local = threading.local()
+
+    def post(self, payload, path='/telegram'):
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = self.local.connection = http.client.HTTPConnection(
+                self.host, self.port
+            )
+        body = payload if isinstance(payload, bytes) else json.dumps(
+            payload
+        ).encode()
+        connection.request('POST', path, body, {
+            'Content-Type': 'application/json',
+            SECRET_HEADER: self.secret,
+        })
+        response = connection.getresponse()
+        response.read()
+        return response.status
+
+
+def raw_request(server, request):
+    """Отправляет запрос как есть и читает ответ до закрытия соединения."""
+    with socket.create_connection(server.server_address, timeout=5) as sock:
+        sock.sendall(request.encode())
+        chunks = []
+        while True:
+            chunk = sock.recv(4096)
+            if not chunk:
+                return b''.join(chunks)
+            chunks.append(chunk)
+
+
+@pytest.fixture
+def webhook():
+    sent = []
+    lock = threading.Lock()
+
+    def send(chat_id, text):
+        with lock:
+            sent.append((chat_id, text))
+
+    dispatcher = UpdateDispatcher(
+        Commands({1: 'token'}, SnapshotCache(lambda token: HOMEWORKS)),
+        send,
+        workers=4,
+        backlog=10000,
+    )
+    server = WebhookServer(dispatcher, SECRET, host='127.0.0.1').start()
+    yield server, sent
+    server.close()
+    dispatcher.close()
+
+
+class TestWebhookServer:
+
+    def test_answers_command(self, webhook):
+        server, sent = webhook
+        assert FakeTelegram(server).post(update(1)) == 200
+        server.dispatcher.close()
+        assert sent == [(1, '"hw1": Работа проверена: ревьюеру всё '
+                            'понравилось. Ура!')]
+
+    def test_rejects_wrong_secret(self, webhook):
+        server, sent = webhook
+        assert FakeTelegram(server, secret='wrong').post(update(1)) == 403
+        assert FakeTelegram(server, secret='').post(update(1)) == 403
+        assert server.received == 0, (
+            'Убедитесь, что обновления без верного секрета не обрабатываются.'
+        )
+
+    def test_bad_requests(self, webhook):
+        server, _ = webhook
+        fake = FakeTelegram(server)
+        assert fake.post(update(1), path='/other') == 404
+        assert fake.post(b'not json') == 400
+        assert fake.post(b'[]') == 400
+
+    @pytest.mark.parametrize('headers, status', [
+        ('', 411),
+        ('Content-Length: abc\r\n', 400),
+        ('Content-Length: -1\r\n', 400),
+        (f'Content-Length: {1 << 21}\r\n', 413),
+    ])
+    def test_rejects_bad_length(self, webhook, headers, status):
+        server, _ = webhook
+        response = raw_request(server, (
+            f'POST /telegram HTTP/1.1\r\n{SECRET_HEADER}: {SECRET}\r\n'
+            f'{headers}\r\n'
+        ))
+        assert response.startswith(f'HTTP/1.1 {status}'.encode()), (
+            'Убедитесь, что запрос без корректного Content-Length '
+            'отклоняется, а соединение закрывается.'
+        )
+        assert server.received == 0
+
+    def test_checks_secret_before_body(self, webhook):
+        server, _ = webhook
+        # Тело не отправлено: сервер не должен ждать его перед ответом.
+        response = raw_request(server, (
+            'POST /telegram HTTP/1.1\r\n'
+            f'Content-Length: {1 << 20}\r\n\r\n'
+        ))
+        assert response.startswith(b'HTTP/1.1 403'), (
+            'Убедитесь, что секрет проверяется до чтения тела.'
+        )
+
+    def test_ignores_plain_messages(self, webhook):
+        server, sent = webhook
+        assert FakeTelegram(server).post(update(1, text='привет')) == 200
+        server.dispatcher.close()
+        assert not sent
+
+    def test_high_rate(self, webhook):
+        server, sent = webhook
+        fake = FakeTelegram(server)
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            statuses = list(pool.map(fake.post, map(update, range(2000))))
+        server.dispatcher.close()
+        assert statuses == [200] * 2000
+        assert len(sent) == 2000, (
+            'Убедитесь, что каждая принятая команда получает ответ.'
+        )
+
+
+def test_dispatcher_is_bounded():
+    release = threading.Event()
+
+    def slow_send(chat_id, text):
+        release.wait(5)
+
+    dispatcher = UpdateDispatcher(
+        Commands({1: 'token'}, SnapshotCache(lambda token: HOMEWORKS)),
+        slow_send,
+        workers=1,
+        backlog=2,
+    )
+    accepted = [dispatcher.dispatch_json(update(i)) for i in range(5)]
+    release.set()
+    dispatcher.close()
+    assert accepted == [True, True, True, False, False], (
+        'Убедитесь, что очередь команд ограничена `workers + backlog`.'
+    )
+    assert dispatcher.rejected == 2
+
+
+if __name__ == '__main__':
+    pytest.main()